@@ -0,0 +1,123 @@
+try:
+    import numpy as np
+except ImportError:  # numpy 為選用套件，只有批次評分會用到
+    np = None
+
+
+class AffinityTable:
+    """
+    任務類型 × 核心類型的親和度加分表
+
+    calculate_core_task_affinity 中與核心動態狀態無關的部分
+    (instruction_mix × instruction_preference 與 affinity_hint 加分)
+    只取決於任務與核心的模板，因此預先算成矩陣，評分時只需查表
+    再加上 performance_score / 限速等動態項目。
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.task_rows = {}  # 任務特徵 -> row
+        self.core_cols = {}  # 核心特徵 -> col
+        self.task_keys = []
+        self.core_keys = []
+        self.bonus = []  # bonus[row][col]
+        self._matrix = None  # numpy 版本的 bonus (批次評分用)
+
+    @staticmethod
+    def task_key(task):
+        return (tuple(task.instruction_mix.items()), tuple(task.affinity_hint or ()))
+
+    @staticmethod
+    def core_key(core):
+        return (core.type, tuple(core.instruction_preference.items()))
+
+    @staticmethod
+    def compute_bonus(task_key, core_key):
+        """與 calculate_core_task_affinity 相同的親和度加分計算"""
+        instruction_mix, affinity_hint = task_key
+        core_type, instruction_preference = core_key
+        instruction_preference = dict(instruction_preference)
+
+        affinity_bonus = 0
+        for instr_type, task_ratio in instruction_mix:
+            if instr_type in instruction_preference:
+                affinity_bonus += task_ratio * instruction_preference[instr_type] * 10
+
+        if affinity_hint and core_type in affinity_hint:
+            affinity_bonus += 20
+
+        return affinity_bonus
+
+    def preload(self, tasks, cores):
+        """以模板預先建立表格"""
+        for task in tasks:
+            self.row_of(task)
+        for core in cores:
+            self.col_of(core)
+
+    def invalidate(self):
+        """模板改變時清空整張表"""
+        self.version += 1
+        self.task_rows.clear()
+        self.core_cols.clear()
+        self.task_keys.clear()
+        self.core_keys.clear()
+        self.bonus.clear()
+        self._matrix = None
+
+    def row_of(self, task):
+        cached = getattr(task, 'affinity_row', None)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        key = self.task_key(task)
+        row = self.task_rows.get(key)
+        if row is None:
+            row = len(self.task_keys)
+            self.task_rows[key] = row
+            self.task_keys.append(key)
+            self.bonus.append([self.compute_bonus(key, core_key) for core_key in self.core_keys])
+            self._matrix = None
+
+        task.affinity_row = (self.version, row)
+        return row
+
+    def col_of(self, core):
+        cached = getattr(core, 'affinity_col', None)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        key = self.core_key(core)
+        col = self.core_cols.get(key)
+        if col is None:
+            col = len(self.core_keys)
+            self.core_cols[key] = col
+            self.core_keys.append(key)
+            for task_key, row in zip(self.task_keys, self.bonus):
+                row.append(self.compute_bonus(task_key, key))
+            self._matrix = None
+
+        core.affinity_col = (self.version, col)
+        return col
+
+    def lookup(self, core, task):
+        """查表取得核心對任務的親和度加分"""
+        return self.bonus[self.row_of(task)][self.col_of(core)]
+
+    def score_matrix(self, tasks, cores):
+        """
+        一次計算多個任務對多個核心的完整分數 (len(tasks) × len(cores))
+        有 numpy 時回傳 ndarray，否則回傳巢狀 list
+        """
+        rows = [self.row_of(task) for task in tasks]
+        cols = [self.col_of(core) for core in cores]
+        base_scores = [core.performance_score * (0.7 if core.thermal_throttling else 1)
+                       for core in cores]
+
+        if np is None:
+            return [[base + self.bonus[row][col] for base, col in zip(base_scores, cols)]
+                    for row in rows]
+
+        if self._matrix is None:
+            self._matrix = np.array(self.bonus, dtype=np.float64).reshape(len(self.task_keys), len(self.core_keys))
+        return self._matrix[np.ix_(rows, cols)] + np.array(base_scores, dtype=np.float64)
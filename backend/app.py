@@ -1,13 +1,73 @@
+import os
+import server_mode
+
+# 伺服器模式：threading (預設)，或以環境變數 SIMULATION_ASYNC_MODE=eventlet / gevent 改用協作式模式
+# (必須在匯入 flask / socketio 之前 monkey patch)
+ASYNC_MODE = server_mode.configure(os.environ.get('SIMULATION_ASYNC_MODE', 'threading'))
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 import time
-import threading
+import heapq
 import random
+import json
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from event_engine import EventDrivenSimulator
+from core_bank import BankField, CoreBank
+from ready_queue import ReadyQueue, IdleCoreIndex
+from affinity import AffinityTable
+from task_graph import TaskGraph
+from slot_index import IdleSlotIndex
+from energy_model import EnergyModel, instruction_speed
+from sessions import SimulationSessionManager, SessionRejected
+from state_stream import CoreStateStream
+from sweep import expand_sweep, make_batches, aggregate_sweep, strategy_family, DEFAULT_BATCH_SIZE
+from workload import TaskStream, generate_workload
+from trace_store import TraceRecorder, TraceReader, list_traces
+from task_table import Task, TaskTable, TaskTablePool, intern_profile, profile_variant
+from task_metrics import TaskMetrics
+from run_queue import PreemptiveDispatcher, DEFAULT_TIME_SLICE, DEFAULT_CONTEXT_SWITCH_COST
+from thermal_model import ThermalNetwork, build_floorplan, over_threshold, DEFAULT_LATERAL_CONDUCTANCE, AMBIENT_TEMP
+from load_balancer import LoadBalancer, DEFAULT_BALANCE_INTERVAL, DEFAULT_MIGRATION_COST, DEFAULT_CROSS_CLUSTER_COST
+from result_cache import ResultCache, cache_key
+from live_control import LiveControl
+from replicas import (ReplicaEstimator, rng_streams, replica_seed, derived_int_seed, replica_metrics, validate_jitter,
+                      jitter_tasks, validate_replica_spec)
+from loop_metrics import LoopMetrics
 
 app = Flask(__name__)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE)
+
+# 同時執行的模擬數量上限與等待佇列長度
+MAX_CONCURRENT_SIMULATIONS = 4
+MAX_QUEUED_SIMULATIONS = 16
+# 協作式模式下模擬只在 tick 之間短暫佔用 CPU，可同時執行更多 session
+COOPERATIVE_MAX_CONCURRENT_SIMULATIONS = 512
+COOPERATIVE_MAX_QUEUED_SIMULATIONS = 1024
+SESSION_TTL = 300  # 已結束的 session 保留秒數
+
+# 模擬軌跡 (trace) 存放目錄
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces')
+
+if server_mode.cooperative():
+    session_manager = SimulationSessionManager(socketio, COOPERATIVE_MAX_CONCURRENT_SIMULATIONS,
+                                               COOPERATIVE_MAX_QUEUED_SIMULATIONS, SESSION_TTL, cooperative=True)
+else:
+    session_manager = SimulationSessionManager(socketio, MAX_CONCURRENT_SIMULATIONS,
+                                               MAX_QUEUED_SIMULATIONS, SESSION_TTL)
+
+# 離線排程與快轉模擬的結果快取 (磁碟層以 --cache-dir 啟用)
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+result_cache = ResultCache(RESULT_CACHE_ENTRIES, RESULT_CACHE_MEMORY_BYTES)
+
+# 實時迴圈的階段計時與計數 (以 --metrics 對所有 session 啟用，否則只記錄要求 profile 的 session)
+loop_metrics = LoopMetrics()
 
 # Core templates
 P_CORE_TEMPLATE = {
@@ -47,6 +107,13 @@ E_CORE_TEMPLATE = {
 }
 
 class Core:
+    __slots__ = ('core_id', 'core_type', 'type', 'max_freq', 'min_freq', 'dvfs_levels', 'base_power',
+                 'base_perf_score', 'thermal_threshold', 'cooling_rate', 'heating_rate_factor',
+                 'instruction_preference', 'load', 'temp', 'power', 'dvfs_freq', 'performance_score',
+                 'thermal_throttling', 'active', 'task_history', 'power_budget', 'frequency',
+                 'power_coefficient', 'current_task', 'total_execution_time', 'total_power_consumption',
+                 'is_running', 'task_time_left', 'task_start_time', 'affinity_col')
+    
     def __init__(self, core_id, core_type="P"):
         self.core_id = core_id
         
@@ -85,243 +152,259 @@ class Core:
         self.total_power_consumption = 0
         self.is_running = False
 
-class Task:
-    def __init__(self, task_id, name, task_type, arrival_time=0, deadline=None, 
-                 priority_class="NORMAL", thread_priority="NORMAL", 
-                 instruction_mix=None, cpu_burst=50, io_wait=0.2, 
-                 realtime=False, affinity_hint=None, dependencies=None):
-        self.task_id = task_id
-        self.name = name
-        self.task_type = task_type
-        self.arrival_time = arrival_time
-        self.deadline = deadline
-        self.priority_class = priority_class
-        self.thread_priority = thread_priority
-        self.instruction_mix = instruction_mix or {"scalar": 0.5, "vector": 0.2, "ai": 0.1, "io": 0.2}
-        self.cpu_burst = cpu_burst
-        self.io_wait = io_wait
-        self.realtime = realtime
-        self.affinity_hint = affinity_hint or []
-        self.dependencies = dependencies or []
-        self.completed = False
-        
-        # 計算執行時間基於 cpu_burst
-        self.execution_time = cpu_burst / 10  # 簡化計算，可根據需要調整
-
-# Task type configurations
-def get_task_config(task_type, name=None, arrival_time=0):
-    if name is None:
-        name = f"{task_type}_{random.randint(1000, 9999)}"
-
-    task_configs = {
-        "browser": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 30,
-            "priority_class": "NORMAL",
-            "thread_priority": "ABOVE_NORMAL",
-            "instruction_mix": {"scalar": 0.5, "vector": 0.1, "ai": 0.0, "io": 0.4},
-            "cpu_burst": 80,
-            "io_wait": 0.4,
-            "realtime": False,
-            "affinity_hint": []
-        },
-        "game": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 10,
-            "priority_class": "REALTIME",
-            "thread_priority": "TIME_CRITICAL",
-            "instruction_mix": {"scalar": 0.1, "vector": 0.5, "ai": 0.3, "io": 0.1},
-            "cpu_burst": 150,
-            "io_wait": 0.1,
-            "realtime": True,
-            "affinity_hint": ["big"]
-        },
-        "music": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 50,
-            "priority_class": "IDLE",
-            "thread_priority": "LOWEST",
-            "instruction_mix": {"scalar": 0.3, "vector": 0.0, "ai": 0.0, "io": 0.7},
-            "cpu_burst": 40,
-            "io_wait": 0.6,
-            "realtime": True,
-            "affinity_hint": ["little"]
-        },
-        "video_encode": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 60,
-            "priority_class": "HIGH",
-            "thread_priority": "HIGHEST",
-            "instruction_mix": {"scalar": 0.2, "vector": 0.6, "ai": 0.1, "io": 0.1},
-            "cpu_burst": 200,
-            "io_wait": 0.1,
-            "realtime": False,
-            "affinity_hint": ["big"]
-        },        "typing": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 40,
-            "priority_class": "NORMAL",
-            "thread_priority": "NORMAL",
-            "instruction_mix": {"scalar": 0.4, "vector": 0.0, "ai": 0.0, "io": 0.6},
-            "cpu_burst": 30,
-            "io_wait": 0.5,
-            "realtime": False,
-            "affinity_hint": ["little"]
-        },
-        "spotify": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 50,
-            "priority_class": "IDLE",
-            "thread_priority": "LOWEST",
-            "instruction_mix": {"scalar": 0.2, "vector": 0.0, "ai": 0.0, "io": 0.8},
-            "cpu_burst": 40,
-            "io_wait": 0.6,
-            "realtime": True,
-            "affinity_hint": ["little"]
-        },
-        "video_call": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 8,
-            "priority_class": "REALTIME",
-            "thread_priority": "HIGHEST",
-            "instruction_mix": {"scalar": 0.3, "vector": 0.2, "ai": 0.1, "io": 0.4},
-            "cpu_burst": 120,
-            "io_wait": 0.2,
-            "realtime": True,
-            "affinity_hint": ["big"]
-        },
-        "file_download": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 100,
-            "priority_class": "NORMAL",
-            "thread_priority": "BELOW_NORMAL",
-            "instruction_mix": {"scalar": 0.1, "vector": 0.0, "ai": 0.0, "io": 0.9},
-            "cpu_burst": 25,
-            "io_wait": 0.8,
-            "realtime": False,
-            "affinity_hint": ["little"]
-        },
-        "ai_processing": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 30,
-            "priority_class": "HIGH",
-            "thread_priority": "ABOVE_NORMAL",
-            "instruction_mix": {"scalar": 0.1, "vector": 0.2, "ai": 0.6, "io": 0.1},
-            "cpu_burst": 300,
-            "io_wait": 0.1,
-            "realtime": False,
-            "affinity_hint": ["big"]
-        },
-        "system_backup": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 300,
-            "priority_class": "IDLE",
-            "thread_priority": "LOWEST",
-            "instruction_mix": {"scalar": 0.2, "vector": 0.0, "ai": 0.0, "io": 0.8},
-            "cpu_burst": 50,
-            "io_wait": 0.7,
-            "realtime": False,
-            "affinity_hint": ["little"]
-        },
-        "photo_editing": {
-            "name": name,
-            "arrival_time": arrival_time,
-            "deadline": arrival_time + 45,
-            "priority_class": "NORMAL",
-            "thread_priority": "NORMAL",
-            "instruction_mix": {"scalar": 0.3, "vector": 0.4, "ai": 0.2, "io": 0.1},
-            "cpu_burst": 180,
-            "io_wait": 0.3,
-            "realtime": False,
-            "affinity_hint": ["big"]
-        }
+class BankedCore(Core):
+    """動態狀態存放在 CoreBank 陣列中的核心 (向量化模式)"""
+    active = BankField(bool)
+    load = BankField(float)
+    temp = BankField(float)
+    power = BankField(float)
+    dvfs_freq = BankField(float)
+    thermal_throttling = BankField(bool)
+    task_time_left = BankField(float, optional=True)
+
+# 各任務類型的參數 (deadline_offset 為截止時間距到達時間的秒數)
+TASK_TYPE_CONFIGS = {
+    "browser": {
+        "deadline_offset": 30,
+        "priority_class": "NORMAL",
+        "thread_priority": "ABOVE_NORMAL",
+        "instruction_mix": {"scalar": 0.5, "vector": 0.1, "ai": 0.0, "io": 0.4},
+        "cpu_burst": 80,
+        "io_wait": 0.4,
+        "realtime": False,
+        "affinity_hint": []
+    },
+    "game": {
+        "deadline_offset": 10,
+        "priority_class": "REALTIME",
+        "thread_priority": "TIME_CRITICAL",
+        "instruction_mix": {"scalar": 0.1, "vector": 0.5, "ai": 0.3, "io": 0.1},
+        "cpu_burst": 150,
+        "io_wait": 0.1,
+        "realtime": True,
+        "affinity_hint": ["big"]
+    },
+    "music": {
+        "deadline_offset": 50,
+        "priority_class": "IDLE",
+        "thread_priority": "LOWEST",
+        "instruction_mix": {"scalar": 0.3, "vector": 0.0, "ai": 0.0, "io": 0.7},
+        "cpu_burst": 40,
+        "io_wait": 0.6,
+        "realtime": True,
+        "affinity_hint": ["little"]
+    },
+    "video_encode": {
+        "deadline_offset": 60,
+        "priority_class": "HIGH",
+        "thread_priority": "HIGHEST",
+        "instruction_mix": {"scalar": 0.2, "vector": 0.6, "ai": 0.1, "io": 0.1},
+        "cpu_burst": 200,
+        "io_wait": 0.1,
+        "realtime": False,
+        "affinity_hint": ["big"]
+    },
+    "typing": {
+        "deadline_offset": 40,
+        "priority_class": "NORMAL",
+        "thread_priority": "NORMAL",
+        "instruction_mix": {"scalar": 0.4, "vector": 0.0, "ai": 0.0, "io": 0.6},
+        "cpu_burst": 30,
+        "io_wait": 0.5,
+        "realtime": False,
+        "affinity_hint": ["little"]
+    },
+    "spotify": {
+        "deadline_offset": 50,
+        "priority_class": "IDLE",
+        "thread_priority": "LOWEST",
+        "instruction_mix": {"scalar": 0.2, "vector": 0.0, "ai": 0.0, "io": 0.8},
+        "cpu_burst": 40,
+        "io_wait": 0.6,
+        "realtime": True,
+        "affinity_hint": ["little"]
+    },
+    "video_call": {
+        "deadline_offset": 8,
+        "priority_class": "REALTIME",
+        "thread_priority": "HIGHEST",
+        "instruction_mix": {"scalar": 0.3, "vector": 0.2, "ai": 0.1, "io": 0.4},
+        "cpu_burst": 120,
+        "io_wait": 0.2,
+        "realtime": True,
+        "affinity_hint": ["big"]
+    },
+    "file_download": {
+        "deadline_offset": 100,
+        "priority_class": "NORMAL",
+        "thread_priority": "BELOW_NORMAL",
+        "instruction_mix": {"scalar": 0.1, "vector": 0.0, "ai": 0.0, "io": 0.9},
+        "cpu_burst": 25,
+        "io_wait": 0.8,
+        "realtime": False,
+        "affinity_hint": ["little"]
+    },
+    "ai_processing": {
+        "deadline_offset": 30,
+        "priority_class": "HIGH",
+        "thread_priority": "ABOVE_NORMAL",
+        "instruction_mix": {"scalar": 0.1, "vector": 0.2, "ai": 0.6, "io": 0.1},
+        "cpu_burst": 300,
+        "io_wait": 0.1,
+        "realtime": False,
+        "affinity_hint": ["big"]
+    },
+    "system_backup": {
+        "deadline_offset": 300,
+        "priority_class": "IDLE",
+        "thread_priority": "LOWEST",
+        "instruction_mix": {"scalar": 0.2, "vector": 0.0, "ai": 0.0, "io": 0.8},
+        "cpu_burst": 50,
+        "io_wait": 0.7,
+        "realtime": False,
+        "affinity_hint": ["little"]
+    },
+    "photo_editing": {
+        "deadline_offset": 45,
+        "priority_class": "NORMAL",
+        "thread_priority": "NORMAL",
+        "instruction_mix": {"scalar": 0.3, "vector": 0.4, "ai": 0.2, "io": 0.1},
+        "cpu_burst": 180,
+        "io_wait": 0.3,
+        "realtime": False,
+        "affinity_hint": ["big"]
     }
-    
-    if task_type not in task_configs:
+}
+
+# 每個任務類型共用的不可變 profile
+TASK_PROFILES = {task_type: intern_profile(task_type, **config) for task_type, config in TASK_TYPE_CONFIGS.items()}
+
+def get_task_profile(task_type):
+    profile = TASK_PROFILES.get(task_type)
+    if profile is None:
         raise ValueError(f"Unsupported task type: {task_type}")
-    
-    return task_configs[task_type]
+    return profile
+
+def task_burst(task_type):
+    """任務類型預設的 cpu_burst"""
+    return get_task_profile(task_type).cpu_burst
+
+TASK_TYPES = tuple(TASK_TYPE_CONFIGS)
+
+# 任務類型 × 核心類型的親和度加分表
+affinity_table = AffinityTable()
+
+def load_affinity_table():
+    """依目前的任務與核心模板 (重新) 建立親和度表，模板改變後需再次呼叫"""
+    affinity_table.invalidate()
+    table = TaskTable()
+    template_tasks = [Task.from_profile(table, -1, TASK_PROFILES[task_type], 0, None, name=task_type)
+                      for task_type in TASK_TYPES]
+    affinity_table.preload(template_tasks, [Core(-1, "P"), Core(-1, "E")])
+
+load_affinity_table()
 
 class Scheduler:
-    def __init__(self, cores, tasks):
+    def __init__(self, cores, tasks, core_bank=None):
         self.cores = cores
         self.tasks = tasks
         self.completed_tasks = []
         self.current_time = 0
+        self.core_bank = core_bank  # 向量化模式下的核心狀態陣列
+        self.task_stream = None  # 延遲產生任務的工作負載 (TaskStream)
+        self.injected_tasks = 0  # 執行中插入的任務數 (LiveControl)
+        
+        # 實時調度使用的索引 (第一次調度時建立)
+        self.ready_queue = None
+        self.idle_index = None
+        self.preemptive = None  # 搶佔式排程 (PreemptiveDispatcher)，None 表示任務執行到完成
+        self.thermal_model = None  # 耦合熱模型 (ThermalNetwork)，None 表示各核心獨立計算溫度
         
+    def init_realtime_indexes(self):
+        """建立就緒佇列與閒置核心索引"""
+        self.ready_queue = ReadyQueue(self.tasks)
+        self.idle_index = IdleCoreIndex(self.cores)
+    
+    def total_task_count(self):
+        """目前已知的任務數 (串流工作負載為已產生的任務數，另加上執行中插入的任務)"""
+        if self.task_stream is not None:
+            return len(self.tasks) + self.injected_tasks + self.task_stream.generated
+        return len(self.tasks) + self.injected_tasks
+    
+    def all_tasks_released(self):
+        """工作負載中是否已沒有尚未產生或等待相依的任務"""
+        return self.task_stream is None or self.task_stream.exhausted
+        
+    def dispatch(self, current_time):
+        """每個 tick 的任務分配：啟用搶佔式排程時交給各核心的 run queue，否則為 basic_idle_first_scheduler"""
+        if self.preemptive is not None:
+            return self.preemptive.dispatch(current_time)
+        return self.basic_idle_first_scheduler(current_time)
+    
     def basic_idle_first_scheduler(self, current_time):
         """
         將尚未執行的任務分配給目前 idle 的核心
+        就緒任務由 ReadyQueue 依到達時間釋放，最佳核心由 IdleCoreIndex 依核心分組挑選
         """
-        # 選出尚未分配的任務
-        ready_tasks = [t for t in self.tasks if not hasattr(t, 'assigned') or not t.assigned]
-        ready_tasks = [t for t in ready_tasks if t.arrival_time <= current_time]
+        if self.ready_queue is None:
+            self.init_realtime_indexes()
+        
+        # 從工作負載串流取出已到達的任務
+        if self.task_stream is not None:
+            for task in self.task_stream.pull(current_time):
+                self.ready_queue.add(task)
+        
+        # 釋放已到達的任務
+        self.ready_queue.release(current_time)
         
-        # 選出目前 idle 的核心
-        idle_cores = [c for c in self.cores if not c.active]
-
         # 根據 performance_score 選最佳核心
         assignments = []
-        for task in ready_tasks:
-            if not idle_cores:
-                break  # 沒核心可用，跳出
-
-            # 計算每個核心對此任務的效能分數
-            best_core = None
-            best_score = 0
+        skipped = []
+        while self.ready_queue and self.idle_index:
+            entry = self.ready_queue.pop()
+            if entry is None:
+                break
             
-            for core in idle_cores:
-                # 計算核心對任務的適配度
-                score = self.calculate_core_task_affinity(core, task)
-                if score > best_score:
-                    best_score = score
-                    best_core = core
+            best_core = self.idle_index.best_core(entry[1], self.calculate_core_task_affinity)
+            if best_core is None:
+                skipped.append(entry)  # 沒有適合的核心，留待下次
+                continue
             
-            if best_core:
-                idle_cores.remove(best_core)
-                
-                # 分配任務
-                best_core.active = True
-                best_core.current_task = task
-                best_core.task_time_left = task.cpu_burst
-                best_core.task_start_time = current_time
-                task.assigned = True
-                task.assigned_core = best_core.core_id
-                
-                assignments.append({
-                    'core_id': best_core.core_id,
-                    'task': task.name,
-                    'task_id': task.task_id,
-                    'start_time': current_time,
-                    'estimated_duration': task.cpu_burst / 10  # 簡化計算
-                })
+            assignments.append(self.assign_task(best_core, entry[1], current_time))
+        
+        for order, task in skipped:
+            self.ready_queue.push(order, task)
         
         return assignments
     
+    def assign_task(self, core, task, current_time):
+        """將任務指派給核心"""
+        core.active = True
+        core.current_task = task
+        core.task_time_left = task.cpu_burst
+        core.task_start_time = current_time
+        task.assigned = True
+        task.assigned_core = core.core_id
+        
+        if self.idle_index is not None:
+            self.idle_index.discard(core.core_id)
+        if self.core_bank is not None:
+            self.core_bank.assign(core, task)
+        
+        return {
+            'core_id': core.core_id,
+            'task': task.name,
+            'task_id': task.task_id,
+            'start_time': current_time,
+            'estimated_duration': task.cpu_burst / 10  # 簡化計算
+        }
+    
     def calculate_core_task_affinity(self, core, task):
         """計算核心對任務的適配度分數"""
         base_score = core.performance_score
         
-        # 根據指令偏好調整分數
-        affinity_bonus = 0
-        for instr_type, task_ratio in task.instruction_mix.items():
-            if instr_type in core.instruction_preference:
-                affinity_bonus += task_ratio * core.instruction_preference[instr_type] * 10
-        
-        # 根據親和性提示調整
-        if hasattr(task, 'affinity_hint') and task.affinity_hint:
-            if core.type in task.affinity_hint:
-                affinity_bonus += 20
+        # 指令偏好與親和性提示的加分只取決於模板，直接查表
+        affinity_bonus = affinity_table.lookup(core, task)
         
         # 考慮溫度限制
         if core.thermal_throttling:
@@ -329,8 +412,21 @@ class Scheduler:
             
         return base_score + affinity_bonus
     
+    def core_task_affinity_bonus(self, core, task):
+        """指令偏好與親和性提示的加分 (不含效能分數與限速)"""
+        return affinity_table.lookup(core, task)
+    
+    def score_tasks_against_cores(self, tasks, cores=None):
+        """批次計算多個任務對多個核心的適配度分數矩陣"""
+        return affinity_table.score_matrix(tasks, self.cores if cores is None else cores)
+    
     def update_cores(self, time_delta):
         """更新核心狀態"""
+        if self.thermal_model is not None:
+            return self.update_cores_coupled(time_delta)
+        if self.core_bank is not None:
+            return self.update_cores_vectorized(time_delta)
+        
         completed_tasks = []
         
         for core in self.cores:
@@ -340,26 +436,76 @@ class Scheduler:
                 # 更新核心溫度和功耗
                 self.update_core_thermals(core, time_delta)
                 
-                if core.task_time_left <= 0:
-                    # 任務完成
-                    completed_task = core.current_task
-                    completed_task.completed = True
-                    completed_tasks.append(completed_task)
-                    
-                    # 重置核心狀態
-                    core.active = False
-                    core.current_task = None
-                    core.load = 0.0
-                    delattr(core, 'task_time_left')
-                    delattr(core, 'task_start_time')
-                    
-                    # 添加到歷史
-                    core.task_history.append(completed_task.name)
-                    if len(core.task_history) > 5:  # 保持最近5個任務
-                        core.task_history.pop(0)
+                if core.task_time_left <= 1e-9:  # 容忍浮點累減誤差
+                    completed_tasks.append(self.complete_core_task(core))
         
         return completed_tasks
     
+    def update_cores_vectorized(self, time_delta):
+        """以 CoreBank 一次更新所有核心，只對完成任務的核心逐一處理"""
+        completed_tasks = []
+        for index in self.core_bank.step(time_delta):
+            completed_tasks.append(self.complete_core_task(self.cores[index]))
+        return completed_tasks
+    
+    def update_cores_coupled(self, time_delta):
+        """
+        推進所有任務後以耦合熱模型一次更新全部核心 (含閒置核心) 的溫度、功耗與限速
+        閒置核心的限速狀態改變時更新閒置核心索引
+        """
+        if self.core_bank is not None:
+            running = self.core_bank.advance_tasks(time_delta)
+            changed = self.thermal_model.step_bank(self.core_bank, time_delta)
+            finished = [self.cores[index] for index in self.core_bank.finished(running)]
+        else:
+            running = [core for core in self.cores if core.active and hasattr(core, 'task_time_left')]
+            for core in running:
+                core.task_time_left -= time_delta
+            changed = self.thermal_model.step_cores(time_delta)
+            finished = [core for core in running if core.task_time_left <= 1e-9]
+        
+        if self.idle_index is not None:
+            for index in changed:
+                core = self.cores[index]
+                if not core.active:
+                    self.idle_index.refresh(core.core_id)
+        
+        return [self.complete_core_task(core) for core in finished]
+    
+    def complete_core_task(self, core):
+        """核心上的任務完成，重置核心狀態"""
+        completed_task = core.current_task
+        completed_task.completed = True
+        
+        # 重置核心狀態
+        core.active = False
+        core.current_task = None
+        core.load = 0.0
+        delattr(core, 'task_time_left')
+        delattr(core, 'task_start_time')
+        
+        # 添加到歷史
+        core.task_history.append(completed_task.name)
+        if len(core.task_history) > 5:  # 保持最近5個任務
+            core.task_history.pop(0)
+        
+        if self.idle_index is not None:
+            self.idle_index.add(core.core_id)
+        if self.task_stream is not None:
+            self.task_stream.task_completed(completed_task)
+        
+        return completed_task
+    
+    def stop_core_task(self, core):
+        """中止核心上執行中的任務 (取消任務)，核心變為閒置"""
+        core.active = False
+        core.current_task = None
+        core.load = 0.0
+        del core.task_time_left
+        del core.task_start_time
+        if self.idle_index is not None:
+            self.idle_index.add(core.core_id)
+    
     def update_core_thermals(self, core, time_delta):
         """更新核心溫度和功耗"""
         if core.active:
@@ -377,7 +523,7 @@ class Scheduler:
             core.temp += heating
             
             # 檢查溫度限制
-            if core.temp > core.thermal_threshold:
+            if over_threshold(core.temp, core.thermal_threshold):
                 core.thermal_throttling = True
                 core.dvfs_freq = max(core.min_freq, core.dvfs_freq * 0.9)
             else:
@@ -393,119 +539,285 @@ class Scheduler:
     
     # 保留舊的調度方法以向後兼容
     def edf_schedule(self):
-        """Earliest Deadline First scheduling"""
-        # Sort tasks by deadline
-        sorted_tasks = sorted([t for t in self.tasks if not t.completed], 
-                            key=lambda x: x.deadline or float('inf'))
+        """
+        Earliest Deadline First scheduling
+        非搶佔式 EDF：任務在到達且所有前置任務完成後就緒，
+        每次由最早可用的核心執行就緒任務中截止時間最早者
+        """
+        if not self.cores:
+            raise ValueError("No cores available")
+        graph = TaskGraph(self.tasks)  # 相依無法滿足時直接丟出 ValueError
+        tasks = self.tasks
+        successors = graph.successors
+        in_degree = graph.in_degrees()
+        release_time = [task.arrival_time for task in tasks]
         
-        schedule = []
-        time_slot = 0
+        # 等待釋放的任務 (release_time, index) 與就緒任務 (deadline, index)
+        pending = [(release_time[i], i) for i in range(len(tasks)) if in_degree[i] == 0]
+        heapq.heapify(pending)
+        ready = []
         
-        while len(self.completed_tasks) < len(self.tasks):
-            available_cores = [c for c in self.cores if not c.is_running]
-            ready_tasks = [t for t in sorted_tasks if not t.completed and 
-                          all(dep in [ct.task_id for ct in self.completed_tasks] for dep in t.dependencies)]
+        # 各核心可用時間 (available_time, core_index)
+        core_heap = [(0, i) for i in range(len(self.cores))]
+        
+        schedule = []
+        inf = float('inf')
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while pending or ready:
+            available_time, core_index = core_heap[0]
             
-            if not available_cores or not ready_tasks:
-                time_slot += 1
-                continue
-                
-            # Assign tasks to cores
-            for i, task in enumerate(ready_tasks[:len(available_cores)]):
-                core = available_cores[i]
-                schedule.append({
-                    'time': time_slot,
-                    'core_id': core.core_id,
-                    'task': task.name,
-                    'duration': task.execution_time
-                })
-                task.completed = True
-                self.completed_tasks.append(task)
-                
-            time_slot += max([t.execution_time for t in ready_tasks[:len(available_cores)]])
+            # 沒有就緒任務時，時間跳到下一個任務釋放
+            now = available_time
+            if not ready and pending[0][0] > now:
+                now = pending[0][0]
+            while pending and pending[0][0] <= now:
+                _, index = heappop(pending)
+                deadline = tasks[index].deadline
+                heappush(ready, (inf if deadline is None else deadline, index))
+            
+            _, index = heappop(ready)
+            task = tasks[index]
+            start_time = max(available_time, release_time[index])
+            finish_time = start_time + task.execution_time
+            heapq.heapreplace(core_heap, (finish_time, core_index))
+            
+            schedule.append({
+                'time': start_time,
+                'core_id': self.cores[core_index].core_id,
+                'task': task.name,
+                'task_id': task.task_id,
+                'duration': task.execution_time
+            })
+            task.completed = True
+            self.completed_tasks.append(task)
+            
+            # 釋放後繼任務
+            for succ in successors[index]:
+                if finish_time > release_time[succ]:
+                    release_time[succ] = finish_time
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    heappush(pending, (release_time[succ], succ))
             
         return schedule
     
+    def instruction_speed_factor(self, core, task):
+        """依任務指令組成與核心指令偏好計算的相對速度 (1.0 表示與頻率成正比)"""
+        return instruction_speed(task.instruction_mix, core.instruction_preference)
+    
+    def inverse_speed_table(self, tasks):
+        """
+        回傳 (每個任務的 profile 列, 每個 profile 對各核心的 1 / (頻率 × 指令速度))
+        同樣指令組成的任務共用一列，避免 任務數 × 核心數 的表格
+        """
+        rows = []
+        table = {}
+        for task in tasks:
+            row = affinity_table.row_of(task)
+            if row not in table:
+                table[row] = [1.0 / (core.frequency * self.instruction_speed_factor(core, task))
+                              for core in self.cores]
+            rows.append(row)
+        return rows, table
+    
     def heft_schedule(self):
-        """Heterogeneous Earliest Finish Time scheduling"""
-        schedule = []
-        core_available_time = [0] * len(self.cores)
-        
-        # 正確計算 upward rank
-        upward_ranks = {}
-        # 先處理沒有依賴的任務
-        for task in self.tasks:
-            if not task.dependencies:
-                upward_ranks[task.task_id] = task.execution_time
-        
-        # 從依賴較少的任務開始計算
-        for task in sorted(self.tasks, key=lambda t: len(t.dependencies)):
-            if task.task_id not in upward_ranks:
-                # 取決於所有前置任務的最大 rank
-                max_pred_rank = 0
-                for dep in task.dependencies:
-                    if dep in upward_ranks:
-                        max_pred_rank = max(max_pred_rank, upward_ranks[dep])
-                upward_ranks[task.task_id] = task.execution_time + max_pred_rank
-        
-        # 按 upward rank 排序
-        sorted_tasks = sorted(self.tasks, key=lambda x: upward_ranks[x.task_id], reverse=True)
-        
-        # 追蹤已完成的任務
-        completed_tasks = []
+        """
+        Heterogeneous Earliest Finish Time scheduling
+        upward rank 以反向拓撲順序計算 (平均執行時間 + 後繼最大 rank)，
+        再依 rank 由高到低以插入式排程放到完成時間最早的核心
+        """
+        if not self.cores:
+            raise ValueError("No cores available")
+        graph = TaskGraph(self.tasks)  # 相依無法滿足時直接丟出 ValueError
+        tasks = self.tasks
+        cores = self.cores
         
-        for task in sorted_tasks:
-            # 檢查依賴是否滿足
-            if not all(dep in [t.task_id for t in completed_tasks] for dep in task.dependencies):
-                continue
-                
-            # 找最早完成時間的核心
-            best_core = None
-            earliest_finish = float('inf')
+        # 各核心的執行時間 = execution_time / (頻率 × 指令速度)
+        rows, inverse_speed = self.inverse_speed_table(tasks)
+        mean_inverse_speed = {row: sum(values) / len(values) for row, values in inverse_speed.items()}
+        average_costs = [task.execution_time * mean_inverse_speed[row] for task, row in zip(tasks, rows)]
+        
+        upward_ranks = graph.upward_ranks(average_costs)
+        
+        # 按 upward rank 排序 (同分時依拓撲順序，確保前置任務先排)
+        topo_position = [0] * len(tasks)
+        for position, index in enumerate(graph.order):
+            topo_position[index] = position
+        priority = sorted(range(len(tasks)), key=lambda i: (-upward_ranks[i], topo_position[i]))
+        
+        slots = [IdleSlotIndex() for _ in cores]
+        finish_times = [0.0] * len(tasks)
+        predecessors = graph.predecessors
+        inf = float('inf')
+        
+        schedule = []
+        for index in priority:
+            task = tasks[index]
+            ready_time = task.arrival_time
+            for pred in predecessors[index]:
+                if finish_times[pred] > ready_time:
+                    ready_time = finish_times[pred]
             
-            for i, core in enumerate(self.cores):
-                start_time = core_available_time[i]
-                finish_time = start_time + task.execution_time / core.frequency
-                
+            # 找最早完成時間的核心 (可插入先前排程留下的空檔)
+            # 先以「接在最後」求得上限，空檔掃描只需找比上限更早完成的位置
+            best_core_idx = None
+            best_start = 0
+            earliest_finish = inf
+            core_inverse_speed = inverse_speed[rows[index]]
+            durations = [task.execution_time * value for value in core_inverse_speed]
+            for i, slot_index in enumerate(slots):
+                start_time = slot_index.tail_start(ready_time)
+                finish_time = start_time + durations[i]
                 if finish_time < earliest_finish:
                     earliest_finish = finish_time
-                    best_core = core
+                    best_start = start_time
+                    best_core_idx = i
+            for i, slot_index in enumerate(slots):
+                duration = durations[i]
+                if ready_time + duration >= earliest_finish or not slot_index.has_gaps():
+                    continue  # 不可能更早完成，或沒有中間空檔
+                start_time = slot_index.find_slot(ready_time, duration, earliest_finish)
+                if start_time is not None:
+                    earliest_finish = start_time + duration
+                    best_start = start_time
                     best_core_idx = i
             
-            if best_core:
-                start_time = core_available_time[best_core_idx]
-                schedule.append({
-                    'time': start_time,
-                    'core_id': best_core.core_id,
-                    'task': task.name,
-                    'duration': task.execution_time / best_core.frequency
-                })
-                core_available_time[best_core_idx] = earliest_finish
-                completed_tasks.append(task)
+            duration = earliest_finish - best_start
+            slots[best_core_idx].reserve(best_start, duration)
+            finish_times[index] = earliest_finish
+            
+            schedule.append({
+                'time': best_start,
+                'core_id': cores[best_core_idx].core_id,
+                'task': task.name,
+                'task_id': task.task_id,
+                'duration': duration
+            })
         
         return schedule
     
     def eas_schedule(self):
-        """Energy Aware Scheduling"""
-        schedule = []
-        time_slot = 0
+        """
+        Energy Aware Scheduling
+        依釋放時間處理就緒任務，對每個 (核心, DVFS 等級) 估算能耗與完成時間，
+        在趕得上截止時間的組合中選能耗最低者；都趕不上時選最早完成者
+        """
+        if not self.cores:
+            raise ValueError("No cores available")
+        graph = TaskGraph(self.tasks)  # 相依無法滿足時直接丟出 ValueError
+        model = EnergyModel.for_cores(self.cores)
+        tasks = self.tasks
+        successors = graph.successors
+        in_degree = graph.in_degrees()
+        release_time = [task.arrival_time for task in tasks]
+        inf = float('inf')
+        
+        # 同 profile 的核心能耗表相同，只需考慮其中最早可用者
+        # 執行中核心的剩餘時間視為已排入的工作量
+        profile_heaps = {}
+        for i, core in enumerate(self.cores):
+            available_time = getattr(core, 'task_time_left', 0) if core.active else 0
+            profile_heaps.setdefault(model.profiles[i], []).append((available_time, i))
+        for profile_heap in profile_heaps.values():
+            heapq.heapify(profile_heap)
+        
+        pending = [(release_time[i], tasks[i].deadline if tasks[i].deadline is not None else inf, i)
+                   for i in range(len(tasks)) if in_degree[i] == 0]
+        heapq.heapify(pending)
         
-        for task in self.tasks:
-            # Choose core with best energy efficiency
-            best_core = min(self.cores, key=lambda c: c.power_coefficient * task.execution_time)
+        schedule = []
+        while pending:
+            release, deadline, index = heapq.heappop(pending)
+            task = tasks[index]
+            
+            best = None
+            for profile, profile_heap in profile_heaps.items():
+                available_time, core_index = profile_heap[0]
+                start_time = max(available_time, release)
+                for freq, duration, energy in model.options(core_index, task):
+                    finish_time = start_time + duration
+                    if finish_time <= deadline:
+                        key = (0, energy, finish_time)
+                    else:
+                        key = (1, finish_time, energy)
+                    if best is None or key < best[0]:
+                        best = (key, profile, core_index, freq, start_time, duration, energy)
+            
+            key, profile, core_index, freq, start_time, duration, energy = best
+            finish_time = start_time + duration
+            heapq.heapreplace(profile_heaps[profile], (finish_time, core_index))
             
-            duration = task.execution_time / best_core.frequency
             schedule.append({
-                'time': time_slot,
-                'core_id': best_core.core_id,
+                'time': start_time,
+                'core_id': self.cores[core_index].core_id,
                 'task': task.name,
-                'duration': duration
+                'task_id': task.task_id,
+                'duration': duration,
+                'frequency': freq,
+                'energy': energy,
+                'deadline_met': key[0] == 0
             })
             
-            time_slot += duration
+            # 釋放後繼任務
+            for succ in successors[index]:
+                if finish_time > release_time[succ]:
+                    release_time[succ] = finish_time
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    succ_deadline = tasks[succ].deadline
+                    heapq.heappush(pending, (release_time[succ], succ_deadline if succ_deadline is not None else inf, succ))
             
         return schedule
 
+def summarize_schedule(schedule, cores, tasks):
+    """離線排程結果摘要：完成時間、總能耗與錯過截止時間的任務數"""
+    deadlines = {task.task_id: task.deadline for task in tasks}
+    cores_by_id = {core.core_id: core for core in cores}
+    
+    makespan = 0
+    total_energy = 0
+    deadline_misses = 0
+    for step in schedule:
+        finish_time = step['time'] + step['duration']
+        makespan = max(makespan, finish_time)
+        if 'energy' in step:
+            total_energy += step['energy']
+        else:
+            total_energy += cores_by_id[step['core_id']].power_coefficient * step['duration']
+        deadline = deadlines.get(step.get('task_id'))
+        if deadline is not None and finish_time > deadline:
+            deadline_misses += 1
+    
+    return {
+        'makespan': round(makespan, 2),
+        'total_energy': round(total_energy, 2),
+        'deadline_misses': deadline_misses,
+        'tasks_scheduled': len(schedule)
+    }
+
+def evaluate_schedule(schedule, cores, tasks):
+    """
+    以同一個執行時間/能耗模型重新計算離線排程 (用於比較不同策略)
+    保留各排程的核心分配與每個核心上的執行順序，執行時間與能耗改由 EnergyModel 在排定的頻率
+    (未指定時為核心目前頻率) 計算，開始時間依到達時間、前置任務與核心可用時間重新推算
+    """
+    model = EnergyModel.for_cores(cores)
+    core_index = {core.core_id: i for i, core in enumerate(cores)}
+    tasks_by_id = {task.task_id: task for task in tasks}
+    finish_times = {}
+    core_free = [0.0] * len(cores)
+    
+    evaluated = []
+    # 依原本的開始時間處理：前置任務在原排程中一定先開始 (執行時間皆為正)
+    for step in sorted(schedule, key=lambda step: step['time']):
+        task = tasks_by_id[step['task_id']]
+        i = core_index[step['core_id']]
+        duration, energy = model.evaluate(i, task, step.get('frequency', cores[i].frequency))
+        start_time = max([core_free[i], task.arrival_time] + [finish_times[dep] for dep in task.dependencies])
+        core_free[i] = finish_times[task.task_id] = start_time + duration
+        evaluated.append({**step, 'time': start_time, 'duration': duration, 'energy': energy})
+    return evaluated
+
 @app.route('/api/cores', methods=['POST'])
 def create_cores():
     data = request.json
@@ -519,46 +831,206 @@ def create_cores():
     
     return jsonify({'status': 'success', 'cores_created': len(cores)})
 
-@app.route('/api/execute', methods=['POST'])
-def execute_scheduling():
-    data = request.json
-    
-    # Create cores
+def build_cores(core_configs, vectorized=False):
+    """依設定建立核心列表 (vectorized=True 時建立可接上 CoreBank 的核心)"""
+    core_class = BankedCore if vectorized else Core
     cores = []
-    for i, core_config in enumerate(data['cores']):
-        core = Core(
+    for i, core_config in enumerate(core_configs):
+        core = core_class(
             core_id=i,
             core_type=core_config.get('core_type', 'P')
         )
         cores.append(core)
-      # Create tasks
+    return cores
+
+def build_task(task_data, task_id, table, rng=random):
+    """
+    依設定在任務表中建立單一任務 (類型參數直接取自共用的 profile)
+    task_data 可用 cpu_burst 覆寫類型預設值；rng 產生名稱後綴 (情境有 seed 時為可重現的串流)
+    """
+    task_type = task_data.get('task_type', 'browser')
+    arrival_time = task_data.get('arrival_time', 0)
+    custom_name = task_data.get('name')
+    
+    profile = get_task_profile(task_type)
+    cpu_burst = task_data.get('cpu_burst')
+    if cpu_burst is not None and cpu_burst != profile.cpu_burst:
+        if not isinstance(cpu_burst, (int, float)) or isinstance(cpu_burst, bool) or cpu_burst <= 0:
+            raise ValueError(f"Invalid cpu_burst: {cpu_burst!r}")
+        profile = profile_variant(profile, cpu_burst=cpu_burst)
+    # 未指定名稱時只記錄隨機後綴，名稱在需要時才組出
+    name_suffix = rng.randint(1000, 9999) if custom_name is None else 0
+    return Task.from_profile(table, task_id, profile, arrival_time, arrival_time + profile.deadline_offset,
+                             name_suffix, custom_name, task_data.get('dependencies', ()))
+
+def build_tasks(task_configs, rng=random):
+    """依設定建立任務列表 (共用同一個任務表)"""
+    table = TaskTable()
+    return [build_task(task_data, i, table, rng) for i, task_data in enumerate(task_configs)]
+
+def build_workload_tasks(data, max_tasks=1000000):
+    """
+    取得請求中的任務設定：tasks 列表，或由 workload 規格產生 (需有 count 或 duration 上限)
+    離線排程需要完整的任務列表，因此產生的任務會全部展開
+    """
+    if 'workload' not in data:
+        return data['tasks']
+    
+    workload = data['workload']
+    if workload.get('count') is None and workload.get('duration') is None:
+        raise ValueError("Workload needs a count or duration to be scheduled offline")
+    task_configs = []
+    for config in generate_workload(workload, TASK_TYPES):
+        if len(task_configs) >= max_tasks:
+            raise ValueError(f"Workload exceeds {max_tasks} tasks")
+        task_configs.append(config)
+    return task_configs
+
+def normalize_options(name, options, defaults):
+    """將 true / {參數} 形式的選項補上預設值 (未啟用則為 None)"""
+    if not options:
+        return None
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError(f"Invalid {name} options: {options!r}")
+    
+    normalized = {key: options.get(key, default) for key, default in defaults.items()}
+    for key, value in normalized.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"Invalid {key}: {value!r}")
+    return normalized
+
+def load_balance_options(data):
+    """
+    請求中的負載平衡設定：strategy 為 BALANCED，或 load_balance 為 true / {interval, migration_cost, cross_cluster_cost}
+    """
+    options = data.get('load_balance')
+    if options is None and data.get('strategy') == 'BALANCED':
+        options = True
+    return normalize_options('load_balance', options, {
+        'interval': DEFAULT_BALANCE_INTERVAL,
+        'migration_cost': DEFAULT_MIGRATION_COST,
+        'cross_cluster_cost': DEFAULT_CROSS_CLUSTER_COST
+    })
+
+def preemptive_options(data):
+    """
+    請求中的搶佔式排程設定：strategy 為 PREEMPTIVE，或 preemptive 為 true / {time_slice, context_switch_cost}
+    負載平衡建立在各核心的 run queue 上，啟用時也會啟用搶佔式排程
+    """
+    options = data.get('preemptive')
+    if options is None and (data.get('strategy') == 'PREEMPTIVE' or load_balance_options(data) is not None):
+        options = True
+    return normalize_options('preemptive', options, {
+        'time_slice': DEFAULT_TIME_SLICE,
+        'context_switch_cost': DEFAULT_CONTEXT_SWITCH_COST
+    })
+
+def thermal_options(data):
+    """
+    請求中的耦合熱模型設定：thermal 為 true / {cols, positions, lateral_conductance, ambient_temp}
+    cols / positions 指定 floorplan (預設依核心順序排成接近正方形的格點)
+    """
+    options = data.get('thermal')
+    normalized = normalize_options('thermal', options, {
+        'lateral_conductance': DEFAULT_LATERAL_CONDUCTANCE,
+        'ambient_temp': AMBIENT_TEMP
+    })
+    if normalized is not None:
+        layout = options if isinstance(options, dict) else {}
+        normalized['cols'] = layout.get('cols')
+        normalized['positions'] = layout.get('positions')
+    return normalized
+
+def build_realtime_scheduler(data):
+    """
+    依請求內容建立實時調度器
+    請求中有 workload 時改以 TaskStream 在模擬時間到達時才產生任務
+    """
+    vectorized = data.get('vectorized', False)
+    preemptive = preemptive_options(data)
+    load_balance = load_balance_options(data)
+    thermal = thermal_options(data)
+    if preemptive is not None and vectorized:
+        raise ValueError("Preemptive scheduling does not support vectorized cores")
+    if load_balance is not None and preemptive is None:
+        raise ValueError("Load balancing requires preemptive scheduling")
+    # seed: 名稱後綴與 jitter 使用由 seed 衍生的獨立亂數串流，相同 seed 的結果可重現
+    jitter = validate_jitter(data.get('jitter'))
+    seed = data.get('seed')
+    streams = None
+    if seed is not None or jitter is not None:
+        streams = rng_streams(seed if seed is not None else random.getrandbits(64))
+    names = streams['names'] if seed is not None else random
+    if jitter is not None and jitter['arrival'] and 'workload' in data:
+        raise ValueError("Arrival jitter only applies to task lists (workload arrivals come from its own seed)")
+    
+    cores = build_cores(data['cores'], vectorized)
     tasks = []
-    for i, task_data in enumerate(data['tasks']):
-        # Get task type configuration
-        task_type = task_data.get('task_type', 'browser')
-        arrival_time = task_data.get('arrival_time', 0)
-        custom_name = task_data.get('name')
-        
-        # Get configuration for this task type
-        task_config = get_task_config(task_type, custom_name, arrival_time)
-        
-        # Create task with all parameters
-        task = Task(
-            task_id=i,
-            name=task_config['name'],
-            task_type=task_type,
-            arrival_time=task_config['arrival_time'],
-            deadline=task_config['deadline'],
-            priority_class=task_config['priority_class'],
-            thread_priority=task_config['thread_priority'],
-            instruction_mix=task_config['instruction_mix'],
-            cpu_burst=task_config['cpu_burst'],
-            io_wait=task_config['io_wait'],
-            realtime=task_config['realtime'],
-            affinity_hint=task_config['affinity_hint'],
-            dependencies=task_data.get('dependencies', [])
-        )
-        tasks.append(task)
+    if 'workload' not in data:
+        task_configs = data.get('tasks', [])
+        if jitter is not None:
+            task_configs = jitter_tasks(task_configs, streams, jitter, task_burst)
+        tasks = build_tasks(task_configs, names)
+    core_bank = CoreBank(cores) if vectorized else None
+    scheduler = Scheduler(cores, tasks, core_bank)
+    
+    if 'workload' in data:
+        configs = generate_workload(data['workload'], TASK_TYPES)
+        if jitter is not None:
+            configs = jitter_tasks(configs, streams, jitter, task_burst)
+        tables = TaskTablePool()
+        scheduler.task_stream = TaskStream(
+            configs, lambda config: build_task(config, config['task_id'], tables.table(), names))
+    if thermal is not None:
+        floorplan = build_floorplan(len(cores), thermal)
+        scheduler.thermal_model = ThermalNetwork(cores, floorplan, thermal['lateral_conductance'],
+                                                 thermal['ambient_temp'])
+    if preemptive is not None:
+        scheduler.preemptive = PreemptiveDispatcher(scheduler, **preemptive)
+    if load_balance is not None:
+        scheduler.preemptive.balancer = LoadBalancer(scheduler.preemptive, scheduler.core_task_affinity_bonus,
+                                                     **load_balance)
+    return scheduler
+
+def request_cache_key(kind, data, **options):
+    """
+    正規化請求 (補上任務與核心的預設值) 後計算快取鍵
+    未指定 seed 的 workload 或 jitter 每次產生的任務不同，回傳 None 表示不快取
+    """
+    if data.get('jitter') and data.get('seed') is None:
+        return None
+    if 'workload' in data:
+        if data['workload'].get('seed') is None:
+            return None
+        tasks = {'workload': data['workload']}
+    else:
+        tasks = {'tasks': [{
+            'task_type': task_data.get('task_type', 'browser'),
+            'arrival_time': float(task_data.get('arrival_time', 0)),
+            'name': task_data.get('name'),
+            'cpu_burst': task_data.get('cpu_burst'),
+            'dependencies': list(task_data.get('dependencies') or [])
+        } for task_data in data.get('tasks', [])]}
+    
+    cores = [core_config.get('core_type', 'P') for core_config in data['cores']]
+    return cache_key(kind, {'cores': cores, **tasks, 'seed': data.get('seed'), 'jitter': data.get('jitter'),
+                            **options})
+
+def get_cached_result(key):
+    """取得快取結果；結果引用的軌跡已被刪除時視為未命中"""
+    if key is None:
+        return None
+    result = result_cache.get(key)
+    if result is not None and result.get('trace_id') and not trace_exists(result['trace_id']):
+        result_cache.discard(key)
+        return None
+    return result
+
+def compute_offline_schedule(data, cores):
+    """執行離線排程，回傳 {schedule, summary}"""
+    tasks = build_tasks(build_workload_tasks(data))
     
     # Create scheduler and execute
     scheduler = Scheduler(cores, tasks)
@@ -570,13 +1042,38 @@ def execute_scheduling():
     elif data['strategy'] == 'EAS':
         schedule = scheduler.eas_schedule()
     else:
-        return jsonify({'error': 'Invalid strategy'})
+        raise ValueError('Invalid strategy')
     
-    # Start simulation in background thread
-    thread = threading.Thread(target=simulate_execution, args=(schedule, cores))
-    thread.start()
+    return {'schedule': schedule, 'summary': summarize_schedule(schedule, cores, tasks)}
+
+@app.route('/api/execute', methods=['POST'])
+def execute_scheduling():
+    data = request.json
     
-    return jsonify({'status': 'started', 'schedule': schedule})
+    cores = build_cores(data['cores'])
+    
+    # 離線排程只取決於核心、任務與策略，相同請求直接使用快取的排程
+    key = request_cache_key('execute', data, strategy=data.get('strategy'))
+    result = get_cached_result(key)
+    cached = result is not None
+    if not cached:
+        try:
+            result = server_mode.run_blocking(compute_offline_schedule, data, cores)
+        except ValueError as e:
+            # 例如相依任務不存在或循環相依
+            return jsonify({'error': str(e)})
+        
+        if key is not None:
+            result_cache.put(key, result)
+    
+    # Start simulation in the session worker pool
+    try:
+        session = session_manager.submit('schedule', simulate_execution, result['schedule'], cores,
+                                         sid=data.get('socket_id'))
+    except SessionRejected as e:
+        return jsonify({'error': str(e)}), 429
+    
+    return jsonify({'status': 'started', 'session_id': session.session_id, 'cached': cached, **result})
 
 @app.route('/api/execute_realtime', methods=['POST'])
 def execute_realtime_scheduling():
@@ -586,62 +1083,269 @@ def execute_realtime_scheduling():
     # Get max simulation time from request, default to 60 seconds
     max_simulation_time = data.get('max_simulation_time', 60)
     
-    # Create cores
-    cores = []
-    for i, core_config in enumerate(data['cores']):
-        core = Core(
-            core_id=i,
-            core_type=core_config.get('core_type', 'P')
-        )
-        cores.append(core)
+    # 'full': 每個 tick 送出完整核心狀態；'delta': keyframe + 差量畫格
+    protocol = data.get('protocol', 'full')
+    frame_rate = data.get('frame_rate')
+    if protocol not in ('full', 'delta'):
+        return jsonify({'error': f'Invalid protocol: {protocol}'}), 400
+    if frame_rate is not None and (not isinstance(frame_rate, (int, float)) or frame_rate <= 0):
+        return jsonify({'error': f'Invalid frame rate: {frame_rate}'}), 400
     
-    # Create tasks
-    tasks = []
-    for i, task_data in enumerate(data['tasks']):
-        task_type = task_data.get('task_type', 'browser')
-        arrival_time = task_data.get('arrival_time', 0)
-        custom_name = task_data.get('name')
-        
-        task_config = get_task_config(task_type, custom_name, arrival_time)
-        
-        task = Task(
-            task_id=i,
-            name=task_config['name'],
-            task_type=task_type,
-            arrival_time=task_config['arrival_time'],
-            deadline=task_config['deadline'],
-            priority_class=task_config['priority_class'],
-            thread_priority=task_config['thread_priority'],
-            instruction_mix=task_config['instruction_mix'],
-            cpu_burst=task_config['cpu_burst'],
-            io_wait=task_config['io_wait'],
-            realtime=task_config['realtime'],
-            affinity_hint=task_config['affinity_hint'],
-            dependencies=task_data.get('dependencies', [])
-        )
-        task.assigned = False
-        tasks.append(task)
-      # Create scheduler
-    scheduler = Scheduler(cores, tasks)
+    try:
+        scheduler = build_realtime_scheduler(data)
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
     
     # Start real-time simulation
-    thread = threading.Thread(target=simulate_realtime_execution, args=(scheduler, max_simulation_time))
-    thread.start()
+    try:
+        recorder = create_trace_recorder(scheduler, data, 'tick') if data.get('record_trace') else None
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    live = create_live_control(scheduler, bool(data.get('open_system', False)), recorder is not None)
+    try:
+        # 在佇列中就被取消時模擬不會執行，由 on_skip 刪除還沒有資料的軌跡
+        session = session_manager.submit('realtime', simulate_realtime_execution, scheduler,
+                                         max_simulation_time, protocol, frame_rate, recorder,
+                                         bool(data.get('profile', False)), live, sid=data.get('socket_id'),
+                                         on_skip=recorder.discard if recorder else None)
+    except SessionRejected as e:
+        if recorder is not None:
+            recorder.discard()
+        return jsonify({'error': str(e)}), 429
+    session.live = live
+    
+    return jsonify({'status': 'started', 'session_id': session.session_id,
+                    'trace_id': recorder.trace_id if recorder else None,
+                    'message': 'Real-time scheduling started', 'max_time': max_simulation_time})
+
+@app.route('/api/execute_headless', methods=['POST'])
+def execute_headless_scheduling():
+    """無畫面快轉模擬API：不等待實際時間，直接回傳最終統計"""
+    data = request.json
+    
+    max_simulation_time = data.get('max_simulation_time', 60)
+    
+    try:
+        result, cached = run_cached_headless(data, max_simulation_time, data.get('engine', 'event'),
+                                             data.get('record_trace', False))
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)})
     
-    return jsonify({'status': 'started', 'message': 'Real-time scheduling started', 'max_time': max_simulation_time})
+    return jsonify({'status': 'completed', 'cached': cached, **result})
 
-def simulate_execution(schedule, cores):
+@app.route('/api/cache', methods=['GET'])
+def get_cache_stats():
+    return jsonify(result_cache.stats())
+
+@app.route('/api/cache', methods=['DELETE'])
+def clear_cache():
+    result_cache.clear()
+    return jsonify({'status': 'cleared'})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """實時迴圈與 session 的指標 (Prometheus text format)"""
+    states = {}
+    for session in session_manager.list():
+        states[session.state] = states.get(session.state, 0) + 1
+    sessions = ('scheduler_sessions', 'gauge', 'Simulation sessions by state.',
+                [({'state': state}, count) for state, count in sorted(states.items())])
+    return loop_metrics.render([sessions]), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/api/sweep', methods=['POST'])
+def execute_sweep():
+    """
+    參數掃描API：策略 × 核心組合 × 工作負載，分散到多個行程執行
+    帶 socket_id 時在背景 session 執行，逐批送出 sweep_result 事件，最後送出 sweep_complete；
+    否則同步回傳全部結果與彙整表
+    """
+    data = request.json
+    
+    try:
+        expand_sweep(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if data.get('socket_id'):
+        try:
+            session = session_manager.submit('sweep', simulate_sweep, data, sid=data['socket_id'])
+        except SessionRejected as e:
+            return jsonify({'error': str(e)}), 429
+        return jsonify({'status': 'started', 'session_id': session.session_id})
+    
+    try:
+        result = run_parameter_sweep(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'status': 'completed', **result})
+
+@app.route('/api/replicas', methods=['POST'])
+def execute_replicas():
+    """
+    Monte Carlo replica API：同一情境以不同的衍生 seed 執行多次，回傳指標的平均與信賴區間
+    帶 socket_id 時在背景 session 執行，每納入一個 replica 送出 replica_result 事件，最後送出 replicas_complete；
+    否則同步回傳結果
+    """
+    data = request.json
+    
+    try:
+        options = validate_replica_spec(data)
+        build_realtime_scheduler(replica_scenario(data['scenario'], options['seed'], 0))
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if data.get('socket_id'):
+        try:
+            session = session_manager.submit('replicas', simulate_replicas, data, sid=data['socket_id'])
+        except SessionRejected as e:
+            return jsonify({'error': str(e)}), 429
+        return jsonify({'status': 'started', 'session_id': session.session_id})
+    
+    try:
+        result = server_mode.run_blocking(run_replicas, data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'status': 'completed', **result})
+
+@app.route('/api/traces', methods=['GET'])
+def get_traces():
+    """列出已記錄的模擬軌跡"""
+    return jsonify({'traces': list_traces(TRACE_DIR)})
+
+def trace_exists(trace_id):
+    return trace_id.isalnum() and os.path.exists(os.path.join(TRACE_DIR, trace_id, 'meta.json'))
+
+def open_trace(trace_id):
+    """依 trace_id 開啟軌跡 (不存在時回傳 None)"""
+    if not trace_exists(trace_id):
+        return None
+    return TraceReader(os.path.join(TRACE_DIR, trace_id))
+
+@app.route('/api/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    reader = open_trace(trace_id)
+    if reader is None:
+        return jsonify({'error': 'Trace not found'}), 404
+    return jsonify(reader.summary())
+
+@app.route('/api/traces/<trace_id>/window', methods=['GET'])
+def get_trace_window(trace_id):
+    """
+    回放軌跡的時間區間：?start=&end=&max_points=&fields=temp,power&max_events=
+    取樣數超過 max_points 時降採樣，不需重新執行排程
+    """
+    reader = open_trace(trace_id)
+    if reader is None:
+        return jsonify({'error': 'Trace not found'}), 404
+    
+    try:
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        max_points = request.args.get('max_points', 1000, type=int)
+        max_events = request.args.get('max_events', 1000, type=int)
+        fields = request.args.get('fields')
+        window = reader.window(start, end, max_points, fields.split(',') if fields else None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    window['events'] = reader.event_window(start, end, max_events)
+    return jsonify(window)
+
+@app.route('/api/sessions', methods=['GET'])
+def list_sessions():
+    """列出目前的模擬 session"""
+    return jsonify({'sessions': [session.to_dict() for session in session_manager.list()]})
+
+@app.route('/api/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    session = session_manager.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    return jsonify(session.to_dict())
+
+@app.route('/api/sessions/<session_id>/<action>', methods=['POST'])
+def control_session(session_id, action):
+    """暫停 / 繼續 / 取消模擬"""
+    session = session_manager.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    if action == 'cancel':
+        changed = session.cancel()
+    elif action == 'pause':
+        changed = session.pause()
+    elif action == 'resume':
+        changed = session.resume()
+    else:
+        return jsonify({'error': f'Invalid action: {action}'}), 400
+    
+    return jsonify({'changed': changed, **session.to_dict()})
+
+@app.route('/api/sessions/<session_id>/tasks', methods=['POST'])
+def inject_session_tasks(session_id):
+    """在執行中的實時模擬插入任務：{"tasks": [...]}，回傳分配的 task_id"""
+    body, status = live_request(session_id, 'inject', request.json)
+    return jsonify(body), status
+
+@app.route('/api/sessions/<session_id>/tasks', methods=['DELETE'])
+def cancel_session_tasks(session_id):
+    """取消執行中實時模擬的任務：{"task_ids": [...]}"""
+    body, status = live_request(session_id, 'cancel', request.json)
+    return jsonify(body), status
+
+@app.route('/api/sessions/<session_id>/cores', methods=['POST'])
+def reconfigure_session_cores(session_id):
+    """變更執行中實時模擬的核心：{"add": [核心設定], "offline": [core_id], "online": [core_id]}"""
+    body, status = live_request(session_id, 'cores', request.json)
+    return jsonify(body), status
+
+@socketio.on('join_session')
+def handle_join_session(data):
+    """讓 client 訂閱某個 session 的事件 (例如重新連線後)"""
+    session = session_manager.get(data.get('session_id'))
+    if session is None:
+        emit('simulation_error', {'error': 'Session not found', 'session_id': data.get('session_id')})
+        return
+    join_room(session.room)
+    if session.stream is not None:
+        session.stream.request_keyframe()
+
+@socketio.on('inject_tasks')
+def handle_inject_tasks(data):
+    """執行中插入任務 (回傳值作為 ack)"""
+    return live_request(data.get('session_id'), 'inject', data)[0]
+
+@socketio.on('cancel_tasks')
+def handle_cancel_tasks(data):
+    return live_request(data.get('session_id'), 'cancel', data)[0]
+
+@socketio.on('reconfigure_cores')
+def handle_reconfigure_cores(data):
+    return live_request(data.get('session_id'), 'cores', data)[0]
+
+@socketio.on('leave_session')
+def handle_leave_session(data):
+    session = session_manager.get(data.get('session_id'))
+    if session is not None:
+        session_manager.leave(session, request.sid)
+
+def simulate_execution(schedule, cores, session=None):
     """Simulate the execution and emit real-time updates"""
+    emit = session_manager.emitter(session) if session else socketio.emit
     for step in schedule:
+        if session and not session.checkpoint():
+            break
+        
         # Emit core state update
-        socketio.emit('core_update', {
+        emit('core_update', {
             'core_id': step['core_id'],
             'status': 'running',
             'task': step['task']
         })
         
         # Simulate execution time
-        time.sleep(min(step['duration'], 2))  # Cap at 2 seconds for demo
+        socketio.sleep(min(step['duration'], 2))  # Cap at 2 seconds for demo
         
         # Update core statistics
         core = cores[step['core_id']]
@@ -649,7 +1353,7 @@ def simulate_execution(schedule, cores):
         core.total_power_consumption += core.power_coefficient * step['duration']
         
         # Emit completion
-        socketio.emit('core_update', {
+        emit('core_update', {
             'core_id': step['core_id'],
             'status': 'idle',
             'task': None
@@ -664,119 +1368,382 @@ def simulate_execution(schedule, cores):
             'total_power_consumption': core.total_power_consumption
         })
     
-    socketio.emit('simulation_complete', {'statistics': stats})
+    emit('simulation_complete', {'statistics': stats,
+                                 'cancelled': bool(session and session.cancelled)})
 
-def simulate_realtime_execution(scheduler, max_simulation_time=60):
-    """實時模擬執行"""
-    current_time = 0
-    time_step = 0.1  # 100ms time steps
-    simulation_timeout = False
+def simulate_realtime_execution(scheduler, max_simulation_time=60, protocol='full', frame_rate=None,
+                                recorder=None, profile=False, live=None, session=None):
+    """
+    實時模擬執行
+    protocol: 'full' 每個 tick 送出完整狀態，'delta' 以 CoreStateStream 送出差量畫格
+    recorder: TraceRecorder，記錄每個 tick 的核心狀態供之後回放
+    profile: 每秒送出 loop_profile 事件 (各階段耗時、決策數、送出位元組數與佇列深度)
+    live: LiveControl，接受執行中插入/取消任務與核心變更
+    """
+    emit = session_manager.emitter(session) if session else socketio.emit
+    profiler = loop_metrics.profiler(emit if profile else None)
+    if profiler is not None:
+        emit = profiler.wrap_emit(emit)
+    stream = None
+    if protocol == 'delta':
+        stream = CoreStateStream(emit, max_simulation_time, frame_rate)
+        if session:
+            session.stream = stream
+    try:
+        result = run_realtime_loop(scheduler, max_simulation_time, emit=emit, pace=True, session=session,
+                                   stream=stream, recorder=recorder, profiler=profiler, live=live)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        loop_metrics.release(profiler)
+    if recorder is not None:
+        result['trace_id'] = recorder.trace_id
+    if profile:
+        result['profile'] = profiler.summary()
     
-    # 統計資料
-    stats = {
+    # 發送模擬完成
+    emit('simulation_complete', result)
+
+def simulate_sweep(spec, session=None):
+    """背景執行參數掃描，每完成一批即送出結果"""
+    emit = session_manager.emitter(session) if session else socketio.emit
+    result = run_parameter_sweep(spec, on_batch=lambda rows: emit('sweep_result', {'results': rows}),
+                                 session=session)
+    emit('sweep_complete', result)
+
+def simulate_replicas(spec, session=None):
+    """背景執行 Monte Carlo replica，每納入一個 replica 即送出結果與目前的估計"""
+    emit = session_manager.emitter(session) if session else socketio.emit
+    result = run_replicas(spec, session=session,
+                          on_replica=lambda row, summary: emit('replica_result', {'replica': row, 'metrics': summary}))
+    emit('replicas_complete', result)
+
+def run_headless_simulation(scheduler, max_simulation_time=60, engine='event', record_trace=False):
+    """
+    無畫面快轉模擬，不發送事件也不等待實際時間
+    engine: 'event' 使用離散事件引擎，'tick' 使用與實時模式相同的逐 tick 迴圈
+    record_trace: 記錄模擬軌跡，結果中附上 trace_id
+    """
+    if engine not in ('tick', 'event'):
+        raise ValueError(f"Unsupported engine: {engine}")
+    
+    recorder = create_trace_recorder(scheduler, {'max_simulation_time': max_simulation_time}, engine) \
+        if record_trace else None
+    try:
+        if engine == 'tick':
+            result = run_realtime_loop(scheduler, max_simulation_time, emit=None, pace=False, recorder=recorder)
+        else:
+            result = run_event_driven_simulation(scheduler, max_simulation_time, recorder)
+    finally:
+        if recorder is not None:
+            recorder.close()
+    
+    if recorder is not None:
+        result['trace_id'] = recorder.trace_id
+    return result
+
+def run_cached_headless(data, max_simulation_time=60, engine='event', record_trace=False):
+    """快轉模擬，相同的請求直接回傳快取的統計 (與軌跡 trace_id)；回傳 (結果, 是否命中快取)"""
+    key = request_cache_key('headless', data, max_simulation_time=max_simulation_time, engine=engine,
+                            vectorized=bool(data.get('vectorized', False)), record_trace=bool(record_trace),
+                            preemptive=preemptive_options(data), load_balance=load_balance_options(data),
+                            thermal=thermal_options(data))
+    result = get_cached_result(key)
+    if result is not None:
+        return result, True
+    
+    result = server_mode.run_blocking(
+        lambda: run_headless_simulation(build_realtime_scheduler(data), max_simulation_time, engine, record_trace))
+    if key is not None:
+        result_cache.put(key, result)
+    return result, False
+
+def create_live_control(scheduler, open_system=False, recording=False):
+    """
+    實時 session 的 LiveControl：插入的任務放在自己的任務表，新增的核心沿用核心模板
+    recording: 記錄軌跡中 (不允許新增核心)
+    """
+    tables = TaskTablePool()
+    return LiveControl(scheduler,
+                       lambda config, task_id: build_task(config, task_id, tables.table()),
+                       lambda config, core_id: Core(core_id, config.get('core_type', 'P')),
+                       open_system, recording)
+
+def live_request(session_id, action, data):
+    """
+    執行中實時模擬的變更請求 (HTTP 與 socket 事件共用)
+    回傳 (回應內容, HTTP 狀態碼)；變更在下一個 tick 套用後送出 live_update 事件
+    """
+    session = session_manager.get(session_id)
+    if session is None:
+        return {'error': 'Session not found'}, 404
+    if session.live is None:
+        return {'error': 'Session does not accept live updates'}, 400
+    if session.finished:
+        return {'error': f'Session already {session.state}'}, 409
+    
+    data = data or {}
+    try:
+        if action == 'inject':
+            task_ids = session.live.submit_tasks(data.get('tasks'), lambda config: build_task(config, 0, TaskTable()))
+            return {'status': 'queued', 'task_ids': task_ids}, 200
+        if action == 'cancel':
+            session.live.submit_cancel(data.get('task_ids'))
+            return {'status': 'queued'}, 200
+        core_ids = session.live.submit_cores(data.get('add') or [], data.get('offline') or [],
+                                             data.get('online') or [])
+        return {'status': 'queued', 'core_ids': core_ids}, 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+def create_trace_recorder(scheduler, data, engine):
+    """建立模擬軌跡記錄器 (需要 numpy)"""
+    return TraceRecorder(TRACE_DIR, scheduler.cores, info={
+        'engine': engine,
+        'max_simulation_time': data.get('max_simulation_time', 60)
+    })
+
+def run_event_driven_simulation(scheduler, max_simulation_time=60, recorder=None):
+    """
+    離散事件模擬：只處理到達/完成/溫度/DVFS 事件，事件間以封閉式累加
+    recorder: 只在事件 tick 與快轉區段結束時取樣 (之間的溫度為線性變化)
+    """
+    simulator = EventDrivenSimulator(scheduler, max_simulation_time, recorder=recorder)
+    stats, current_time, simulation_timeout = simulator.run(create_simulation_stats(scheduler))
+    
+    if simulation_timeout:
+        stop_all_cores(scheduler)
+    
+    final_stats = calculate_final_statistics(scheduler, stats, current_time, simulation_timeout)
+    
+    return {
+        'total_time': current_time,
+        'timeout': simulation_timeout,
+        'statistics': final_stats,
+        'message': 'Simulation completed due to timeout' if simulation_timeout else 'All tasks completed',
+        'events_processed': simulator.events_processed,
+        'ticks_skipped': simulator.ticks_skipped
+    }
+
+# 實時模擬中每隔多少模擬秒發送一次 task_metrics_update
+TASK_METRICS_INTERVAL = 1.0
+
+def count_new_assignments(assignments):
+    """第一次分配的任務數 (搶佔後恢復執行的任務不重複計算)"""
+    return sum(1 for assignment in assignments if not assignment.get('resumed'))
+
+def create_simulation_stats(scheduler):
+    """建立模擬統計資料"""
+    return {
         'tasks_completed': 0,
         'tasks_assigned': 0,
-        'total_tasks': len(scheduler.tasks),
+        'total_tasks': scheduler.total_task_count(),
         'core_utilization': {core.core_id: {'active_time': 0, 'idle_time': 0} for core in scheduler.cores},
         'avg_temperature': 0,
         'total_power_consumed': 0,
-        'thermal_throttling_events': 0
+        'thermal_throttling_events': 0,
+        'tasks_cancelled': 0,
+        'task_metrics': TaskMetrics()
     }
+
+def stop_all_cores(scheduler):
+    """強制停止所有核心"""
+    for core in scheduler.cores:
+        if core.active:
+            core.active = False
+            core.current_task = None
+            if hasattr(core, 'task_time_left'):
+                delattr(core, 'task_time_left')
+            if hasattr(core, 'task_start_time'):
+                delattr(core, 'task_start_time')
+
+def run_realtime_loop(scheduler, max_simulation_time=60, emit=None, pace=True, session=None, stream=None,
+                      recorder=None, profiler=None, live=None):
+    """
+    實時調度主迴圈
+    emit: 事件發送函式 (None 表示不發送)
+    pace: 是否每個 time step 依實際時間等待
+    session: 所屬的 SimulationSession，每個 tick 檢查暫停/取消
+    stream: CoreStateStream，提供時改以差量畫格發送 (取代 emit 的逐 tick 事件)
+    recorder: TraceRecorder，記錄每個 tick 的核心狀態與任務事件
+    profiler: LoopProfiler，記錄每個 tick 各階段的耗時 (None 表示不記錄)
+    live: LiveControl，每個 tick 開始時套用排入的任務/核心變更
+    """
+    current_time = 0
+    time_step = 0.1  # 100ms time steps
+    tick = 0  # 以整數 tick 計時，避免浮點累加誤差
+    simulation_timeout = False
+    cancelled = False
+    
+    # 統計資料
+    stats = create_simulation_stats(scheduler)
+    task_metrics = stats['task_metrics']
+    metrics_ticks = max(1, round(TASK_METRICS_INTERVAL / time_step))
+    next_tick_at = time.monotonic() + time_step
     
     while current_time < max_simulation_time:
+        if session is not None and not session.checkpoint():
+            cancelled = True
+            break
+        if profiler is not None:
+            profiler.start_tick()
+        
+        # 套用執行中的任務/核心變更
+        if live is not None:
+            for update in live.apply(current_time, stats):
+                if emit:
+                    emit('live_update', update)
+        
         # 分配新任務
-        assignments = scheduler.basic_idle_first_scheduler(current_time)
+        assignments = scheduler.dispatch(current_time)
         
         # 發送任務分配更新
         if assignments:
-            stats['tasks_assigned'] += len(assignments)
-            for assignment in assignments:
-                socketio.emit('task_assigned', assignment)
+            stats['tasks_assigned'] += count_new_assignments(assignments)
+            if emit and stream is None:
+                for assignment in assignments:
+                    emit('task_assigned', assignment)
+        if profiler is not None:
+            profiler.lap('schedule')
         
         # 更新核心狀態
         completed_tasks = scheduler.update_cores(time_step)
+        if profiler is not None:
+            profiler.lap('update_cores')
         
         # 更新統計資料
         stats['tasks_completed'] += len(completed_tasks)
+        task_metrics.record(assignments, completed_tasks, current_time)
+        if scheduler.task_stream is not None:
+            stats['total_tasks'] = scheduler.total_task_count()
         
         # 計算核心利用率和統計
-        total_temp = 0
-        total_power = 0
-        for core in scheduler.cores:
-            if core.active:
-                stats['core_utilization'][core.core_id]['active_time'] += time_step
-            else:
-                stats['core_utilization'][core.core_id]['idle_time'] += time_step
-                
-            total_temp += core.temp
-            total_power += core.power
-            
-            if core.thermal_throttling:
-                stats['thermal_throttling_events'] += 1
+        record_tick_stats(scheduler, stats, time_step)
         
-        stats['avg_temperature'] = total_temp / len(scheduler.cores)
-        stats['total_power_consumed'] += total_power * time_step
+        if recorder is not None:
+            recorder.record(current_time, scheduler.cores, assignments, completed_tasks)
+        if profiler is not None:
+            profiler.lap('stats')
         
-        # 發送核心狀態更新
-        core_states = []
-        for core in scheduler.cores:
-            state = {
-                'core_id': core.core_id,
-                'active': core.active,
-                'load': round(core.load * 100, 1),
-                'temp': round(core.temp, 1),
-                'freq': round(core.dvfs_freq, 2),
-                'power': round(core.power, 2),
-                'thermal_throttling': core.thermal_throttling,
-                'current_task': core.current_task.name if core.current_task else None,
-                'task_time_left': getattr(core, 'task_time_left', 0)
-            }
-            core_states.append(state)
-        
-        socketio.emit('core_states_update', {
-            'cores': core_states, 
-            'time': current_time,
-            'remaining_time': max_simulation_time - current_time
-        })
-        
-        # 發送任務完成更新
-        for task in completed_tasks:
-            socketio.emit('task_completed', {
-                'task_id': task.task_id,
-                'task_name': task.name,
-                'completion_time': current_time
+        if stream is not None:
+            stream.push(scheduler.cores, current_time, assignments, completed_tasks)
+        elif emit:
+            # 發送核心狀態更新
+            core_states = []
+            for core in scheduler.cores:
+                state = {
+                    'core_id': core.core_id,
+                    'active': core.active,
+                    'load': round(core.load * 100, 1),
+                    'temp': round(core.temp, 1),
+                    'freq': round(core.dvfs_freq, 2),
+                    'power': round(core.power, 2),
+                    'thermal_throttling': core.thermal_throttling,
+                    'current_task': core.current_task.name if core.current_task else None,
+                    'task_time_left': getattr(core, 'task_time_left', 0)
+                }
+                core_states.append(state)
+            
+            emit('core_states_update', {
+                'cores': core_states, 
+                'time': current_time,
+                'remaining_time': max_simulation_time - current_time
             })
+            
+            # 發送任務完成更新
+            for task in completed_tasks:
+                emit('task_completed', {
+                    'task_id': task.task_id,
+                    'task_name': task.name,
+                    'completion_time': current_time
+                })
+        
+        if emit and tick % metrics_ticks == 0:
+            emit('task_metrics_update', {'time': current_time, **task_metrics.summary()})
+        
+        if profiler is not None:
+            profiler.lap('payload')
+            profiler.end_tick(len(assignments), queue_depths(scheduler))
+            if (tick + 1) % metrics_ticks == 0:
+                if session is not None:
+                    profiler.sample_transport(session.broadcaster.queue_depth())
+                if profiler.report_emit is not None:
+                    profiler.report_emit('loop_profile', {'time': current_time, **profiler.window()})
         
-        # 檢查是否所有任務都完成
-        if all(hasattr(task, 'completed') and task.completed for task in scheduler.tasks):
+        # 檢查是否所有任務都完成 (開放系統持續執行到時間上限)
+        if stats['tasks_completed'] + stats['tasks_cancelled'] >= stats['total_tasks'] and \
+                scheduler.all_tasks_released() and (live is None or not live.open_system):
             break
             
-        current_time += time_step
-        time.sleep(time_step)  # 實際等待時間
+        tick += 1
+        current_time = round(tick * time_step, 9)
+        if pace:
+            # 依實際時間等待 (socketio.sleep 在協作式模式下會讓出給其他模擬與連線)
+            # 以絕對期限計時，計算時間不會累積成漂移；落後時 (例如暫停後) 重新對齊
+            delay = next_tick_at - time.monotonic()
+            socketio.sleep(max(delay, 0))
+            next_tick_at = next_tick_at + time_step if delay > -time_step else time.monotonic() + time_step
     
     # 檢查是否因為時間限制而結束
     if current_time >= max_simulation_time:
         simulation_timeout = True
-        # 強制停止所有核心
-        for core in scheduler.cores:
-            if core.active:
-                core.active = False
-                core.current_task = None
-                if hasattr(core, 'task_time_left'):
-                    delattr(core, 'task_time_left')
-                if hasattr(core, 'task_start_time'):
-                    delattr(core, 'task_start_time')
+        stop_all_cores(scheduler)
+    elif cancelled:
+        stop_all_cores(scheduler)
+    
+    if stream is not None:
+        stream.flush(scheduler.cores, current_time)
+    
+    if scheduler.core_bank is not None:
+        scheduler.core_bank.flush_utilization(stats)
     
     # 計算最終統計
     final_stats = calculate_final_statistics(scheduler, stats, current_time, simulation_timeout)
     
-    # 發送模擬完成
-    socketio.emit('simulation_complete', {
+    if cancelled:
+        message = 'Simulation cancelled'
+    elif simulation_timeout:
+        message = 'Simulation completed due to timeout'
+    else:
+        message = 'All tasks completed'
+    
+    return {
         'total_time': current_time,
         'timeout': simulation_timeout,
+        'cancelled': cancelled,
         'statistics': final_stats,
-        'message': 'Simulation completed due to timeout' if simulation_timeout else 'All tasks completed'
-    })
+        'message': message
+    }
+
+def queue_depths(scheduler):
+    """已到達但尚未分配的任務數與各核心 run queue 中等待的任務數"""
+    return {
+        'ready': len(scheduler.ready_queue) if scheduler.ready_queue is not None else 0,
+        'run_queue': scheduler.preemptive.waiting_tasks() if scheduler.preemptive is not None else 0
+    }
+
+def record_tick_stats(scheduler, stats, time_step):
+    """累加一個 tick 的核心利用率、溫度、功耗與限速統計"""
+    if scheduler.core_bank is not None:
+        total_temp, total_power, throttled = scheduler.core_bank.record_tick(time_step)
+        stats['thermal_throttling_events'] += throttled
+    else:
+        total_temp = 0
+        total_power = 0
+        for core in scheduler.cores:
+            if core.active:
+                stats['core_utilization'][core.core_id]['active_time'] += time_step
+            else:
+                stats['core_utilization'][core.core_id]['idle_time'] += time_step
+                
+            total_temp += core.temp
+            total_power += core.power
+            
+            if core.thermal_throttling:
+                stats['thermal_throttling_events'] += 1
+    
+    stats['avg_temperature'] = total_temp / len(scheduler.cores)
+    stats['total_power_consumed'] += total_power * time_step
 
 def calculate_final_statistics(scheduler, stats, total_time, timeout):
     """計算最終統計資料"""
@@ -809,17 +1776,315 @@ def calculate_final_statistics(scheduler, stats, total_time, timeout):
         'timeout_occurred': timeout,
         'tasks_completed': stats['tasks_completed'],
         'tasks_assigned': stats['tasks_assigned'],
+        'tasks_cancelled': stats['tasks_cancelled'],
         'total_tasks': stats['total_tasks'],
-        'completion_rate': round((stats['tasks_completed'] / stats['total_tasks']) * 100, 2),
+        'completion_rate': round((stats['tasks_completed'] / stats['total_tasks']) * 100, 2) if stats['total_tasks'] > 0 else 0,
         'avg_system_temperature': round(stats['avg_temperature'], 1),
         'total_system_power': round(stats['total_power_consumed'], 2),
         'thermal_throttling_events': stats['thermal_throttling_events']
     }
     
-    return {
+    final = {
         'cores': final_stats,
-        'global': global_stats
+        'global': global_stats,
+        'tasks': stats['task_metrics'].summary()
+    }
+    if scheduler.preemptive is not None:
+        final['preemption'] = scheduler.preemptive.summary()
+    if scheduler.thermal_model is not None:
+        final['thermal'] = scheduler.thermal_model.summary()
+    return final
+
+# 參數掃描 worker 行程中的共用資料 (核心組合與工作負載只在建立行程時傳送一次)
+_sweep_context = None
+
+def init_sweep_worker(core_mixes, workloads, max_simulation_time, engine):
+    """ProcessPoolExecutor 的 initializer"""
+    global _sweep_context
+    _sweep_context = (core_mixes, workloads, max_simulation_time, engine)
+
+def run_sweep_case(strategy, core_configs, task_configs, max_simulation_time=60, engine='event'):
+    """執行單一掃描案例，回傳完成時間、能耗與錯過截止時間數"""
+    started = time.perf_counter()
+    if strategy_family(strategy) == 'realtime':
+        scheduler = build_realtime_scheduler({'cores': core_configs, 'tasks': task_configs, 'strategy': strategy})
+        result = run_headless_simulation(scheduler, max_simulation_time, engine)
+        global_stats = result['statistics']['global']
+        metrics = {
+            'makespan': global_stats['simulation_time'],
+            'total_energy': global_stats['total_system_power'],
+            'deadline_misses': result['statistics']['tasks']['overall']['deadline_misses'],
+            'tasks_completed': global_stats['tasks_completed'],
+            'timeout': result['timeout']
+        }
+    else:
+        cores = build_cores(core_configs)
+        tasks = build_tasks(task_configs)
+        scheduler = Scheduler(cores, tasks)
+        if strategy == 'EDF':
+            schedule = scheduler.edf_schedule()
+        elif strategy == 'HEFT':
+            schedule = scheduler.heft_schedule()
+        else:
+            schedule = scheduler.eas_schedule()
+        summary = summarize_schedule(evaluate_schedule(schedule, cores, tasks), cores, tasks)
+        metrics = {
+            'makespan': summary['makespan'],
+            'total_energy': summary['total_energy'],
+            'deadline_misses': summary['deadline_misses'],
+            'tasks_completed': summary['tasks_scheduled'],
+            'timeout': False
+        }
+    metrics['elapsed'] = round(time.perf_counter() - started, 4)
+    return metrics
+
+def run_sweep_batch(batch):
+    """在 worker 行程中執行一批 (case_index, (strategy, mix_index, workload_index))"""
+    core_mixes, workloads, max_simulation_time, engine = _sweep_context
+    rows = []
+    for case_index, (strategy, mix_index, workload_index) in batch:
+        mix_label, core_configs = core_mixes[mix_index]
+        workload_name, task_configs = workloads[workload_index]
+        row = {'case': case_index, 'strategy': strategy, 'family': strategy_family(strategy),
+               'core_mix': mix_label, 'workload': workload_name}
+        try:
+            row.update(run_sweep_case(strategy, core_configs, task_configs, max_simulation_time, engine))
+        except ValueError as e:
+            row['error'] = str(e)
+        rows.append(row)
+    return rows
+
+def run_parameter_sweep(spec, on_batch=None, session=None):
+    """
+    以 ProcessPoolExecutor 平行執行參數掃描
+    spec: strategies / core_mixes / workloads，以及選用的 max_simulation_time、engine、max_workers、batch_size
+    on_batch: 每完成一批時以該批結果呼叫
+    """
+    strategies, core_mixes, workloads, cases = expand_sweep(spec)
+    max_simulation_time = spec.get('max_simulation_time', 60)
+    engine = spec.get('engine', 'event')
+    if engine not in ('event', 'tick'):
+        raise ValueError(f"Unsupported engine: {engine}")
+    max_workers = spec.get('max_workers') or os.cpu_count() or 1
+    batches = make_batches(cases, spec.get('batch_size', DEFAULT_BATCH_SIZE), max_workers)
+    
+    rows = []
+    cancelled = False
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_sweep_worker,
+                             initargs=(core_mixes, workloads, max_simulation_time, engine)) as executor:
+        futures = [executor.submit(run_sweep_batch, batch) for batch in batches]
+        for future in as_completed(futures):
+            batch_rows = future.result()
+            rows.extend(batch_rows)
+            if on_batch:
+                on_batch(batch_rows)
+            if session is not None and not session.checkpoint():
+                cancelled = True
+                for pending in futures:
+                    pending.cancel()
+                break
+    
+    rows.sort(key=lambda row: row['case'])
+    return {
+        'cases': len(cases),
+        'completed_cases': len(rows),
+        'cancelled': cancelled,
+        'results': rows,
+        'summary': aggregate_sweep(rows)
+    }
+
+# Monte Carlo replica worker 行程中的共用情境 (只在建立行程時傳送一次)
+_replica_context = None
+
+def init_replica_worker(scenario, base_seed, max_simulation_time, engine):
+    """ProcessPoolExecutor 的 initializer"""
+    global _replica_context
+    _replica_context = (scenario, base_seed, max_simulation_time, engine)
+
+def replica_scenario(scenario, base_seed, replica):
+    """第 replica 個 replica 的情境：由 base_seed 衍生 seed，workload 也改用由該 seed 衍生的 seed"""
+    data = dict(scenario)
+    data['seed'] = replica_seed(base_seed, replica)
+    if 'workload' in data:
+        data['workload'] = {**data['workload'], 'seed': derived_int_seed(rng_streams(data['seed'])['workload'])}
+    return data
+
+def run_replica(replica):
+    """在 worker 行程中執行單一 replica，回傳各指標與是否逾時"""
+    scenario, base_seed, max_simulation_time, engine = _replica_context
+    started = time.perf_counter()
+    data = replica_scenario(scenario, base_seed, replica)
+    result = run_headless_simulation(build_realtime_scheduler(data), max_simulation_time, engine)
+    return {
+        'replica': replica,
+        'seed': data['seed'],
+        **replica_metrics(result['statistics']['global']),
+        'timeout': result['timeout'],
+        'elapsed': round(time.perf_counter() - started, 4)
     }
 
+def run_replicas(spec, on_replica=None, session=None):
+    """
+    以 ProcessPoolExecutor 平行執行同一情境的 Monte Carlo replica，估計指標的平均與信賴區間
+    spec: scenario (格式同 /api/execute_realtime)、replicas (上限)，以及選用的 seed、min_replicas、confidence、
+          relative_tolerance、jitter、max_simulation_time、engine、max_workers
+    結果依 replica 順序納入估計，區間夠窄時提前停止並取消尚未開始的 replica，
+    因此同樣的 seed 不論 worker 數都得到相同的結果
+    on_replica: 每納入一個 replica 時以 (該 replica 結果, 目前的估計) 呼叫
+    """
+    options = validate_replica_spec(spec)
+    scenario = dict(spec['scenario'])
+    if spec.get('jitter') is not None:
+        scenario['jitter'] = spec['jitter']
+    max_simulation_time = spec.get('max_simulation_time', scenario.get('max_simulation_time', 60))
+    engine = spec.get('engine', 'event')
+    if engine not in ('event', 'tick'):
+        raise ValueError(f"Unsupported engine: {engine}")
+    max_workers = spec.get('max_workers') or os.cpu_count() or 1
+    
+    # 情境有誤時在送進 worker 之前回報
+    build_realtime_scheduler(replica_scenario(scenario, options['seed'], 0))
+    
+    estimator = ReplicaEstimator(options['confidence'], options['relative_tolerance'], options['min_replicas'])
+    rows = []
+    settled = False
+    cancelled = False
+    executor = ProcessPoolExecutor(max_workers=max_workers, initializer=init_replica_worker,
+                                   initargs=(scenario, options['seed'], max_simulation_time, engine))
+    try:
+        pending = {}
+        submitted = 0
+        for replica in range(options['replicas']):
+            # 最多預先送出 2 × max_workers 個 replica，提前停止時浪費的計算有上限
+            while submitted < options['replicas'] and submitted - replica < max_workers * 2:
+                pending[submitted] = executor.submit(run_replica, submitted)
+                submitted += 1
+            row = pending.pop(replica).result()
+            rows.append(row)
+            estimator.add(row)
+            if on_replica:
+                on_replica(row, estimator.summary())
+            if session is not None and not session.checkpoint():
+                cancelled = True
+                break
+            if estimator.settled():
+                settled = True
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return {
+        'replicas': len(rows),
+        'max_replicas': options['replicas'],
+        'seed': options['seed'],
+        'confidence': options['confidence'],
+        'relative_tolerance': options['relative_tolerance'],
+        'settled': settled,
+        'cancelled': cancelled,
+        'metrics': estimator.summary(),
+        'results': rows
+    }
+
+def run_replicas_cli(spec_path, output_path=None, max_workers=None):
+    """命令列 Monte Carlo replica：每納入一個 replica 即在 stderr 顯示進度，最後輸出 JSON 結果"""
+    with open(spec_path, encoding='utf-8') as f:
+        spec = json.load(f)
+    if max_workers:
+        spec['max_workers'] = max_workers
+    
+    def report(row, summary):
+        makespan = summary['makespan']
+        print(f"[replicas] #{row['replica']} makespan {makespan['mean']} ± {makespan['half_width']}",
+              file=sys.stderr, flush=True)
+    
+    result = run_replicas(spec, on_replica=report)
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+def run_sweep_cli(spec_path, output_path=None, max_workers=None):
+    """命令列參數掃描：每完成一批即在 stderr 顯示進度，最後輸出 JSON 結果"""
+    with open(spec_path, encoding='utf-8') as f:
+        spec = json.load(f)
+    if max_workers:
+        spec['max_workers'] = max_workers
+    
+    total = len(expand_sweep(spec)[3])
+    done = 0
+    def report(rows):
+        nonlocal done
+        done += len(rows)
+        print(f"[sweep] {done}/{total}", file=sys.stderr, flush=True)
+    
+    result = run_parameter_sweep(spec, on_batch=report)
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+def run_headless_cli(scenario_paths, max_simulation_time=None, output_path=None, engine='event', vectorized=False,
+                     record_trace=False):
+    """命令列快轉模式：依序執行每個情境檔並輸出 JSON 結果"""
+    results = []
+    for path in scenario_paths:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        
+        max_time = max_simulation_time if max_simulation_time is not None else data.get('max_simulation_time', 60)
+        if vectorized:
+            data['vectorized'] = True
+        result, _ = run_cached_headless(data, max_time, engine, record_trace)
+        results.append({'scenario': path, **result})
+    
+    output = json.dumps(results if len(results) > 1 else results[0], ensure_ascii=False, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
 if __name__ == '__main__':
-    socketio.run(app, debug=True, port=5000)
+    parser = argparse.ArgumentParser(description='多核心排程器模擬後端')
+    parser.add_argument('--headless', nargs='+', metavar='SCENARIO',
+                        help='不啟動伺服器，以快轉模式執行情境 JSON 檔 (格式同 /api/execute_realtime)')
+    parser.add_argument('--max-time', type=float, default=None,
+                        help='覆寫情境中的 max_simulation_time')
+    parser.add_argument('--output', default=None, help='結果輸出檔 (預設輸出到 stdout)')
+    parser.add_argument('--engine', choices=['event', 'tick'], default='event',
+                        help='快轉模式使用的模擬引擎 (預設 event)')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='以 NumPy 核心陣列向量化更新核心狀態 (適合大量核心)')
+    parser.add_argument('--record-trace', action='store_true',
+                        help='快轉模式同時記錄模擬軌跡 (可由 /api/traces 回放)')
+    parser.add_argument('--sweep', metavar='SPEC',
+                        help='執行參數掃描 JSON 檔 (格式同 /api/sweep)')
+    parser.add_argument('--replicas', metavar='SPEC',
+                        help='執行 Monte Carlo replica JSON 檔 (格式同 /api/replicas)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='參數掃描與 replica 的行程數 (預設為 CPU 數)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='結果快取的磁碟目錄 (預設只使用記憶體快取)')
+    parser.add_argument('--cache-max-mb', type=float, default=512,
+                        help='磁碟快取大小上限 (MB)，超過時刪除最久未使用的結果')
+    parser.add_argument('--metrics', action='store_true',
+                        help='記錄所有實時模擬迴圈的階段耗時與計數 (由 /api/metrics 取得)')
+    args = parser.parse_args()
+    
+    loop_metrics.enabled = args.metrics
+    if args.cache_dir:
+        result_cache.enable_disk(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+    
+    if args.sweep:
+        run_sweep_cli(args.sweep, args.output, args.workers)
+    elif args.replicas:
+        run_replicas_cli(args.replicas, args.output, args.workers)
+    elif args.headless:
+        run_headless_cli(args.headless, args.max_time, args.output, args.engine, args.vectorized,
+                         args.record_trace)
+    else:
+        socketio.run(app, debug=True, port=5000)
@@ -0,0 +1,89 @@
+# 可合併的事件：client 跟不上時只需要最新狀態 (差量畫格會合併成等價的單一畫格)
+COALESCED_EVENTS = ('core_states_update', 'task_metrics_update')
+
+# client 的傳送佇列超過此封包數時視為落後
+DEFAULT_MAX_BACKLOG = 32
+
+
+def merge_frames(old, new):
+    """
+    合併兩個 core_states_update 畫格 (old 先於 new)
+    差量畫格依 core_id 疊加欄位，期間的任務分配/完成事件依序保留；
+    合併結果與依序套用兩個畫格的效果相同
+    """
+    if old is None or 'keyframe' not in new:
+        return new  # 完整狀態模式只需要最新畫格
+
+    merged = dict(new)
+    merged['assigned'] = old['assigned'] + new['assigned']
+    merged['completed'] = old['completed'] + new['completed']
+    if new['keyframe']:
+        return merged
+
+    key = 'cores' if old['keyframe'] else 'deltas'
+    states = {entry['core_id']: dict(entry) for entry in old[key]}
+    for delta in new['deltas']:
+        states.setdefault(delta['core_id'], {}).update(delta)
+    merged.pop('deltas')
+    merged['keyframe'] = old['keyframe']
+    merged[key] = list(states.values())
+    return merged
+
+
+class SessionBroadcaster:
+    """
+    對 session room 中每個 client 個別發送事件，並依 client 的傳送佇列做 backpressure：
+    佇列過長的 client 暫不送出狀態畫格，改為合併到它自己的待送畫格中，
+    追上後一次送出；任務事件、完成與錯誤事件不會被丟棄，送出前會先送完待送畫格以維持順序
+    """
+
+    def __init__(self, server, room, namespace='/', max_backlog=DEFAULT_MAX_BACKLOG):
+        self.server = server  # socketio.Server
+        self.room = room
+        self.namespace = namespace
+        self.max_backlog = max_backlog
+        self.pending = {}  # sid -> {event: 合併後的資料}
+        self.coalesced = 0  # 因 backpressure 被合併的畫格數
+
+    def backlog(self, eio_sid):
+        """client 尚未送出的封包數"""
+        socket = self.server.eio.sockets.get(eio_sid)
+        return socket.queue.qsize() if socket is not None else 0
+
+    def queue_depth(self):
+        """room 中所有 client 傳送佇列的最大封包數"""
+        return max((self.backlog(eio_sid) for _, eio_sid in self.participants()), default=0)
+
+    def participants(self):
+        try:
+            return list(self.server.manager.get_participants(self.namespace, self.room))
+        except KeyError:
+            return []  # room 中沒有任何 client
+
+    def emit(self, event, data):
+        coalesce = event in COALESCED_EVENTS
+        for sid, eio_sid in self.participants():
+            pending = self.pending.get(sid)
+            if coalesce:
+                lagging = self.backlog(eio_sid) > self.max_backlog
+                if lagging or pending:
+                    pending = self.pending.setdefault(sid, {})
+                    pending[event] = merge_frames(pending.get(event), data) \
+                        if event == 'core_states_update' else data
+                    if lagging:
+                        self.coalesced += 1
+                    else:
+                        self.flush(sid)
+                    continue
+            elif pending:
+                self.flush(sid)
+            self.server.emit(event, data, to=sid, namespace=self.namespace)
+
+    def flush(self, sid):
+        """送出 client 的待送畫格"""
+        for event, data in self.pending.pop(sid, {}).items():
+            self.server.emit(event, data, to=sid, namespace=self.namespace)
+
+    def discard(self, sid):
+        """client 離開 room 時丟棄它的待送畫格"""
+        self.pending.pop(sid, None)
@@ -0,0 +1,183 @@
+try:
+    import numpy as np
+except ImportError:  # numpy 為選用套件，只有向量化模式需要
+    np = None
+
+from thermal_model import over_threshold
+
+
+class BankField:
+    """
+    將核心屬性映射到 CoreBank 陣列的描述器
+    核心尚未接上 CoreBank 時，值存放在一般的 instance dict
+    optional=True 的欄位以 NaN 表示「未設定」，讓 hasattr / delattr 維持原本語意
+    """
+
+    def __init__(self, kind=float, optional=False):
+        self.kind = kind
+        self.optional = optional
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, core, owner=None):
+        if core is None:
+            return self
+        bank = core.__dict__.get('_bank')
+        if bank is None:
+            try:
+                return core.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+
+        value = bank.arrays[self.name][core.bank_index]
+        if self.optional and value != value:  # NaN
+            raise AttributeError(self.name)
+        return self.kind(value)
+
+    def __set__(self, core, value):
+        bank = core.__dict__.get('_bank')
+        if bank is None:
+            core.__dict__[self.name] = value
+        else:
+            bank.arrays[self.name][core.bank_index] = value
+
+    def __delete__(self, core):
+        bank = core.__dict__.get('_bank')
+        if bank is None:
+            try:
+                del core.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+        else:
+            if not self.optional:
+                raise AttributeError(f"{self.name} cannot be deleted")
+            bank.arrays[self.name][core.bank_index] = np.nan
+
+
+class CoreBank:
+    """
+    以 structure-of-arrays 保存所有核心的動態狀態
+    功耗、升溫、冷卻與 DVFS 調整都以遮罩向量運算一次處理全部核心
+    """
+
+    # 動態狀態欄位 (名稱對應 Core 屬性)
+    FIELDS = {
+        'active': bool,
+        'load': float,
+        'temp': float,
+        'power': float,
+        'dvfs_freq': float,
+        'thermal_throttling': bool,
+        'task_time_left': float,
+    }
+
+    # 由模板決定的靜態參數
+    PARAMS = ('max_freq', 'min_freq', 'base_power', 'thermal_threshold',
+              'cooling_rate', 'heating_rate_factor')
+
+    def __init__(self, cores):
+        if np is None:
+            raise RuntimeError("numpy is required for the vectorized core bank")
+
+        self.cores = cores
+        n = len(cores)
+
+        self.arrays = {}
+        for name, kind in self.FIELDS.items():
+            dtype = np.bool_ if kind is bool else np.float64
+            self.arrays[name] = np.zeros(n, dtype=dtype)
+        self.arrays['task_time_left'][:] = np.nan
+
+        for name in self.PARAMS:
+            setattr(self, name, np.array([getattr(core, name) for core in cores], dtype=np.float64))
+
+        # 執行中任務的負載 (指派時寫入)
+        self.task_load = np.zeros(n, dtype=np.float64)
+
+        # 核心利用率累計
+        self.active_time = np.zeros(n, dtype=np.float64)
+        self.idle_time = np.zeros(n, dtype=np.float64)
+
+        for i, core in enumerate(cores):
+            values = {name: core.__dict__.pop(name) for name in self.FIELDS if name in core.__dict__}
+            core.__dict__['_bank'] = self
+            core.bank_index = i
+            for name, value in values.items():
+                self.arrays[name][i] = value
+
+    def __getattr__(self, name):
+        # 讓 bank.temp / bank.active 等直接取得陣列
+        arrays = self.__dict__.get('arrays')
+        if arrays is not None and name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def assign(self, core, task):
+        """記錄核心新指派任務的負載"""
+        self.task_load[core.bank_index] = min(1.0, task.cpu_burst / 100.0)
+
+    def update_thermals(self, time_delta, mask=None):
+        """
+        向量化版本的 Scheduler.update_core_thermals
+        mask: 只更新被選到的核心 (None 表示全部)
+        """
+        selected = np.ones(len(self.cores), dtype=np.bool_) if mask is None else mask
+        running = selected & self.active
+        idle = selected & ~self.active
+
+        # 執行中：計算負載與功耗並升溫
+        self.load[running] = self.task_load[running]
+        freq_factor = self.dvfs_freq / self.max_freq
+        self.power[running] = (self.base_power * (1 + freq_factor * self.load))[running]
+        self.temp[running] += (self.power * self.heating_rate_factor)[running] * time_delta
+
+        # 檢查溫度限制
+        over = running & over_threshold(self.temp, self.thermal_threshold)
+        under = running & ~over
+        self.thermal_throttling[over] = True
+        self.dvfs_freq[over] = np.maximum(self.min_freq, self.dvfs_freq * 0.9)[over]
+        self.thermal_throttling[under] = False
+        boost = under & (self.dvfs_freq < self.max_freq)
+        self.dvfs_freq[boost] = np.minimum(self.max_freq, self.dvfs_freq * 1.05)[boost]
+
+        # 閒置：冷卻
+        self.load[idle] = 0.0
+        self.power[idle] = self.base_power[idle] * 0.3
+        self.temp[idle] = np.maximum(25.0, self.temp - self.cooling_rate * time_delta)[idle]
+
+    def step(self, time_delta):
+        """
+        向量化版本的 update_cores 數值部分
+        回傳本 tick 完成任務的核心索引
+        """
+        running = self.advance_tasks(time_delta)
+        self.update_thermals(time_delta, running)
+
+        return self.finished(running)
+
+    def advance_tasks(self, time_delta):
+        """推進執行中任務的剩餘時間，回傳執行中核心的遮罩"""
+        running = self.active & ~np.isnan(self.task_time_left)
+        self.task_time_left[running] -= time_delta
+        return running
+
+    def finished(self, running):
+        """執行中且任務已完成的核心索引"""
+        return np.flatnonzero(running & (self.task_time_left <= 1e-9))
+
+    def record_tick(self, time_step):
+        """累加一個 tick 的利用率，回傳 (溫度總和, 功耗總和, 限速核心數)"""
+        self.active_time[self.active] += time_step
+        self.idle_time[~self.active] += time_step
+        return (float(self.temp.sum()), float(self.power.sum()),
+                int(np.count_nonzero(self.thermal_throttling)))
+
+    def flush_utilization(self, stats):
+        """將累計的利用率寫回 stats['core_utilization']"""
+        for i, core in enumerate(self.cores):
+            utilization = stats['core_utilization'][core.core_id]
+            utilization['active_time'] += float(self.active_time[i])
+            utilization['idle_time'] += float(self.idle_time[i])
+        self.active_time[:] = 0
+        self.idle_time[:] = 0
@@ -0,0 +1,98 @@
+# 閒置 (靜態) 功耗比例，與實時模型的閒置功耗 base_power * 0.3 一致
+IDLE_POWER_RATIO = 0.3
+# 動態功耗係數：滿載且 f = max_freq 時總功耗為 2 * base_power (與實時模型相同)
+DYNAMIC_POWER_RATIO = 2.0 - IDLE_POWER_RATIO
+
+# 快取的核心組合數上限
+_MAX_CACHED_MODELS = 32
+
+
+def instruction_speed(instruction_mix, instruction_preference):
+    """任務在核心上的相對速度：以 instruction_mix 加權的 instruction_preference"""
+    total_ratio = 0
+    weighted = 0
+    for instr_type, task_ratio in instruction_mix.items():
+        total_ratio += task_ratio
+        weighted += task_ratio * instruction_preference.get(instr_type, 1.0)
+    return weighted / total_ratio if total_ratio > 0 and weighted > 0 else 1.0
+
+
+class EnergyModel:
+    """
+    每個核心、每個 DVFS 等級的能耗/效能表
+
+    功耗模型：P(f) = base_power × (IDLE_POWER_RATIO + DYNAMIC_POWER_RATIO × load × (f / max_freq)^3)
+    (動態功耗 ∝ f·V²，電壓隨頻率調整)；執行時間 = execution_time / (f × 指令速度)
+    表格依核心組合快取，只有核心組合改變時才重新建立
+    """
+
+    _cache = {}
+
+    @classmethod
+    def for_cores(cls, cores):
+        signature = tuple(cls.core_signature(core) for core in cores)
+        model = cls._cache.get(signature)
+        if model is None:
+            if len(cls._cache) >= _MAX_CACHED_MODELS:
+                cls._cache.clear()
+            model = cls(cores)
+            cls._cache[signature] = model
+        return model
+
+    @staticmethod
+    def core_signature(core):
+        return (core.type, tuple(core.dvfs_levels), core.base_power, core.max_freq,
+                tuple(core.instruction_preference.items()))
+
+    def __init__(self, cores):
+        self.profiles = []  # 各核心對應的 profile 編號
+        self.levels = []  # profile -> [(freq, 靜態功耗, 動態功耗係數)]
+        self.preferences = []  # profile -> instruction_preference
+        self.power_params = []  # profile -> (base_power, max_freq)
+        profile_ids = {}
+
+        for core in cores:
+            signature = self.core_signature(core)
+            profile = profile_ids.get(signature)
+            if profile is None:
+                profile = len(self.levels)
+                profile_ids[signature] = profile
+                self.levels.append([
+                    (freq,
+                     core.base_power * IDLE_POWER_RATIO,
+                     core.base_power * DYNAMIC_POWER_RATIO * (freq / core.max_freq) ** 3)
+                    for freq in sorted(core.dvfs_levels)
+                ])
+                self.preferences.append(dict(core.instruction_preference))
+                self.power_params.append((core.base_power, core.max_freq))
+            self.profiles.append(profile)
+
+        self._speed_cache = {}
+
+    def speed_factor(self, profile, task):
+        """任務在此核心 profile 上的指令速度 (instruction_mix 加權的 instruction_preference)"""
+        key = (profile, tuple(task.instruction_mix.items()))
+        speed = self._speed_cache.get(key)
+        if speed is None:
+            speed = instruction_speed(task.instruction_mix, self.preferences[profile])
+            self._speed_cache[key] = speed
+        return speed
+
+    def options(self, core_index, task):
+        """回傳此核心各 DVFS 等級的 (freq, duration, energy)"""
+        profile = self.profiles[core_index]
+        speed = self.speed_factor(profile, task)
+        load = min(1.0, task.cpu_burst / 100.0)
+        for freq, static_power, dynamic_power in self.levels[profile]:
+            duration = task.execution_time / (freq * speed)
+            power = static_power + dynamic_power * load
+            yield freq, duration, power * duration
+
+    def evaluate(self, core_index, task, freq):
+        """任務在此核心以頻率 freq 執行的 (duration, energy)，freq 不必是 DVFS 等級"""
+        profile = self.profiles[core_index]
+        base_power, max_freq = self.power_params[profile]
+        duration = task.execution_time / (freq * self.speed_factor(profile, task))
+        load = min(1.0, task.cpu_burst / 100.0)
+        power = base_power * (IDLE_POWER_RATIO + DYNAMIC_POWER_RATIO * load * (freq / max_freq) ** 3)
+        return duration, power * duration
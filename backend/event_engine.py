@@ -0,0 +1,216 @@
+import heapq
+import math
+
+from thermal_model import over_threshold, THROTTLE_EPSILON
+
+# 事件類型
+ARRIVAL = 'arrival'
+COMPLETION = 'completion'
+THERMAL_THRESHOLD = 'thermal_threshold'
+DVFS = 'dvfs'
+
+# 浮點誤差容忍值 (換算 tick 時使用)
+_EPS = 1e-9
+
+
+class EventDrivenSimulator:
+    """
+    離散事件模擬引擎
+
+    與 run_realtime_loop 使用相同的 time step 格點，但只在「有事發生」的 tick
+    (任務到達、任務完成、溫度越過門檻、DVFS 頻率尚未穩定) 才真正呼叫
+    dispatch / update_cores；事件之間所有核心都處於穩定狀態
+    (頻率固定、功耗固定)，溫度、剩餘時間與統計量以封閉式一次累加。
+    搶佔式排程另外在有任務等待的核心時間片結束時處理 (可能換下執行中的任務)。
+    """
+
+    def __init__(self, scheduler, max_simulation_time=60, time_step=0.1, recorder=None):
+        self.scheduler = scheduler
+        self.recorder = recorder  # TraceRecorder (選用)
+        self.time_step = time_step
+        self.max_ticks = max(0, math.ceil(max_simulation_time / time_step - _EPS))
+
+        self.events = []  # (tick, seq, kind, core_id, version)
+        self._seq = 0
+        self.core_versions = {core.core_id: 0 for core in scheduler.cores}
+
+        self.events_processed = 0
+        self.ticks_skipped = 0
+
+    def tick_of(self, t):
+        """將模擬時間換算成第一個 >= t 的 tick"""
+        return max(0, math.ceil(t / self.time_step - _EPS))
+
+    def push_event(self, tick, kind, core_id=None, version=0):
+        heapq.heappush(self.events, (tick, self._seq, kind, core_id, version))
+        self._seq += 1
+
+    def run(self, stats):
+        """
+        執行模擬並累加統計到 stats (格式同 run_realtime_loop)
+        回傳 (stats, total_time, timeout)
+        """
+        scheduler = self.scheduler
+        time_step = self.time_step
+        total_tasks = len(scheduler.tasks)
+        task_stream = getattr(scheduler, 'task_stream', None)
+        task_metrics = stats.get('task_metrics')  # TaskMetrics (選用)
+        preemptive = getattr(scheduler, 'preemptive', None)  # PreemptiveDispatcher (選用)
+        # 耦合熱模型中所有核心 (含閒置核心) 的溫度每個 tick 都互相影響，沒有封閉解，逐 tick 處理
+        coupled = getattr(scheduler, 'thermal_model', None) is not None
+        stream_arrival_tick = None  # 已排入的串流到達事件 (避免重複排入)
+
+        for task in scheduler.tasks:
+            self.events.append((self.tick_of(task.arrival_time), self._seq, ARRIVAL, None, 0))
+            self._seq += 1
+        heapq.heapify(self.events)
+
+        tick = 0
+        while tick < self.max_ticks:
+            # 事件 tick：完全依照 tick 迴圈的語意處理
+            current_time = round(tick * time_step, 9)
+            assignments = scheduler.dispatch(current_time)
+            stats['tasks_assigned'] += sum(1 for assignment in assignments if not assignment.get('resumed'))
+
+            completed_tasks = scheduler.update_cores(time_step)
+            stats['tasks_completed'] += len(completed_tasks)
+            if task_metrics is not None:
+                task_metrics.record(assignments, completed_tasks, current_time)
+
+            self.record_ticks(stats, 1)
+            self.events_processed += 1
+            if self.recorder is not None:
+                self.recorder.record(current_time, scheduler.cores, assignments, completed_tasks)
+
+            if task_stream is not None:
+                # 串流工作負載：任務只在模擬時間到達時產生，只需排入下一個到達事件
+                total_tasks = stats['total_tasks'] = scheduler.total_task_count()
+                next_arrival = task_stream.next_arrival_time()
+                if next_arrival is not None:
+                    arrival_tick = max(tick + 1, self.tick_of(next_arrival))
+                    if arrival_tick != stream_arrival_tick:
+                        self.push_event(arrival_tick, ARRIVAL)
+                        stream_arrival_tick = arrival_tick
+                if stats['tasks_completed'] >= total_tasks and task_stream.exhausted:
+                    return stats, current_time, False
+            elif stats['tasks_completed'] >= total_tasks:
+                return stats, current_time, False
+
+            self.schedule_core_events(tick)
+
+            if completed_tasks or coupled:
+                # 有核心空出來，下一個 tick 需要重新分配
+                next_tick = tick + 1
+            else:
+                next_tick = self.next_event_tick(tick)
+            if preemptive is not None:
+                decision_time = preemptive.next_decision_time()
+                if decision_time is not None:
+                    next_tick = min(next_tick, max(tick + 1, self.tick_of(decision_time)))
+            next_tick = min(next_tick, self.max_ticks)
+
+            skipped = next_tick - tick - 1
+            if skipped > 0:
+                self.advance_cores(skipped)
+                self.record_ticks(stats, skipped)
+                self.ticks_skipped += skipped
+                if self.recorder is not None:
+                    # 快轉區段最後一個 tick 的狀態
+                    self.recorder.record(round((tick + skipped) * time_step, 9), scheduler.cores)
+
+            tick = next_tick
+
+        return stats, round(self.max_ticks * time_step, 9), True
+
+    def schedule_core_events(self, tick):
+        """為每個執行中的核心排入下一個完成、溫度門檻或 DVFS 事件"""
+        time_step = self.time_step
+
+        for core in self.scheduler.cores:
+            if not core.active:
+                continue
+
+            self.core_versions[core.core_id] += 1
+            version = self.core_versions[core.core_id]
+
+            throttled = over_threshold(core.temp, core.thermal_threshold)
+            if throttled:
+                steady = core.dvfs_freq <= core.min_freq
+            else:
+                steady = core.dvfs_freq >= core.max_freq
+
+            if not steady:
+                # 頻率仍在調整 (每 tick 乘 0.9 或 1.05)，逐 tick 處理直到穩定
+                self.push_event(tick + 1, DVFS, core.core_id, version)
+                continue
+
+            ticks_to_finish = max(1, math.ceil(core.task_time_left / time_step - _EPS))
+            self.push_event(tick + ticks_to_finish, COMPLETION, core.core_id, version)
+
+            if not throttled:
+                # 穩定狀態下每 tick 升溫固定，可直接求出越過門檻的 tick (與 over_threshold 相同的比較)
+                power = core.base_power * (1 + core.dvfs_freq / core.max_freq * core.load)
+                heating = power * core.heating_rate_factor * time_step
+                if heating > 0:
+                    limit = core.thermal_threshold + THROTTLE_EPSILON
+                    ticks_to_threshold = math.floor((limit - core.temp) / heating) + 1
+                    self.push_event(tick + ticks_to_threshold, THERMAL_THRESHOLD, core.core_id, version)
+
+    def next_event_tick(self, tick):
+        """取出下一個有效事件的 tick，丟棄過期或不影響結果的事件"""
+        # 搶佔式排程中到達的任務可能搶佔執行中的任務，一律要處理
+        arrivals_matter = getattr(self.scheduler, 'preemptive', None) is not None or \
+            any(not core.active for core in self.scheduler.cores)
+
+        while self.events:
+            event_tick, _, kind, core_id, version = self.events[0]
+            if event_tick <= tick:
+                heapq.heappop(self.events)
+                continue
+            if kind == ARRIVAL:
+                # 沒有閒置核心時到達事件不會改變任何狀態；
+                # 任務會在下一次核心完成後的分配中被挑出
+                if not arrivals_matter:
+                    heapq.heappop(self.events)
+                    continue
+            elif version != self.core_versions[core_id]:
+                heapq.heappop(self.events)
+                continue
+            return event_tick
+
+        return self.max_ticks
+
+    def advance_cores(self, ticks):
+        """封閉式推進穩定狀態的核心 (頻率、功耗固定，溫度線性上升)"""
+        elapsed = ticks * self.time_step
+
+        for core in self.scheduler.cores:
+            if not core.active:
+                continue  # 與 update_cores 相同，閒置核心狀態不變
+
+            core.power = core.base_power * (1 + core.dvfs_freq / core.max_freq * core.load)
+            core.temp += core.power * core.heating_rate_factor * elapsed
+            core.task_time_left -= elapsed
+
+    def record_ticks(self, stats, ticks):
+        """累加 ticks 個 time step 的統計 (事件之間狀態固定)"""
+        elapsed = ticks * self.time_step
+        cores = self.scheduler.cores
+
+        total_temp = 0
+        total_power = 0
+        for core in cores:
+            utilization = stats['core_utilization'][core.core_id]
+            if core.active:
+                utilization['active_time'] += elapsed
+            else:
+                utilization['idle_time'] += elapsed
+
+            total_temp += core.temp
+            total_power += core.power
+
+            if core.thermal_throttling:
+                stats['thermal_throttling_events'] += ticks
+
+        stats['avg_temperature'] = total_temp / len(cores)
+        stats['total_power_consumed'] += total_power * elapsed
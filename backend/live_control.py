@@ -0,0 +1,186 @@
+import threading
+from collections import deque
+
+
+class LiveControl:
+    """
+    執行中實時模擬的即時變更：插入任務、取消任務、新增核心與核心上線/下線
+    API 與 socket 事件在其他 thread 呼叫 submit_*，只做檢查並排入佇列；
+    模擬迴圈在每個 tick 開始時呼叫 apply 套用，調度器的狀態只在迴圈的 thread 中修改。
+    所有變更都以增量方式更新就緒佇列、閒置核心索引與 run queue，不重建調度器；
+    親和度表在新任務/核心第一次評分時才補上對應的列/欄
+    """
+
+    def __init__(self, scheduler, build_task, build_core, open_system=False, recording=False):
+        self.scheduler = scheduler
+        self.build_task = build_task  # (config, task_id) -> Task
+        self.build_core = build_core  # (config, core_id) -> Core
+        self.open_system = open_system  # True 時任務全部完成也不結束，直到時間上限或被取消
+        self.recording = recording  # 記錄軌跡中：軌跡的欄位寬度固定為開始時的核心數，不能新增核心
+        self.lock = threading.Lock()
+        self.commands = deque()
+
+        # 串流工作負載的任務編號由產生器決定，插入的任務改從很大的編號開始避免重複
+        self.next_task_id = len(scheduler.tasks) if scheduler.task_stream is None else 10 ** 9
+        self.next_core_id = len(scheduler.cores)
+        self.online = set(range(len(scheduler.cores)))  # 套用已排入的變更後預期在線的核心
+
+    def submit_tasks(self, configs, validate_task):
+        """排入要插入的任務 (arrival_time 省略或已過時為套用當下)，回傳分配的 task_id"""
+        if not isinstance(configs, list) or not configs:
+            raise ValueError("Injection needs a non-empty task list")
+        for config in configs:
+            if not isinstance(config, dict):
+                raise ValueError(f"Invalid task: {config!r}")
+            if config.get('dependencies'):
+                raise ValueError("Injected tasks cannot have dependencies")
+            validate_task(config)
+
+        with self.lock:
+            task_ids = list(range(self.next_task_id, self.next_task_id + len(configs)))
+            self.next_task_id += len(configs)
+            self.commands.append(('inject', list(zip(task_ids, configs))))
+        return task_ids
+
+    def submit_cancel(self, task_ids):
+        """排入要取消的任務 (找不到或已完成的任務在套用時回報)"""
+        if not isinstance(task_ids, list) or not task_ids or \
+                any(not isinstance(task_id, int) or isinstance(task_id, bool) for task_id in task_ids):
+            raise ValueError("Cancellation needs a non-empty list of task ids")
+        with self.lock:
+            self.commands.append(('cancel', list(task_ids)))
+
+    def submit_cores(self, add=(), offline=(), online=()):
+        """
+        排入核心變更：add 為核心設定列表，offline / online 為 core_id 列表
+        下線的核心不再接受新任務 (執行中的任務會跑完)，至少要保留一個在線的核心
+        """
+        scheduler = self.scheduler
+        if add and (scheduler.core_bank is not None or scheduler.thermal_model is not None):
+            raise ValueError("Cores cannot be added to vectorized or coupled-thermal simulations")
+        if add and self.recording:
+            raise ValueError("Cores cannot be added while recording a trace")
+        if any(not isinstance(config, dict) for config in add):
+            raise ValueError("Invalid core configuration")
+
+        with self.lock:
+            for core_id in list(offline) + list(online):
+                if not isinstance(core_id, int) or isinstance(core_id, bool) or \
+                        not 0 <= core_id < self.next_core_id:
+                    raise ValueError(f"Invalid core id: {core_id!r}")
+            projected = (self.online - set(offline)) | set(online)
+            core_ids = list(range(self.next_core_id, self.next_core_id + len(add)))
+            if not projected and not core_ids:
+                raise ValueError("At least one core must stay online")
+
+            self.next_core_id += len(add)
+            self.online = projected | set(core_ids)
+            self.commands.append(('cores', (list(zip(core_ids, add)), list(offline), list(online))))
+        return core_ids
+
+    def apply(self, current_time, stats):
+        """模擬迴圈每個 tick 開始時呼叫：套用排入的變更，回傳要送出的 live_update 事件內容"""
+        if not self.commands:
+            return []
+        scheduler = self.scheduler
+        if scheduler.ready_queue is None:
+            scheduler.init_realtime_indexes()
+
+        updates = []
+        while True:
+            with self.lock:
+                if not self.commands:
+                    break
+                action, payload = self.commands.popleft()
+            if action == 'inject':
+                update = self.inject(payload, current_time)
+            elif action == 'cancel':
+                update = self.cancel(payload, stats)
+            else:
+                update = self.reconfigure(*payload, stats)
+            updates.append({'action': action, 'time': current_time, **update})
+
+        stats['total_tasks'] = scheduler.total_task_count()
+        return updates
+
+    def inject(self, items, current_time):
+        scheduler = self.scheduler
+        for task_id, config in items:
+            arrival_time = config.get('arrival_time')
+            if arrival_time is None or arrival_time < current_time:
+                arrival_time = current_time
+            task = self.build_task({**config, 'arrival_time': arrival_time}, task_id)
+            scheduler.ready_queue.add(task)
+            scheduler.injected_tasks += 1
+        return {'task_ids': [task_id for task_id, _ in items]}
+
+    def cancel(self, task_ids, stats):
+        cancelled = []
+        not_found = []
+        for task_id in task_ids:
+            task = self.cancel_task(task_id)
+            if task is not None:
+                stats['task_metrics'].task_cancelled(task)
+                cancelled.append(task_id)
+            else:
+                not_found.append(task_id)
+        stats['tasks_cancelled'] += len(cancelled)
+        return {'cancelled': cancelled, 'not_found': not_found}
+
+    def cancel_task(self, task_id):
+        """取消尚未完成的任務並回傳該任務；找不到 (已完成或不存在) 時回傳 None"""
+        scheduler = self.scheduler
+        preemptive = scheduler.preemptive
+        task = None
+
+        for core in scheduler.cores:
+            if core.current_task is not None and core.current_task.task_id == task_id:
+                task = core.current_task
+                if preemptive is not None:
+                    preemptive.run_queues[core.core_id].current = None
+                scheduler.stop_core_task(core)
+                break
+
+        if task is None and preemptive is not None:
+            for run_queue in preemptive.run_queues:
+                entity = next((entity for entity in run_queue.waiting() if entity.task.task_id == task_id), None)
+                if entity is not None:
+                    run_queue.remove(entity)
+                    task = entity.task
+                    break
+
+        if task is None:
+            # 就緒佇列與尚未到達的任務 (延遲刪除：標記後 ReadyQueue.pop 會略過)
+            task = scheduler.ready_queue.find(task_id)
+            stream = scheduler.task_stream
+            if task is None and stream is not None:
+                task = stream.find(task_id)
+            if task is None or task.completed:
+                return None
+
+        task.completed = True  # 不再執行 (已完成的任務不會被找到)
+        if scheduler.task_stream is not None:
+            scheduler.task_stream.task_completed(task)  # 後繼任務不再等待被取消的任務
+        return task
+
+    def reconfigure(self, added, offline, online, stats):
+        scheduler = self.scheduler
+        preemptive = scheduler.preemptive
+        for core_id, config in added:
+            core = self.build_core(config, core_id)
+            scheduler.cores.append(core)
+            stats['core_utilization'][core_id] = {'active_time': 0, 'idle_time': 0}
+            scheduler.idle_index.add_core(core)
+            if preemptive is not None:
+                preemptive.add_core(core)
+
+        for core_id in offline:
+            scheduler.idle_index.set_offline(core_id, True)
+            if preemptive is not None:
+                preemptive.set_online(core_id, False)
+        for core_id in online:
+            scheduler.idle_index.set_offline(core_id, False)
+            if preemptive is not None:
+                preemptive.set_online(core_id, True)
+
+        return {'added': [core_id for core_id, _ in added], 'offline': offline, 'online': online}
@@ -0,0 +1,161 @@
+import math
+
+from run_queue import WORK_DIGITS
+
+# 預設週期平衡間隔與遷移成本 (模擬秒)
+DEFAULT_BALANCE_INTERVAL = 1.0
+DEFAULT_MIGRATION_COST = 0.1
+DEFAULT_CROSS_CLUSTER_COST = 0.3
+
+_EPS = 1e-9
+
+
+class LoadBalancer:
+    """
+    run queue 之間的負載平衡 (work stealing)
+    核心依類型 (big / little) 分成 cluster：
+    - 閒置偷取：核心沒有任務可執行時，從同 cluster 中工作量最多的核心拿一個等待中的任務，
+      同 cluster 都沒有等待中的任務時才跨 cluster；優先挑選在本核心親和度加分相對較高的任務
+    - 週期平衡：每 interval 秒先在每個 cluster 內、再在 cluster 之間把等待中的任務從工作量最多的核心
+      搬到最少的核心；跨 cluster 只搬移在目的核心加分不低於原核心的任務
+      (instruction_preference 與 affinity_hint 偏好原 cluster 的任務留在原處)
+    遷移的任務下次執行時要多付出 migration_cost (跨 cluster 為 cross_cluster_cost) 的時間
+    """
+
+    def __init__(self, dispatcher, affinity_bonus, interval=DEFAULT_BALANCE_INTERVAL,
+                 migration_cost=DEFAULT_MIGRATION_COST, cross_cluster_cost=DEFAULT_CROSS_CLUSTER_COST,
+                 time_step=0.1):
+        if interval <= 0:
+            raise ValueError(f"Invalid balance interval: {interval}")
+        if migration_cost < 0 or cross_cluster_cost < 0:
+            raise ValueError("Migration cost must be non-negative")
+        self.dispatcher = dispatcher  # PreemptiveDispatcher
+        self.affinity_bonus = affinity_bonus  # (core, task) -> 親和度加分
+        self.interval = interval
+        self.migration_cost = migration_cost
+        self.cross_cluster_cost = cross_cluster_cost
+        self.time_step = time_step  # 與模擬迴圈相同，判斷本 tick 是否越過平衡時間點
+
+        self.clusters = {}  # 核心類型 -> [CoreRunQueue]
+        for run_queue in dispatcher.run_queues:
+            self.add_run_queue(run_queue)
+
+        self.steals = 0
+        self.balance_moves = 0
+        self.cross_cluster_migrations = 0
+        self.migration_time = 0.0
+
+    def add_run_queue(self, run_queue):
+        self.clusters.setdefault(run_queue.core.type, []).append(run_queue)
+
+    def grid_index(self, t):
+        return math.floor(t / self.interval + _EPS)
+
+    def next_balance_time(self, current_time):
+        """current_time 之後的下一個週期平衡時間"""
+        return (self.grid_index(current_time) + 1) * self.interval
+
+    def periodic_balance(self, current_time):
+        """
+        每個 tick 呼叫；只在本 tick 越過平衡時間點時執行
+        (以時間點判斷而非上次執行時間，事件引擎跳過的 tick 不影響結果)
+        """
+        if self.grid_index(current_time) <= self.grid_index(current_time - self.time_step):
+            return
+        for run_queues in self.clusters.values():
+            self.balance(run_queues, run_queues)
+        for cluster, sources in self.clusters.items():
+            for other, targets in self.clusters.items():
+                if other != cluster:
+                    self.balance(sources, targets, cross_cluster=True)
+
+    def balance(self, sources, targets, cross_cluster=False):
+        """
+        將等待中的任務從 sources 中工作量最多的核心搬到 targets 中最少的核心，
+        只搬移不會讓兩者差距反轉 (工作量 + 遷移成本 < 差距) 的任務，每次搬移都嚴格縮小差距
+        """
+        cost = self.cross_cluster_cost if cross_cluster else self.migration_cost
+        targets = [run_queue for run_queue in targets if run_queue.online]
+        if not targets:
+            return
+        for _ in range(sum(len(run_queue) for run_queue in sources)):
+            source = self.busiest(sources)
+            if source is None:
+                return
+            target = min(targets, key=lambda run_queue: (run_queue.load(), run_queue.core.core_id))
+            gap = round(source.load() - target.load(), WORK_DIGITS)
+
+            best = None
+            for entity in source.waiting():
+                if round(entity.remaining + cost, WORK_DIGITS) >= gap:
+                    continue
+                if cross_cluster and \
+                        self.affinity_bonus(target.core, entity.task) < self.affinity_bonus(source.core, entity.task):
+                    continue
+                if best is None or (entity.remaining, -entity.seq) > (best.remaining, -best.seq):
+                    best = entity
+            if best is None:
+                return
+
+            source.remove(best)
+            self.migrate(best, source, target, cross_cluster)
+            target.enqueue(best, self.dispatcher.next_seq())
+            self.balance_moves += 1
+
+    def steal(self, thief):
+        """閒置核心拿取一個等待中的任務 (已從原核心移除，直接在 thief 上執行)；沒有則為 None"""
+        cluster = thief.core.type
+        victim = self.busiest(self.clusters[cluster])
+        cross_cluster = False
+        if victim is None:
+            victim = self.busiest([run_queue for other, run_queues in self.clusters.items() if other != cluster
+                                   for run_queue in run_queues])
+            cross_cluster = True
+            if victim is None:
+                return None
+
+        # 本核心加分相對越高越好；同分時拿最早該執行的任務 (REALTIME 優先，其次 vruntime 最小)
+        def steal_key(entity):
+            gain = self.affinity_bonus(thief.core, entity.task) - self.affinity_bonus(victim.core, entity.task)
+            order = (0, -entity.rt_priority) if entity.realtime else (1, round(entity.vruntime - victim.min_vruntime, WORK_DIGITS))
+            return (-gain, order, entity.seq)
+
+        entity = min(victim.waiting(), key=steal_key)
+        victim.remove(entity)
+        self.migrate(entity, victim, thief, cross_cluster)
+        self.steals += 1
+        return entity
+
+    def busiest(self, run_queues):
+        """有任務在等待的核心中工作量最多者"""
+        busiest = None
+        busiest_load = None
+        for run_queue in run_queues:
+            if not len(run_queue):
+                continue
+            load = run_queue.load()
+            if busiest is None or load > busiest_load:
+                busiest, busiest_load = run_queue, load
+        return busiest
+
+    def migrate(self, entity, source, target, cross_cluster):
+        """記錄遷移：vruntime 換算到目的核心的 min_vruntime (與 run queue 相同捨去)，並加上遷移成本"""
+        if not entity.realtime:
+            entity.vruntime = round(entity.vruntime + target.min_vruntime - source.min_vruntime, WORK_DIGITS)
+        cost = self.cross_cluster_cost if cross_cluster else self.migration_cost
+        entity.migration_penalty += cost
+        entity.task.assigned_core = target.core.core_id
+        self.migration_time += cost
+        if cross_cluster:
+            self.cross_cluster_migrations += 1
+
+    def summary(self):
+        return {
+            'interval': self.interval,
+            'migration_cost': self.migration_cost,
+            'cross_cluster_cost': self.cross_cluster_cost,
+            'steals': self.steals,
+            'balance_moves': self.balance_moves,
+            'cross_cluster_migrations': self.cross_cluster_migrations,
+            'migration_time': round(self.migration_time, 3)
+        }
@@ -0,0 +1,237 @@
+import json
+import threading
+import time
+
+# 實時迴圈每個 tick 的階段 (emit 為透過 wrap_emit 發送事件的時間，會從發送當下所在的階段扣除)
+LOOP_PHASES = ('schedule', 'update_cores', 'stats', 'payload', 'emit')
+# 運算階段與傳輸階段：判斷落後時是排程器還是傳輸跟不上
+COMPUTE_PHASES = ('schedule', 'update_cores', 'stats')
+TRANSPORT_PHASES = ('payload', 'emit')
+QUEUES = ('ready', 'run_queue', 'transport')
+
+# 每個 tick 的實際時間預算 (與 time step 相同)
+DEFAULT_TICK_BUDGET = 0.1
+
+COUNTERS = ('ticks', 'decisions', 'events', 'emitted_bytes', 'overruns', 'overrun_seconds', 'overhead_seconds')
+
+
+class LoopProfiler:
+    """
+    單一實時模擬迴圈的計時與計數
+    只在啟用時建立；停用時迴圈中只剩 `profiler is not None` 的判斷，不呼叫任何計時函式。
+    每個 tick 以 start_tick / lap / end_tick 依序記錄各階段的耗時，
+    透過 wrap_emit 發送的事件計入 emit 階段與送出位元組數；計算位元組數本身的時間另計為 overhead
+    """
+
+    def __init__(self, budget=DEFAULT_TICK_BUDGET, report_emit=None, clock=time.perf_counter):
+        self.budget = budget
+        self.report_emit = report_emit  # 發送 loop_profile 事件的函式 (None 表示不發送)
+        self.clock = clock
+
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.phase_seconds = dict.fromkeys(LOOP_PHASES, 0.0)
+        self.queue_depths = dict.fromkeys(QUEUES, 0)
+
+        self._tick_start = self._mark = 0.0
+        self._excluded = 0.0  # 本階段中發送事件與 overhead 的時間 (lap 時扣除)
+        self._tick_emit = 0.0
+        self._tick_overhead = 0.0
+
+        self._window = (self.clock(), self.snapshot())
+        self._window_max = dict.fromkeys(LOOP_PHASES, 0.0)
+
+    def start_tick(self):
+        self._tick_start = self._mark = self.clock()
+        self._excluded = self._tick_emit = self._tick_overhead = 0.0
+
+    def lap(self, phase):
+        """記錄從上一個時間點到現在的階段耗時"""
+        now = self.clock()
+        elapsed = now - self._mark - self._excluded
+        self._mark = now
+        self._excluded = 0.0
+        self.phase_seconds[phase] += elapsed
+        if elapsed > self._window_max[phase]:
+            self._window_max[phase] = elapsed
+
+    def end_tick(self, decisions, queue_depths):
+        """tick 的工作結束 (等待下一個 tick 之前)：累計決策數並檢查是否超出時間預算"""
+        counters = self.counters
+        counters['ticks'] += 1
+        counters['decisions'] += decisions
+        self.queue_depths.update(queue_depths)
+
+        self.phase_seconds['emit'] += self._tick_emit
+        if self._tick_emit > self._window_max['emit']:
+            self._window_max['emit'] = self._tick_emit
+
+        work = self.clock() - self._tick_start - self._tick_overhead
+        if work > self.budget:
+            counters['overruns'] += 1
+            counters['overrun_seconds'] += work - self.budget
+
+    def wrap_emit(self, emit):
+        """包裝 emit，記錄發送時間、事件數與 JSON 編碼後的位元組數 (每個事件計一次，不乘上 client 數)"""
+        clock = self.clock
+        counters = self.counters
+
+        def timed_emit(event, data):
+            started = clock()
+            emit(event, data)
+            sent = clock()
+            counters['events'] += 1
+            counters['emitted_bytes'] += len(json.dumps(data, separators=(',', ':'), default=str).encode())
+            overhead = clock() - sent
+            counters['overhead_seconds'] += overhead
+            self._tick_emit += sent - started
+            self._tick_overhead += overhead
+            self._excluded += clock() - started
+        return timed_emit
+
+    def sample_transport(self, depth):
+        """傳輸佇列深度 (client 尚未送出的封包數最大值)"""
+        self.queue_depths['transport'] = depth
+
+    def snapshot(self):
+        return {**self.counters, 'phase_seconds': dict(self.phase_seconds)}
+
+    def window(self):
+        """上次呼叫以來的統計 (loop_profile 事件內容)，並開始新的區間"""
+        now = self.clock()
+        started, previous = self._window
+        current = self.snapshot()
+        self._window = (now, current)
+        window_max, self._window_max = self._window_max, dict.fromkeys(LOOP_PHASES, 0.0)
+
+        elapsed = max(now - started, 1e-9)
+        ticks = current['ticks'] - previous['ticks']
+        phases = {phase: current['phase_seconds'][phase] - previous['phase_seconds'][phase]
+                  for phase in LOOP_PHASES}
+        overruns = current['overruns'] - previous['overruns']
+
+        behind = None
+        if overruns:
+            compute = sum(phases[phase] for phase in COMPUTE_PHASES)
+            transport = sum(phases[phase] for phase in TRANSPORT_PHASES)
+            behind = 'transport' if transport > compute or self.queue_depths['transport'] else 'scheduler'
+
+        return {
+            'ticks': ticks,
+            'phases': {phase: {'mean_ms': round(phases[phase] / ticks * 1000, 3) if ticks else 0.0,
+                               'max_ms': round(window_max[phase] * 1000, 3)}
+                       for phase in LOOP_PHASES},
+            'decisions_per_second': round((current['decisions'] - previous['decisions']) / elapsed, 1),
+            'events_per_second': round((current['events'] - previous['events']) / elapsed, 1),
+            'emitted_bytes_per_second': round((current['emitted_bytes'] - previous['emitted_bytes']) / elapsed, 1),
+            'overruns': overruns,
+            'overrun_ms': round((current['overrun_seconds'] - previous['overrun_seconds']) * 1000, 3),
+            'queue_depths': dict(self.queue_depths),
+            'behind': behind
+        }
+
+    def summary(self):
+        """整個模擬的統計 (附在 simulation_complete 的結果中)"""
+        ticks = self.counters['ticks']
+        return {
+            **{key: round(value, 6) if isinstance(value, float) else value for key, value in self.counters.items()},
+            'budget_ms': self.budget * 1000,
+            'phase_mean_ms': {phase: round(self.phase_seconds[phase] / ticks * 1000, 3) if ticks else 0.0
+                              for phase in LOOP_PHASES}
+        }
+
+
+def format_metric(name, kind, help_text, samples):
+    """
+    Prometheus text format 的一個指標
+    samples: [(labels dict 或 None, 數值)]
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = ''
+        if labels:
+            label_text = '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+        lines.append(f"{name}{label_text} {value!r}" if isinstance(value, float) else f"{name}{label_text} {value}")
+    return '\n'.join(lines)
+
+
+class LoopMetrics:
+    """
+    所有實時模擬迴圈的指標彙總 (/api/metrics)
+    enabled=False 時只為要求 profile 的 session 建立 LoopProfiler；
+    結束的迴圈計數併入累計值，佇列深度只計算執行中的迴圈
+    """
+
+    def __init__(self, enabled=False, budget=DEFAULT_TICK_BUDGET):
+        self.enabled = enabled
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.active = set()
+        self.finished = {**dict.fromkeys(COUNTERS, 0), 'phase_seconds': dict.fromkeys(LOOP_PHASES, 0.0)}
+
+    def profiler(self, report_emit=None):
+        """建立並登記一個 LoopProfiler；未啟用且沒有要求 profile 事件時回傳 None"""
+        if not self.enabled and report_emit is None:
+            return None
+        profiler = LoopProfiler(self.budget, report_emit)
+        with self.lock:
+            self.active.add(profiler)
+        return profiler
+
+    def release(self, profiler):
+        """迴圈結束：將計數併入累計值"""
+        if profiler is None:
+            return
+        with self.lock:
+            self.active.discard(profiler)
+            self._merge(self.finished, profiler.snapshot())
+
+    @staticmethod
+    def _merge(totals, snapshot):
+        for key in COUNTERS:
+            totals[key] += snapshot[key]
+        for phase in LOOP_PHASES:
+            totals['phase_seconds'][phase] += snapshot['phase_seconds'][phase]
+
+    def totals(self):
+        with self.lock:
+            active = list(self.active)
+            totals = {**self.finished, 'phase_seconds': dict(self.finished['phase_seconds'])}
+        queue_depths = dict.fromkeys(QUEUES, 0)
+        for profiler in active:
+            self._merge(totals, profiler.snapshot())
+            for queue in QUEUES:
+                queue_depths[queue] += profiler.queue_depths[queue]
+        return totals, queue_depths, len(active)
+
+    def render(self, extra=()):
+        """
+        Prometheus text format (text/plain; version=0.0.4)
+        extra: 其他要一起輸出的指標 (format_metric 的參數)
+        """
+        totals, queue_depths, active = self.totals()
+        metrics = [
+            ('scheduler_instrumentation_enabled', 'gauge', 'Whether loop instrumentation is enabled for all sessions.',
+             [(None, int(self.enabled))]),
+            ('scheduler_instrumented_loops', 'gauge', 'Instrumented real-time loops currently running.',
+             [(None, active)]),
+            ('scheduler_loop_ticks_total', 'counter', 'Simulation ticks processed by instrumented loops.',
+             [(None, totals['ticks'])]),
+            ('scheduler_loop_phase_seconds_total', 'counter', 'Wall time spent in each phase of a tick.',
+             [({'phase': phase}, totals['phase_seconds'][phase]) for phase in LOOP_PHASES]),
+            ('scheduler_decisions_total', 'counter', 'Task assignments made by the scheduler.',
+             [(None, totals['decisions'])]),
+            ('scheduler_emitted_events_total', 'counter', 'Socket.IO events emitted by simulation loops.',
+             [(None, totals['events'])]),
+            ('scheduler_emitted_bytes_total', 'counter', 'JSON-encoded bytes of emitted events (per event, not per client).',
+             [(None, totals['emitted_bytes'])]),
+            ('scheduler_tick_overruns_total', 'counter', 'Ticks whose work exceeded the tick budget.',
+             [(None, totals['overruns'])]),
+            ('scheduler_tick_overrun_seconds_total', 'counter', 'Wall time spent beyond the tick budget.',
+             [(None, totals['overrun_seconds'])]),
+            ('scheduler_instrumentation_overhead_seconds_total', 'counter', 'Time spent measuring emitted bytes.',
+             [(None, totals['overhead_seconds'])]),
+            ('scheduler_queue_depth', 'gauge', 'Latest queue depths summed over running loops.',
+             [({'queue': queue}, queue_depths[queue]) for queue in QUEUES]),
+            *extra
+        ]
+        return '\n'.join(format_metric(*metric) for metric in metrics) + '\n'
@@ -0,0 +1,181 @@
+import bisect
+import heapq
+import itertools
+
+
+class ReadyQueue:
+    """
+    就緒佇列
+    任務依 arrival_time 排序，隨模擬時間推進才釋放進 heap；
+    heap 以任務在任務列表中的順序為鍵，維持原本「先列出先分配」的語意
+    """
+
+    def __init__(self, tasks=()):
+        self.pending = []  # (arrival_time, order, task)，尚未到達
+        self.pending_index = 0
+        self.heap = []  # (order, task)，已到達且尚未分配
+        self._order = itertools.count()
+
+        pending = []
+        for task in tasks:
+            order = next(self._order)
+            if getattr(task, 'assigned', False) or task.completed:
+                continue
+            pending.append((task.arrival_time, order, task))
+        pending.sort(key=lambda entry: (entry[0], entry[1]))
+        self.pending = pending
+
+    def __len__(self):
+        return len(self.heap)
+
+    def add(self, task):
+        """加入新任務 (排在既有任務之後)"""
+        order = next(self._order)
+        # 只在尚未釋放的區段中依到達時間插入 (order 唯一，不會比較到任務本身)
+        position = bisect.bisect_right(self.pending, (task.arrival_time, order), lo=self.pending_index)
+        self.pending.insert(position, (task.arrival_time, order, task))
+
+    def release(self, current_time):
+        """釋放所有 arrival_time <= current_time 的任務"""
+        pending = self.pending
+        index = self.pending_index
+        while index < len(pending) and pending[index][0] <= current_time:
+            _, order, task = pending[index]
+            heapq.heappush(self.heap, (order, task))
+            index += 1
+        self.pending_index = index
+
+        # 已釋放的區段夠大時才壓縮，避免每次 release 都搬移列表
+        if index > 1024 and index * 2 > len(pending):
+            del pending[:index]
+            self.pending_index = 0
+
+    def next_arrival_time(self):
+        """下一個尚未到達任務的 arrival_time (沒有則為 None)"""
+        if self.pending_index < len(self.pending):
+            return self.pending[self.pending_index][0]
+        return None
+
+    def pop(self):
+        """取出順序最前的就緒任務 (跳過已被分配的任務)"""
+        while self.heap:
+            order, task = heapq.heappop(self.heap)
+            if not getattr(task, 'assigned', False) and not task.completed:
+                return order, task
+        return None
+
+    def push(self, order, task):
+        """放回之前取出但未分配的任務"""
+        heapq.heappush(self.heap, (order, task))
+
+    def find(self, task_id):
+        """依 task_id 找出尚未分配的任務 (已到達或尚未到達)，O(n)，只用於取消任務"""
+        waiting = itertools.chain((entry[1] for entry in self.heap),
+                                  (entry[2] for entry in itertools.islice(self.pending, self.pending_index, None)))
+        for task in waiting:
+            if task.task_id == task_id and not getattr(task, 'assigned', False) and not task.completed:
+                return task
+        return None
+
+
+class IdleCoreIndex:
+    """
+    依核心特性分組的閒置核心索引
+    同一組核心 (類型、效能分數與指令偏好相同) 對任一任務的分數只取決於是否限速，
+    因此每組只需維護「未限速」與「限速中」兩個以核心順序排序的 heap，
+    挑選核心時只需比較每組的第一個候選
+    """
+
+    def __init__(self, cores):
+        self.cores = {}  # core_id -> core
+        self.groups = {}  # profile -> {'normal': [...], 'throttled': [...]}
+        self.core_group = {}  # core_id -> profile
+        self.idle = set()  # 目前閒置的 core_id
+        self.offline = set()  # 已下線、不接受新任務的 core_id
+
+        for core in cores:
+            self.add_core(core)
+
+    def add_core(self, core):
+        """加入核心並依特性分組"""
+        profile = self.profile_of(core)
+        self.cores[core.core_id] = core
+        self.core_group[core.core_id] = profile
+        self.groups.setdefault(profile, {'normal': [], 'throttled': []})
+        if not core.active:
+            self.add(core.core_id)
+
+    @staticmethod
+    def profile_of(core):
+        return (core.type, core.performance_score, tuple(sorted(core.instruction_preference.items())))
+
+    def __len__(self):
+        return len(self.idle)
+
+    def add(self, core_id):
+        """核心變為閒置"""
+        if core_id in self.idle or core_id in self.offline:
+            return
+        self.idle.add(core_id)
+        bucket = 'throttled' if self.cores[core_id].thermal_throttling else 'normal'
+        heapq.heappush(self.groups[self.core_group[core_id]][bucket], core_id)
+
+    def discard(self, core_id):
+        """核心變為忙碌 (heap 中的項目延遲刪除)"""
+        self.idle.discard(core_id)
+
+    def set_offline(self, core_id, offline):
+        """核心下線 (不再被挑選) 或重新上線"""
+        if offline:
+            self.offline.add(core_id)
+            self.idle.discard(core_id)
+        else:
+            self.offline.discard(core_id)
+            if not self.cores[core_id].active:
+                self.add(core_id)
+
+    def refresh(self, core_id):
+        """閒置核心的限速狀態改變時重新歸類"""
+        if core_id in self.idle:
+            self.idle.discard(core_id)
+            self.add(core_id)
+
+    def _top(self, heap, throttled):
+        """取得 heap 中第一個仍然有效的 core_id"""
+        while heap:
+            core_id = heap[0]
+            if core_id not in self.idle:
+                heapq.heappop(heap)
+                continue
+            if self.cores[core_id].thermal_throttling != throttled:
+                # 限速狀態已改變，移到正確的 heap
+                heapq.heappop(heap)
+                bucket = 'normal' if throttled else 'throttled'
+                heapq.heappush(self.groups[self.core_group[core_id]][bucket], core_id)
+                continue
+            return core_id
+        return None
+
+    def candidates(self):
+        """每組各回傳一個最佳候選核心 (未限速優先，其次核心順序)"""
+        for group in self.groups.values():
+            core_id = self._top(group['normal'], False)
+            if core_id is None:
+                core_id = self._top(group['throttled'], True)
+            if core_id is not None:
+                yield self.cores[core_id]
+
+    def best_core(self, task, score):
+        """
+        依 score(core, task) 挑選分數最高的閒置核心
+        分數相同時選核心順序較前者；分數需大於 0 (與原本掃描邏輯一致)
+        """
+        best_core = None
+        best_score = 0
+        for core in self.candidates():
+            core_score = score(core, task)
+            if core_score > best_score or (core_score == best_score and best_core is not None
+                                           and core.core_id < best_core.core_id):
+                best_score = core_score
+                best_core = core
+        return best_core
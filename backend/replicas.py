@@ -0,0 +1,213 @@
+import math
+import random
+from statistics import NormalDist
+
+from task_metrics import RunningStats
+
+# 估計信賴區間的指標 -> calculate_final_statistics 中 global 統計的欄位
+REPLICA_METRICS = {
+    'makespan': 'simulation_time',
+    'energy': 'total_system_power',
+    'completion_rate': 'completion_rate',
+    'throttling_events': 'thermal_throttling_events'
+}
+
+# 情境 seed 衍生的具名亂數串流 (各自獨立，新增串流不影響既有串流的結果)
+RNG_STREAMS = ('names', 'arrival', 'burst', 'workload')
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RELATIVE_TOLERANCE = 0.02  # 信賴區間半寬 / 平均 低於此值時停止
+DEFAULT_MIN_REPLICAS = 5
+MAX_REPLICAS = 10000
+
+
+def rng_streams(seed):
+    """
+    由情境 seed 衍生互相獨立的亂數串流
+    以字串作為 random.Random 的 seed (經 SHA-512 雜湊)，結果不受 PYTHONHASHSEED 與行程影響
+    """
+    return {name: random.Random(f"{seed}/{name}") for name in RNG_STREAMS}
+
+
+def replica_seed(base_seed, replica):
+    """第 replica 個 replica 的情境 seed"""
+    return f"{base_seed}:{replica}"
+
+
+def derived_int_seed(rng):
+    """給只接受整數 seed 的產生器 (例如 workload) 使用"""
+    return rng.getrandbits(63)
+
+
+def replica_metrics(global_stats):
+    """從 calculate_final_statistics 的 global 統計取出要估計的指標"""
+    return {metric: global_stats[field] for metric, field in REPLICA_METRICS.items()}
+
+
+def validate_jitter(jitter):
+    """
+    jitter: None / {"arrival": 秒, "burst": 比例}
+    arrival: 到達時間加上 [-arrival, arrival] 的均勻擾動；burst: cpu_burst 乘上 1 ± burst
+    """
+    if not jitter:
+        return None
+    if not isinstance(jitter, dict):
+        raise ValueError(f"Invalid jitter: {jitter!r}")
+    arrival = jitter.get('arrival', 0)
+    burst = jitter.get('burst', 0)
+    if not isinstance(arrival, (int, float)) or isinstance(arrival, bool) or arrival < 0:
+        raise ValueError(f"Invalid arrival jitter: {arrival!r}")
+    if not isinstance(burst, (int, float)) or isinstance(burst, bool) or not 0 <= burst < 1:
+        raise ValueError(f"Invalid burst jitter: {burst!r}")
+    return {'arrival': arrival, 'burst': burst}
+
+
+def jitter_tasks(configs, streams, jitter, base_burst):
+    """
+    逐一擾動任務設定 (回傳新的 dict，可用於串流)
+    base_burst: task_type -> 類型預設的 cpu_burst
+    擾動後的 cpu_burst 取整數，讓同類型任務的 profile 數量有上限
+    """
+    arrival = jitter['arrival']
+    burst = jitter['burst']
+    arrival_rng = streams['arrival']
+    burst_rng = streams['burst']
+    for config in configs:
+        config = dict(config)
+        if arrival:
+            arrival_time = config.get('arrival_time', 0) + arrival_rng.uniform(-arrival, arrival)
+            config['arrival_time'] = round(max(0.0, arrival_time), 3)
+        if burst:
+            base = config.get('cpu_burst') or base_burst(config.get('task_type', 'browser'))
+            config['cpu_burst'] = max(1, round(base * (1 + burst_rng.uniform(-burst, burst))))
+        yield config
+
+
+# 自由度低於此值時以精確的 t 分布 CDF 反解分位數，其餘使用 Cornish-Fisher 近似
+EXACT_T_MAX_DF = 30
+
+
+def t_cdf(t, df):
+    """
+    整數自由度的 Student t 分布 CDF (有限級數的封閉式)
+    θ = atan(t / √df)；奇數 df 為 1/2 + (θ + sinθ cosθ Σ) / π，偶數 df 為 1/2 + sinθ Σ / 2
+    """
+    theta = math.atan(t / math.sqrt(df))
+    sin, cos2 = math.sin(theta), math.cos(theta) ** 2
+    if df % 2:
+        total, term = 0.0, 1.0
+        for k in range(1, (df - 1) // 2 + 1):
+            total += term
+            term *= cos2 * 2 * k / (2 * k + 1)
+        return 0.5 + (theta + sin * math.cos(theta) * total) / math.pi
+    total, term = 0.0, 1.0
+    for k in range(1, df // 2 + 1):
+        total += term
+        term *= cos2 * (2 * k - 1) / (2 * k)
+    return 0.5 + sin * total / 2
+
+
+def t_quantile(p, df):
+    """
+    Student t 分布的分位數
+    小自由度 (replica 很少時) 以二分法反解精確的 CDF；
+    其餘以常態分位數的 Cornish-Fisher 展開近似 (df >= 30 時相對誤差低於 1e-5)
+    """
+    if df < EXACT_T_MAX_DF:
+        if p == 0.5:
+            return 0.0
+        if p < 0.5:
+            return -t_quantile(1 - p, df)
+        low, high = 0.0, 1.0
+        while t_cdf(high, df) < p:
+            high *= 2
+        for _ in range(100):
+            mid = (low + high) / 2
+            if t_cdf(mid, df) < p:
+                low = mid
+            else:
+                high = mid
+        return (low + high) / 2
+
+    z = NormalDist().inv_cdf(p)
+    z2 = z * z
+    g1 = (z2 + 1) * z / 4
+    g2 = ((5 * z2 + 16) * z2 + 3) * z / 96
+    g3 = (((3 * z2 + 19) * z2 + 17) * z2 - 15) * z / 384
+    g4 = ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) * z / 92160
+    return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+
+
+def validate_replica_spec(spec):
+    """檢查並補上 replica 規格的預設值"""
+    replicas = spec.get('replicas', 30)
+    if not isinstance(replicas, int) or isinstance(replicas, bool) or not 2 <= replicas <= MAX_REPLICAS:
+        raise ValueError(f"Replica count must be between 2 and {MAX_REPLICAS}")
+    min_replicas = spec.get('min_replicas', min(DEFAULT_MIN_REPLICAS, replicas))
+    if not isinstance(min_replicas, int) or not 2 <= min_replicas <= replicas:
+        raise ValueError(f"Invalid min_replicas: {min_replicas!r}")
+    confidence = spec.get('confidence', DEFAULT_CONFIDENCE)
+    if not isinstance(confidence, (int, float)) or not 0 < confidence < 1:
+        raise ValueError(f"Invalid confidence: {confidence!r}")
+    tolerance = spec.get('relative_tolerance', DEFAULT_RELATIVE_TOLERANCE)
+    if not isinstance(tolerance, (int, float)) or tolerance < 0:
+        raise ValueError(f"Invalid relative tolerance: {tolerance!r}")
+    if not isinstance(spec.get('scenario'), dict):
+        raise ValueError("Replica spec needs a scenario")
+
+    return {
+        'replicas': replicas,
+        'min_replicas': min_replicas,
+        'confidence': confidence,
+        'relative_tolerance': tolerance,
+        'seed': spec.get('seed', 0)
+    }
+
+
+class ReplicaEstimator:
+    """
+    依 replica 順序加入結果，估計各指標的平均與 t 信賴區間
+    所有指標的區間半寬都不超過 relative_tolerance × |平均| 時即可停止；
+    判斷只取決於已加入的前 n 個 replica，與 worker 數及完成順序無關
+    """
+
+    def __init__(self, confidence=DEFAULT_CONFIDENCE, relative_tolerance=DEFAULT_RELATIVE_TOLERANCE,
+                 min_replicas=DEFAULT_MIN_REPLICAS):
+        self.confidence = confidence
+        self.relative_tolerance = relative_tolerance
+        self.min_replicas = min_replicas
+        self.stats = {metric: RunningStats() for metric in REPLICA_METRICS}
+
+    @property
+    def count(self):
+        return self.stats['makespan'].count
+
+    def add(self, metrics):
+        """metrics: replica_metrics 的結果"""
+        for metric, stats in self.stats.items():
+            stats.add(float(metrics[metric]))
+
+    def half_width(self, stats):
+        if stats.count < 2:
+            return math.inf
+        return t_quantile((1 + self.confidence) / 2, stats.count - 1) * stats.std / math.sqrt(stats.count)
+
+    def settled(self):
+        if self.count < self.min_replicas:
+            return False
+        return all(self.half_width(stats) <= self.relative_tolerance * abs(stats.mean)
+                   for stats in self.stats.values())
+
+    def summary(self):
+        summary = {}
+        for metric, stats in self.stats.items():
+            half_width = self.half_width(stats)
+            bounded = math.isfinite(half_width)
+            summary[metric] = {
+                'mean': round(stats.mean, 4) if stats.count else None,
+                'std': round(stats.std, 4) if stats.count else None,
+                'ci_low': round(stats.mean - half_width, 4) if bounded else None,
+                'ci_high': round(stats.mean + half_width, 4) if bounded else None,
+                'half_width': round(half_width, 4) if bounded else None
+            }
+        return summary
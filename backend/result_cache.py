@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# 結果格式或排程演算法改變時遞增，讓舊的快取 (包含磁碟上的) 失效
+CACHE_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+
+
+def canonical_json(value):
+    """鍵排序、無多餘空白的 JSON，同樣內容的請求得到同樣的字串"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def cache_key(kind, payload):
+    """以請求類型與正規化後內容的 SHA-256 作為快取鍵"""
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_VERSION}:{kind}:".encode())
+    digest.update(canonical_json(payload).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    內容定址的結果快取
+    記憶體層為 LRU (同時限制筆數與序列化後的大小)；設定 disk_dir 時另有磁碟層，
+    每筆結果存成 <key>.json，總大小超過 max_disk_bytes 時刪除最久未使用 (mtime 最舊) 的檔案
+    快取的結果由多個請求共用，取出後不可修改
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES,
+                 disk_dir=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.entries = OrderedDict()  # key -> (結果, 序列化大小)
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+
+        self.disk_dir = None
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_bytes = 0
+        if disk_dir:
+            self.enable_disk(disk_dir, max_disk_bytes)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def enable_disk(self, disk_dir, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        os.makedirs(disk_dir, exist_ok=True)
+        with self.lock:
+            self.disk_dir = disk_dir
+            self.max_disk_bytes = max_disk_bytes
+            self.disk_bytes = sum(size for _, _, size in self._disk_files())
+            self._evict_disk()
+
+    def get(self, key):
+        """取得快取結果 (沒有則為 None)；磁碟層命中時同時放回記憶體層"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            data = self._read_disk(key)
+            if data is None:
+                self.misses += 1
+                return None
+            result = json.loads(data)
+            self._put_memory(key, result, len(data))
+            self.hits += 1
+            self.disk_hits += 1
+            return result
+
+    def put(self, key, result):
+        """存入結果 (必須可序列化為 JSON)"""
+        data = canonical_json(result).encode()
+        with self.lock:
+            self._put_memory(key, result, len(data))
+            if self.disk_dir is not None:
+                self._write_disk(key, data)
+
+    def discard(self, key):
+        """移除單筆結果 (例如結果引用的軌跡已被刪除)"""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.memory_bytes -= entry[1]
+            if self.disk_dir is not None:
+                path = self._path(key)
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    self.disk_bytes -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.memory_bytes = 0
+            for path, _, _ in self._disk_files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.disk_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'memory_bytes': self.memory_bytes,
+                'disk_dir': self.disk_dir,
+                'disk_bytes': self.disk_bytes if self.disk_dir is not None else None,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+    # 記憶體層
+    def _put_memory(self, key, result, size):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= previous[1]
+        if size > self.max_memory_bytes:
+            return  # 單筆超過上限時只存磁碟層
+        self.entries[key] = (result, size)
+        self.memory_bytes += size
+        while len(self.entries) > self.max_entries or self.memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.memory_bytes -= evicted_size
+
+    # 磁碟層
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # 以 mtime 記錄最近使用時間
+        except OSError:
+            return None
+        return data
+
+    def _write_disk(self, key, data):
+        if len(data) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)  # 原子替換，讀取端不會看到寫到一半的檔案
+        self.disk_bytes += len(data) - previous
+        self._evict_disk()
+
+    def _disk_files(self):
+        """回傳 [(路徑, mtime, 大小)]"""
+        files = []
+        if self.disk_dir is None:
+            return files
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.json') and entry.is_file():
+                stat = entry.stat()
+                files.append((entry.path, stat.st_mtime, stat.st_size))
+        return files
+
+    def _evict_disk(self):
+        if self.disk_bytes <= self.max_disk_bytes:
+            return
+        for path, _, size in sorted(self._disk_files(), key=lambda item: item[1]):
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                self.disk_bytes -= size
+            except OSError:
+                pass
@@ -0,0 +1,373 @@
+import heapq
+import itertools
+
+# 預設時間片與 context switch 成本 (模擬秒)
+DEFAULT_TIME_SLICE = 1.0
+DEFAULT_CONTEXT_SWITCH_COST = 0.05
+
+# 以嚴格優先權排程的 priority_class，其餘類別使用 CFS
+REALTIME_CLASSES = ('REALTIME',)
+
+# REALTIME 類別內的優先權 (數字越大越優先)
+THREAD_PRIORITY_LEVELS = {
+    'IDLE': 0,
+    'LOWEST': 1,
+    'BELOW_NORMAL': 2,
+    'NORMAL': 3,
+    'ABOVE_NORMAL': 4,
+    'HIGHEST': 5,
+    'TIME_CRITICAL': 6
+}
+
+# CFS 權重：priority_class 決定基準 nice 值，thread_priority 再微調
+CLASS_NICE = {'HIGH': -5, 'NORMAL': 0, 'IDLE': 15}
+THREAD_NICE = {
+    'IDLE': 3,
+    'LOWEST': 2,
+    'BELOW_NORMAL': 1,
+    'NORMAL': 0,
+    'ABOVE_NORMAL': -1,
+    'HIGHEST': -2,
+    'TIME_CRITICAL': -3
+}
+NICE_0_WEIGHT = 1024
+
+# vruntime 比較的容忍值
+_EPS = 1e-9
+# 工作量與 vruntime 捨去到的小數位數：逐 tick 累減與事件引擎一次扣除的浮點誤差不影響比較結果
+WORK_DIGITS = 6
+
+
+def nice_weight(nice):
+    """與 Linux sched_prio_to_weight 相同：nice 每差 1 權重約差 1.25 倍"""
+    nice = min(19, max(-20, nice))
+    return NICE_0_WEIGHT / 1.25 ** nice
+
+
+def task_weight(task):
+    return nice_weight(CLASS_NICE.get(task.priority_class, 0) + THREAD_NICE.get(task.thread_priority, 0))
+
+
+class SchedEntity:
+    """
+    run queue 中的排程單位 (任務本身不能加屬性，排程狀態記在這裡)
+    執行中時剩餘時間以核心的 task_time_left 為準，被換下時才寫回 remaining
+    """
+
+    __slots__ = ('task', 'remaining', 'vruntime', 'weight', 'rt_priority', 'seq',
+                 'slice_start', 'run_remaining', 'migration_penalty')
+
+    def __init__(self, task):
+        self.task = task
+        self.remaining = task.cpu_burst
+        self.vruntime = 0.0
+        self.weight = task_weight(task)
+        self.rt_priority = THREAD_PRIORITY_LEVELS.get(task.thread_priority, 0) \
+            if task.priority_class in REALTIME_CLASSES else None
+        self.seq = 0
+        self.slice_start = 0.0
+        self.run_remaining = 0.0  # 換上核心時的 remaining
+        self.migration_penalty = 0.0  # 遷移後下次執行要多付出的時間 (快取重新載入)
+
+    @property
+    def realtime(self):
+        return self.rt_priority is not None
+
+    def progress(self, core):
+        """本次換上核心後完成的工作量 (context switch 成本先於工作消耗)"""
+        return round(self.run_remaining - min(self.run_remaining, core.task_time_left), WORK_DIGITS)
+
+    def current_vruntime(self, core):
+        return round(self.vruntime + self.progress(core) * NICE_0_WEIGHT / self.weight, WORK_DIGITS)
+
+
+class CoreRunQueue:
+    """
+    單一核心的 run queue
+    REALTIME 任務在 (-優先權, 順序) heap 中嚴格依優先權執行 (同優先權先到先執行，類似 SCHED_FIFO)；
+    其他任務在 (vruntime, 順序) heap 中依 CFS 挑選 vruntime 最小者；
+    插入與取出都是 O(log n)
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.rt_heap = []  # (-rt_priority, seq, entity)
+        self.cfs_heap = []  # (vruntime, seq, entity)
+        self.current = None
+        self.min_vruntime = 0.0
+        self.queued_work = 0.0  # 等待中任務的剩餘工作量總和
+        self.online = True  # 下線的核心不接受新任務，執行中的任務跑完後即閒置
+
+    def __len__(self):
+        """等待中的任務數 (不含執行中)"""
+        return len(self.rt_heap) + len(self.cfs_heap)
+
+    def nr_running(self):
+        return len(self) + (self.current is not None)
+
+    def load(self):
+        """核心上的剩餘工作量 (等待中與執行中)；捨去浮點累減誤差，比較時不受引擎推進方式影響"""
+        return round(self.queued_work + self.current_work(), WORK_DIGITS)
+
+    def waiting(self):
+        """等待中的任務 (不依執行順序)"""
+        return [entry[2] for entry in self.rt_heap] + [entry[2] for entry in self.cfs_heap]
+
+    def current_work(self):
+        """執行中任務的剩餘時間 (含尚未付完的 context switch 成本)"""
+        if self.current is None or self.core.current_task is not self.current.task:
+            return 0.0
+        return max(0.0, self.core.task_time_left)
+
+    def update_min_vruntime(self):
+        """min_vruntime 只會遞增：取執行中任務與最左邊任務 vruntime 的較小者"""
+        candidates = [entry[0] for entry in self.cfs_heap[:1]]
+        current = self.current
+        if current is not None and not current.realtime and self.core.current_task is current.task:
+            candidates.append(current.current_vruntime(self.core))
+        if candidates:
+            self.min_vruntime = max(self.min_vruntime, min(candidates))
+
+    def enqueue(self, entity, seq, new=False):
+        """加入可執行任務；新任務的 vruntime 從 min_vruntime 起算，不會因晚到而長時間獨佔核心"""
+        if entity.realtime:
+            heapq.heappush(self.rt_heap, (-entity.rt_priority, seq, entity))
+        else:
+            if new:
+                self.update_min_vruntime()
+                entity.vruntime = max(entity.vruntime, self.min_vruntime)
+            heapq.heappush(self.cfs_heap, (entity.vruntime, seq, entity))
+        entity.seq = seq
+        self.queued_work += entity.remaining
+
+    def pop(self):
+        """取出下一個要執行的任務：REALTIME 優先，其次為 vruntime 最小的任務"""
+        if self.rt_heap:
+            entity = heapq.heappop(self.rt_heap)[2]
+        elif self.cfs_heap:
+            entity = heapq.heappop(self.cfs_heap)[2]
+        else:
+            return None
+        self.queued_work -= entity.remaining
+        return entity
+
+    def remove(self, entity):
+        """移除等待中的任務 (遷移用，O(n))"""
+        heap = self.rt_heap if entity.realtime else self.cfs_heap
+        for index, entry in enumerate(heap):
+            if entry[2] is entity:
+                heap[index] = heap[-1]
+                heap.pop()
+                heapq.heapify(heap)
+                self.queued_work -= entity.remaining
+                return
+        raise ValueError(f"Task {entity.task.task_id} is not waiting on core {self.core.core_id}")
+
+    def should_preempt(self, now, time_slice):
+        """執行中的任務是否應被換下"""
+        current = self.current
+        if self.rt_heap:
+            top_priority = -self.rt_heap[0][0]
+            if not current.realtime or top_priority > current.rt_priority:
+                return True  # 更高優先權的 REALTIME 任務立即搶佔
+
+        if current.realtime or now < current.slice_start + time_slice - _EPS:
+            return False  # REALTIME 任務只會被更高優先權搶佔
+        return bool(self.cfs_heap) and self.cfs_heap[0][0] < current.current_vruntime(self.core) - _EPS
+
+    def placement_key(self, entity):
+        """
+        新任務放到哪個核心：剩餘工作量越少越好
+        REALTIME 任務先看優先權不低於它 (會比它先執行) 的工作量
+        """
+        work = self.load()
+        if entity.realtime:
+            ahead = sum(entry[2].remaining for entry in self.rt_heap if -entry[0] >= entity.rt_priority)
+            current = self.current
+            if current is not None and current.realtime and current.rt_priority >= entity.rt_priority:
+                ahead += self.current_work()
+            return (ahead, work)
+        return (work,)
+
+
+class PreemptiveDispatcher:
+    """
+    搶佔式排程：每個核心一個 CoreRunQueue
+    新到達的任務放到排隊最短的核心 (同分時依核心適配度)；每個 tick 檢查是否需要換下執行中的任務
+    (更高優先權的 REALTIME 任務到達，或時間片用完且有 vruntime 更小的任務)。
+    每次換上任務都要先付出 context_switch_cost 的時間 (計入核心忙碌時間與功耗)。
+    任務執行時仍使用核心的 task_time_left 與 update_cores，溫度、軌跡與串流畫格不需額外處理
+    """
+
+    def __init__(self, scheduler, time_slice=DEFAULT_TIME_SLICE, context_switch_cost=DEFAULT_CONTEXT_SWITCH_COST):
+        if time_slice <= 0:
+            raise ValueError(f"Invalid time slice: {time_slice}")
+        if context_switch_cost < 0:
+            raise ValueError(f"Invalid context switch cost: {context_switch_cost}")
+        self.scheduler = scheduler  # Scheduler (提供 ready_queue、assign_task 等)
+        self.time_slice = time_slice
+        self.context_switch_cost = context_switch_cost
+        self.run_queues = [CoreRunQueue(core) for core in scheduler.cores]
+        self._seq = itertools.count()
+        self.balancer = None  # LoadBalancer (選用)
+        self.last_time = 0.0
+
+        self.context_switches = 0
+        self.preemptions = 0
+        self.switch_time = 0.0  # context switch 花費的核心時間總和
+
+    def dispatch(self, current_time):
+        """
+        每個 tick 呼叫一次 (取代 basic_idle_first_scheduler)
+        回傳本 tick 換上核心的任務 (格式同 assign_task)，被搶佔後恢復執行的任務標記 resumed
+        """
+        scheduler = self.scheduler
+        if scheduler.ready_queue is None:
+            scheduler.init_realtime_indexes()
+        ready_queue = scheduler.ready_queue
+
+        if scheduler.task_stream is not None:
+            for task in scheduler.task_stream.pull(current_time):
+                ready_queue.add(task)
+        ready_queue.release(current_time)
+
+        while ready_queue:
+            entry = ready_queue.pop()
+            if entry is None:
+                break
+            self.enqueue_new(entry[1])
+
+        self.last_time = current_time
+        balancer = self.balancer
+        if balancer is not None:
+            balancer.periodic_balance(current_time)
+
+        assignments = []
+        for run_queue in self.run_queues:
+            current = run_queue.current
+            if current is not None and run_queue.core.current_task is not current.task:
+                # 任務已在 update_cores 中完成
+                run_queue.current = current = None
+            if not run_queue.online:
+                continue
+
+            if current is not None:
+                if not len(run_queue):
+                    continue  # 沒有其他任務在等待，不需要換下
+                if not run_queue.should_preempt(current_time, self.time_slice):
+                    if current_time >= current.slice_start + self.time_slice - _EPS:
+                        current.slice_start = current_time  # 沒有更適合的任務，開始新的時間片
+                    continue
+                self.switch_out(run_queue)
+                self.preemptions += 1
+
+            entity = run_queue.pop()
+            if entity is None and balancer is not None:
+                entity = balancer.steal(run_queue)  # 閒置核心從其他核心拿取等待中的任務
+            if entity is not None:
+                assignment = self.switch_in(run_queue, entity, current_time)
+                if current is not None:
+                    assignment['preempted_task_id'] = current.task.task_id
+                assignments.append(assignment)
+
+        return assignments
+
+    def enqueue_new(self, task):
+        entity = SchedEntity(task)
+        task.assigned = True
+        self.place(entity, new=True)
+
+    def place(self, entity, new=False, source=None):
+        """放到剩餘工作量最少的在線核心 (同分時依核心適配度)；source 為原本的 run queue (重新放置時)"""
+        task = entity.task
+        run_queue = min((rq for rq in self.run_queues if rq.online), key=lambda rq: (
+            rq.placement_key(entity), -self.scheduler.calculate_core_task_affinity(rq.core, task)))
+        if source is not None and not entity.realtime:
+            entity.vruntime = round(entity.vruntime + run_queue.min_vruntime - source.min_vruntime, WORK_DIGITS)
+        task.assigned_core = run_queue.core.core_id
+        run_queue.enqueue(entity, next(self._seq), new=new)
+
+    def add_core(self, core):
+        """執行中新增的核心"""
+        run_queue = CoreRunQueue(core)
+        self.run_queues.append(run_queue)
+        if self.balancer is not None:
+            self.balancer.add_run_queue(run_queue)
+
+    def set_online(self, core_id, online):
+        """核心上線/下線；下線時等待中的任務重新放到其他在線核心"""
+        run_queue = self.run_queues[core_id]
+        run_queue.online = online
+        if online:
+            return
+        waiting = run_queue.waiting()
+        for entity in waiting:
+            run_queue.remove(entity)
+        for entity in sorted(waiting, key=lambda entity: entity.seq):
+            self.place(entity, source=run_queue)
+
+    def next_seq(self):
+        return next(self._seq)
+
+    def switch_out(self, run_queue):
+        """換下執行中的任務並放回 run queue"""
+        core = run_queue.core
+        entity = run_queue.current
+        progress = entity.progress(core)
+        entity.remaining = round(entity.remaining - progress, WORK_DIGITS)
+        if not entity.realtime:
+            entity.vruntime = entity.current_vruntime(core)
+
+        # 被搶佔的 REALTIME 任務保留原本的順序 (排在同優先權任務前面)；CFS 任務以 vruntime 排序
+        seq = entity.seq if entity.realtime else next(self._seq)
+        run_queue.current = None
+        run_queue.enqueue(entity, seq)
+
+        core.active = False
+        core.current_task = None
+        core.load = 0.0
+        del core.task_time_left
+        del core.task_start_time
+
+    def switch_in(self, run_queue, entity, current_time):
+        """將任務換上核心，先付出 context switch 成本"""
+        core = run_queue.core
+        resumed = entity.remaining < entity.task.cpu_burst
+        assignment = self.scheduler.assign_task(core, entity.task, current_time)
+        core.task_time_left = entity.remaining + self.context_switch_cost + entity.migration_penalty
+        entity.migration_penalty = 0.0
+        entity.run_remaining = entity.remaining
+        entity.slice_start = current_time
+        run_queue.current = entity
+        if not entity.realtime:
+            run_queue.update_min_vruntime()
+
+        self.context_switches += 1
+        self.switch_time += self.context_switch_cost
+        assignment['estimated_duration'] = entity.remaining / 10
+        if resumed:
+            assignment['resumed'] = True
+        return assignment
+
+    def next_decision_time(self):
+        """下一個可能需要搶佔的時間 (有任務在等待的核心其時間片結束時)；沒有則為 None"""
+        times = [run_queue.current.slice_start + self.time_slice
+                 for run_queue in self.run_queues if run_queue.current is not None and len(run_queue)]
+        if times and self.balancer is not None:
+            times.append(self.balancer.next_balance_time(self.last_time))
+        return min(times) if times else None
+
+    def waiting_tasks(self):
+        return sum(len(run_queue) for run_queue in self.run_queues)
+
+    def summary(self):
+        summary = {
+            'time_slice': self.time_slice,
+            'context_switch_cost': self.context_switch_cost,
+            'context_switches': self.context_switches,
+            'preemptions': self.preemptions,
+            'context_switch_time': round(self.switch_time, 3)
+        }
+        if self.balancer is not None:
+            summary['load_balance'] = self.balancer.summary()
+        return summary
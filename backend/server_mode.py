@@ -0,0 +1,44 @@
+ASYNC_MODES = ('threading', 'eventlet', 'gevent')
+
+# 目前的伺服器模式 (由 configure 設定)
+ASYNC_MODE = 'threading'
+
+
+def configure(mode):
+    """
+    設定伺服器模式，必須在匯入 flask / socketio 之前呼叫
+    eventlet / gevent 為協作式模式：先 monkey patch 標準函式庫，
+    讓 threading、time.sleep 與 socket 都變成可讓出的 green thread 操作
+    """
+    global ASYNC_MODE
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"Unsupported async mode: {mode}")
+
+    if mode == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+
+    ASYNC_MODE = mode
+    return mode
+
+
+def cooperative():
+    return ASYNC_MODE != 'threading'
+
+
+def run_blocking(function, *args):
+    """
+    執行長時間佔用 CPU 的計算 (離線排程、快轉模擬)
+    協作式模式下丟到真正的 OS thread pool，避免卡住所有 green thread；
+    function 內不應使用 green thread 的鎖或事件
+    """
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(function, *args)
+    if ASYNC_MODE == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(function, args)
+    return function(*args)
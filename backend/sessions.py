@@ -0,0 +1,203 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from broadcast import SessionBroadcaster
+
+
+class SessionRejected(Exception):
+    """等待佇列已滿，拒絕新的模擬"""
+
+
+class SimulationSession:
+    """
+    單次模擬執行
+    每個 session 有自己的 Socket.IO room，並可被暫停、繼續或取消
+    """
+
+    def __init__(self, kind):
+        self.session_id = uuid.uuid4().hex
+        self.room = f"session-{self.session_id}"
+        self.kind = kind
+        self.state = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.stream = None  # 差量模式的 CoreStateStream
+        self.live = None  # 實時模擬的 LiveControl (接受執行中插入/取消任務與核心變更)
+        self.broadcaster = None  # 發送到 room 的 SessionBroadcaster
+
+        self._cancel = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+        self._state_lock = threading.Lock()  # pause/resume 與開始執行之間的狀態轉換
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.state in ('completed', 'cancelled', 'failed')
+
+    def checkpoint(self):
+        """
+        模擬迴圈每個 tick 呼叫一次
+        暫停時在此等待；回傳 False 表示已被取消，應結束模擬
+        """
+        while not self._resume.wait(0.5):
+            if self._cancel.is_set():
+                return False
+        return not self._cancel.is_set()
+
+    def pause(self):
+        """佇列中的 session 也記為 paused，開始執行後停在第一個 checkpoint"""
+        with self._state_lock:
+            if self.state in ('queued', 'running'):
+                self._resume.clear()
+                self.state = 'paused'
+                return True
+            return False
+
+    def resume(self):
+        with self._state_lock:
+            if not self.finished:
+                self._resume.set()
+                if self.state == 'paused':
+                    self.state = 'running' if self.started_at is not None else 'queued'
+                return True
+            return False
+
+    def start(self):
+        """worker 開始執行時呼叫；已暫停的 session 保持 paused"""
+        with self._state_lock:
+            self.started_at = time.time()
+            if self.state == 'queued':
+                self.state = 'running'
+
+    def cancel(self):
+        if self.finished:
+            return False
+        self._cancel.set()
+        self._resume.set()  # 讓暫停中的迴圈醒來並結束
+        return True
+
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'room': self.room,
+            'kind': self.kind,
+            'state': self.state,
+            'paused': not self._resume.is_set() and not self.finished,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+
+class SimulationSessionManager:
+    """
+    模擬 session 管理
+    所有模擬都經由固定大小的 worker pool 執行，排隊數量超過上限時拒絕新的請求，
+    已結束的 session 在 session_ttl 秒後自動清除
+    cooperative=True (eventlet / gevent 模式) 時每個 session 是一個 green thread 背景任務，
+    以 semaphore 限制同時執行的數量
+    """
+
+    def __init__(self, socketio, max_workers=4, max_queued=16, session_ttl=300, cooperative=False):
+        self.socketio = socketio
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.session_ttl = session_ttl
+
+        if cooperative:
+            self.executor = None
+            self.slots = threading.BoundedSemaphore(max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='simulation')
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def submit(self, kind, target, *args, sid=None, on_skip=None):
+        """
+        建立 session 並排入 worker pool
+        target(*args, session=session) 在 worker thread 中執行
+        sid: 發出請求的 Socket.IO client，會先加入 session 的 room
+        on_skip: 在佇列中就被取消 (target 不會執行) 時呼叫，釋放為 target 預先建立的資源
+        """
+        with self.lock:
+            self._purge_expired()
+            pending = sum(1 for session in self.sessions.values() if not session.finished)
+            if pending >= self.max_workers + self.max_queued:
+                raise SessionRejected(f"Too many simulations in progress ({pending})")
+
+            session = SimulationSession(kind)
+            session.broadcaster = SessionBroadcaster(self.socketio.server, session.room)
+            self.sessions[session.session_id] = session
+
+        if sid:
+            self.join(session, sid)
+
+        if self.executor is not None:
+            self.executor.submit(self._run, session, target, args, on_skip)
+        else:
+            self.socketio.start_background_task(self._run_cooperative, session, target, args, on_skip)
+        return session
+
+    def _run_cooperative(self, session, target, args, on_skip=None):
+        with self.slots:
+            self._run(session, target, args, on_skip)
+
+    def _run(self, session, target, args, on_skip=None):
+        if session.cancelled:
+            try:
+                if on_skip is not None:
+                    on_skip()
+            finally:
+                session.state = 'cancelled'
+                session.finished_at = time.time()
+            return
+
+        session.start()
+        try:
+            target(*args, session=session)
+            session.state = 'cancelled' if session.cancelled else 'completed'
+        except Exception as e:
+            session.state = 'failed'
+            session.error = str(e)
+            self.emitter(session)('simulation_error', {'error': str(e)})
+        finally:
+            session.finished_at = time.time()
+
+    def emitter(self, session):
+        """回傳只發送到此 session room 的 emit 函式 (事件中附上 session_id，依 client 做 backpressure)"""
+        def emit(event, data):
+            session.broadcaster.emit(event, {**data, 'session_id': session.session_id})
+        return emit
+
+    def join(self, session, sid):
+        self.socketio.server.enter_room(sid, session.room, namespace='/')
+
+    def leave(self, session, sid):
+        self.socketio.server.leave_room(sid, session.room, namespace='/')
+        session.broadcaster.discard(sid)
+
+    def get(self, session_id):
+        with self.lock:
+            self._purge_expired()
+            return self.sessions.get(session_id)
+
+    def list(self):
+        with self.lock:
+            self._purge_expired()
+            return list(self.sessions.values())
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [session_id for session_id, session in self.sessions.items()
+                   if session.finished and now - session.finished_at > self.session_ttl]
+        for session_id in expired:
+            del self.sessions[session_id]
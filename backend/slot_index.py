@@ -0,0 +1,103 @@
+import bisect
+
+_INF = float('inf')
+
+# 每個區塊最多保存的閒置時段數
+_BLOCK_SIZE = 64
+
+
+class IdleSlotIndex:
+    """
+    單一核心的閒置時段索引 (插入式排程用)
+
+    閒置區間 [start, end) 依時間排序並切成固定大小的區塊，
+    每個區塊記錄最長的閒置長度；搜尋時可整塊跳過放不下任務的區塊。
+    最後一段永遠是 [最後任務結束時間, inf)
+    """
+
+    def __init__(self):
+        # 每個區塊為 [starts, ends, max_length]
+        self.blocks = [[[0.0], [_INF], _INF]]
+        self.block_starts = [0.0]  # 各區塊第一個閒置時段的開始時間
+        self.block_ends = [_INF]  # 各區塊最後一個閒置時段的結束時間
+
+    def find_slot(self, ready_time, duration, finish_limit=_INF):
+        """
+        回傳 ready_time 之後第一個放得下 duration 的開始時間
+        若無法在 finish_limit 之前完成則回傳 None (用於提前結束空檔掃描)
+        """
+        latest_start = finish_limit - duration
+        blocks = self.blocks
+        b = bisect.bisect_right(self.block_ends, ready_time)
+        first = True
+        while b < len(blocks):
+            starts, ends, max_length = blocks[b]
+            if starts[0] >= latest_start:
+                return None
+            if max_length >= duration:
+                i = bisect.bisect_right(ends, ready_time) if first else 0
+                while i < len(starts):
+                    start = starts[i] if starts[i] > ready_time else ready_time
+                    if start >= latest_start:
+                        return None
+                    if start + duration <= ends[i]:
+                        return start
+                    i += 1
+            first = False
+            b += 1
+        return None
+
+    def tail_start(self, ready_time):
+        """接在最後一個任務之後的開始時間"""
+        last = self.blocks[-1][0][-1]
+        return last if last > ready_time else ready_time
+
+    def has_gaps(self):
+        """除了最後的無限時段外是否還有閒置空檔"""
+        return len(self.blocks) > 1 or len(self.blocks[0][0]) > 1
+
+    def reserve(self, start, duration):
+        """佔用 [start, start + duration)，必須位於某個閒置時段內"""
+        finish = start + duration
+        b = bisect.bisect_right(self.block_starts, start) - 1
+        block = self.blocks[b]
+        starts, ends = block[0], block[1]
+        i = bisect.bisect_right(starts, start) - 1
+        slot_start, slot_end = starts[i], ends[i]
+
+        # 將閒置時段切成前後兩段 (長度為 0 的部分捨棄)
+        replacement_starts = []
+        replacement_ends = []
+        if start > slot_start:
+            replacement_starts.append(slot_start)
+            replacement_ends.append(start)
+        if finish < slot_end:
+            replacement_starts.append(finish)
+            replacement_ends.append(slot_end)
+
+        starts[i:i + 1] = replacement_starts
+        ends[i:i + 1] = replacement_ends
+
+        if not starts:
+            del self.blocks[b]
+            del self.block_starts[b]
+            del self.block_ends[b]
+            return
+
+        if len(starts) > _BLOCK_SIZE * 2:
+            # 區塊過大時對半切開
+            half = len(starts) // 2
+            new_block = [starts[half:], ends[half:], 0]
+            del starts[half:]
+            del ends[half:]
+            self.blocks.insert(b + 1, new_block)
+            self.block_starts.insert(b + 1, new_block[0][0])
+            self.block_ends.insert(b + 1, new_block[1][-1])
+            self._refresh(b + 1)
+        self._refresh(b)
+
+    def _refresh(self, b):
+        starts, ends, _ = block = self.blocks[b]
+        block[2] = max(end - start for start, end in zip(starts, ends))
+        self.block_starts[b] = starts[0]
+        self.block_ends[b] = ends[-1]
@@ -0,0 +1,117 @@
+import math
+
+# core_states_update 中每個核心的欄位 (core_id 以外)
+CORE_STATE_FIELDS = ('active', 'load', 'temp', 'freq', 'power', 'thermal_throttling',
+                     'current_task', 'task_time_left')
+
+# 預設每隔多少秒送一次完整 keyframe，讓中途加入的 client 能同步
+DEFAULT_KEYFRAME_INTERVAL = 2.0
+
+
+def core_state(core):
+    """核心狀態 (與 core_states_update 的欄位順序相同，不含 core_id)"""
+    return (
+        core.active,
+        round(core.load * 100, 1),
+        round(core.temp, 1),
+        round(core.dvfs_freq, 2),
+        round(core.power, 2),
+        core.thermal_throttling,
+        core.current_task.name if core.current_task else None,
+        round(getattr(core, 'task_time_left', 0), 2)
+    )
+
+
+class CoreStateStream:
+    """
+    差量編碼的 core_states_update 串流
+
+    第一個畫格與之後每 keyframe_interval 秒送出完整 keyframe，
+    其餘畫格只送出有變化的核心與欄位；
+    畫格依 client 要求的 frame_rate 合併，期間的 task_assigned / task_completed
+    也一起放入同一個畫格送出
+    """
+
+    def __init__(self, emit, max_simulation_time, frame_rate=None, time_step=0.1,
+                 keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        if frame_rate is not None and frame_rate <= 0:
+            raise ValueError(f"Invalid frame rate: {frame_rate}")
+
+        self.emit = emit
+        self.max_simulation_time = max_simulation_time
+        # 以 tick 為單位的畫格間隔 (至少 1 tick)
+        self.frame_ticks = 1 if frame_rate is None else max(1, math.ceil(round(1.0 / (frame_rate * time_step), 9)))
+        self.keyframe_ticks = max(self.frame_ticks, round(keyframe_interval / time_step))
+
+        self.last_states = {}  # core_id -> 上次送出的狀態
+        self.pending_assigned = []
+        self.pending_completed = []
+        self.ticks_since_frame = 0
+        self.ticks_since_keyframe = 0
+        self.sequence = 0
+        self.force_keyframe = True
+
+    def request_keyframe(self):
+        """下一個畫格送完整 keyframe (例如有新的 client 加入)"""
+        self.force_keyframe = True
+
+    def push(self, cores, current_time, assignments, completed_tasks):
+        """每個 tick 呼叫一次；到達畫格間隔時才送出"""
+        self.pending_assigned.extend(assignments)
+        for task in completed_tasks:
+            self.pending_completed.append({
+                'task_id': task.task_id,
+                'task_name': task.name,
+                'completion_time': current_time
+            })
+
+        self.ticks_since_frame += 1
+        if self.ticks_since_frame >= self.frame_ticks:
+            self.send_frame(cores, current_time)
+
+    def flush(self, cores, current_time):
+        """模擬結束前送出尚未送出的事件"""
+        if self.ticks_since_frame or self.pending_assigned or self.pending_completed:
+            self.send_frame(cores, current_time)
+
+    def send_frame(self, cores, current_time):
+        self.ticks_since_keyframe += self.ticks_since_frame
+        keyframe = self.force_keyframe or self.ticks_since_keyframe >= self.keyframe_ticks
+        last_states = self.last_states
+
+        changed = []
+        for core in cores:
+            state = core_state(core)
+            previous = last_states.get(core.core_id)
+            if keyframe or previous is None:
+                entry = dict(zip(CORE_STATE_FIELDS, state))
+            elif previous != state:
+                entry = {field: value for field, value, old in zip(CORE_STATE_FIELDS, state, previous)
+                         if value != old}
+            else:
+                continue
+            entry['core_id'] = core.core_id
+            changed.append(entry)
+            last_states[core.core_id] = state
+
+        frame = {
+            'seq': self.sequence,
+            'keyframe': keyframe,
+            'time': current_time,
+            'remaining_time': self.max_simulation_time - current_time,
+            'assigned': self.pending_assigned,
+            'completed': self.pending_completed
+        }
+        if keyframe:
+            frame['cores'] = changed
+        else:
+            frame['deltas'] = changed
+        self.emit('core_states_update', frame)
+
+        self.sequence += 1
+        self.pending_assigned = []
+        self.pending_completed = []
+        self.ticks_since_frame = 0
+        if keyframe:
+            self.ticks_since_keyframe = 0
+            self.force_keyframe = False
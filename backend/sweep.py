@@ -0,0 +1,131 @@
+SWEEP_STRATEGIES = ('EDF', 'HEFT', 'EAS', 'BASIC', 'PREEMPTIVE', 'BALANCED')
+# 別名：realtime 即 basic_idle_first_scheduler 的實時模擬
+STRATEGY_ALIASES = {'REALTIME': 'BASIC'}
+# 實時模擬的策略：完成時間為模擬秒數、能耗為整個系統每個 tick 的功耗總和；
+# 離線排程 (EDF/HEFT/EAS) 的完成時間以 cpu_burst/10 計、能耗只計算任務本身，兩者單位不同，分開比較；
+# 離線排程之間以 evaluate_schedule 用同一個能耗模型重新計算後比較
+REALTIME_STRATEGIES = ('BASIC', 'PREEMPTIVE', 'BALANCED')
+
+# 每個送進 process pool 的批次大小上限 (減少行程間傳輸次數)
+DEFAULT_BATCH_SIZE = 32
+
+
+def normalize_strategy(strategy):
+    name = str(strategy).upper()
+    name = STRATEGY_ALIASES.get(name, name)
+    if name not in SWEEP_STRATEGIES:
+        raise ValueError(f"Invalid strategy: {strategy}")
+    return name
+
+
+def strategy_family(strategy):
+    """'realtime' 或 'offline' (同一類的結果才能互相比較)"""
+    return 'realtime' if strategy in REALTIME_STRATEGIES else 'offline'
+
+
+def normalize_core_mix(core_mix):
+    """
+    核心組合可寫成 {"P": 2, "E": 4} 或與 /api/execute 相同的核心設定列表
+    回傳 (標籤, 核心設定列表)
+    """
+    if isinstance(core_mix, dict):
+        core_configs = []
+        for core_type, count in core_mix.items():
+            if not isinstance(count, int) or count < 0:
+                raise ValueError(f"Invalid core count for {core_type}: {count}")
+            core_configs.extend({'core_type': core_type} for _ in range(count))
+        label = '+'.join(f"{count}{core_type}" for core_type, count in core_mix.items() if count)
+    elif isinstance(core_mix, list):
+        core_configs = core_mix
+        counts = {}
+        for config in core_configs:
+            core_type = config.get('core_type', 'P')
+            counts[core_type] = counts.get(core_type, 0) + 1
+        label = '+'.join(f"{count}{core_type}" for core_type, count in counts.items())
+    else:
+        raise ValueError(f"Invalid core mix: {core_mix!r}")
+
+    if not core_configs:
+        raise ValueError("Core mix must contain at least one core")
+    return label, core_configs
+
+
+def normalize_workload(workload, index):
+    """工作負載可寫成任務列表或 {"name": ..., "tasks": [...]}；回傳 (名稱, 任務設定列表)"""
+    if isinstance(workload, list):
+        return f"workload-{index}", workload
+    if isinstance(workload, dict) and isinstance(workload.get('tasks'), list):
+        return workload.get('name') or f"workload-{index}", workload['tasks']
+    raise ValueError(f"Invalid workload at index {index}")
+
+
+def expand_sweep(spec):
+    """
+    展開掃描參數格點
+    回傳 (strategies, core_mixes, workloads, cases)，cases 為 (strategy, mix_index, workload_index)
+    """
+    strategies = [normalize_strategy(strategy) for strategy in spec.get('strategies', SWEEP_STRATEGIES)]
+    core_mixes = [normalize_core_mix(core_mix) for core_mix in spec.get('core_mixes', [])]
+    workloads = [normalize_workload(workload, i) for i, workload in enumerate(spec.get('workloads', []))]
+    if not strategies or not core_mixes or not workloads:
+        raise ValueError("Sweep needs at least one strategy, core mix and workload")
+
+    cases = [(strategy, mix_index, workload_index)
+             for mix_index in range(len(core_mixes))
+             for workload_index in range(len(workloads))
+             for strategy in strategies]
+    return strategies, core_mixes, workloads, cases
+
+
+def make_batches(cases, batch_size=DEFAULT_BATCH_SIZE, max_workers=1):
+    """依序切成批次；案例不多時縮小批次，讓每個 worker 都分得到工作"""
+    batch_size = max(1, min(batch_size, -(-len(cases) // (max_workers * 4))))
+    indexed = list(enumerate(cases))
+    return [indexed[start:start + batch_size] for start in range(0, len(indexed), batch_size)]
+
+
+def aggregate_sweep(rows):
+    """
+    彙整掃描結果 (實時與離線策略的單位不同，各自排名)
+    table: 每個 (核心組合, 策略) 在所有工作負載上的平均完成時間、平均能耗與錯過截止時間總數
+    best: 每個 (核心組合, 工作負載, 策略類別) 中完成時間最短 (同分比能耗) 的策略
+    """
+    groups = {}
+    best = {}
+    for row in rows:
+        groups.setdefault((row['core_mix'], row['strategy']), []).append(row)
+        if row.get('error'):
+            continue
+
+        case_key = (row['core_mix'], row['workload'], strategy_family(row['strategy']))
+        rank = (row['makespan'], row['total_energy'])
+        if case_key not in best or rank < best[case_key][0]:
+            best[case_key] = (rank, row['strategy'])
+
+    wins = {}
+    for (core_mix, _, _), (_, strategy) in best.items():
+        wins[core_mix, strategy] = wins.get((core_mix, strategy), 0) + 1
+
+    table = []
+    for (core_mix, strategy), group in groups.items():
+        ok = [row for row in group if not row.get('error')]
+        misses = [row['deadline_misses'] for row in ok if row['deadline_misses'] is not None]
+        table.append({
+            'core_mix': core_mix,
+            'strategy': strategy,
+            'family': strategy_family(strategy),
+            'runs': len(group),
+            'errors': len(group) - len(ok),
+            'avg_makespan': round(sum(row['makespan'] for row in ok) / len(ok), 2) if ok else None,
+            'avg_energy': round(sum(row['total_energy'] for row in ok) / len(ok), 2) if ok else None,
+            'deadline_misses': sum(misses) if misses else None,
+            'wins': wins.get((core_mix, strategy), 0)
+        })
+    table.sort(key=lambda entry: (entry['core_mix'], entry['family'], entry['avg_makespan'] is None,
+                                  entry['avg_makespan'] or 0))
+
+    return {
+        'table': table,
+        'best': [{'core_mix': core_mix, 'workload': workload, 'family': family, 'strategy': strategy}
+                 for (core_mix, workload, family), (_, strategy) in sorted(best.items())]
+    }
@@ -0,0 +1,68 @@
+class TaskGraph:
+    """
+    任務相依圖
+    以列表索引表示任務，保存前驅/後繼列表與 in-degree，
+    建立時即檢查未知的相依任務與循環相依，避免排程時無法結束
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.index_of = {}
+        for index, task in enumerate(tasks):
+            if task.task_id in self.index_of:
+                raise ValueError(f"Duplicate task id: {task.task_id}")
+            self.index_of[task.task_id] = index
+
+        self.predecessors = [[] for _ in tasks]
+        self.successors = [[] for _ in tasks]
+        for index, task in enumerate(tasks):
+            for dep in task.dependencies:
+                dep_index = self.index_of.get(dep)
+                if dep_index is None:
+                    raise ValueError(f"Task {task.task_id} depends on unknown task {dep}")
+                if dep_index == index:
+                    raise ValueError(f"Task {task.task_id} depends on itself")
+                self.predecessors[index].append(dep_index)
+                self.successors[dep_index].append(index)
+
+        self.order = self.topological_order()
+
+    def in_degrees(self):
+        return [len(preds) for preds in self.predecessors]
+
+    def topological_order(self):
+        """Kahn 演算法；有循環相依時丟出 ValueError"""
+        in_degree = self.in_degrees()
+        order = [index for index, degree in enumerate(in_degree) if degree == 0]
+
+        head = 0
+        while head < len(order):
+            index = order[head]
+            head += 1
+            for succ in self.successors[index]:
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    order.append(succ)
+
+        if len(order) < len(self.tasks):
+            blocked = [self.tasks[index].task_id for index, degree in enumerate(in_degree) if degree > 0]
+            preview = ', '.join(str(task_id) for task_id in blocked[:10])
+            raise ValueError(f"Cyclic dependencies among tasks: {preview}"
+                             + (' ...' if len(blocked) > 10 else ''))
+
+        return order
+
+    def upward_ranks(self, costs):
+        """
+        HEFT upward rank：rank(t) = cost(t) + max(rank(後繼))
+        依反向拓撲順序計算，每個任務只計算一次
+        """
+        ranks = [0.0] * len(self.tasks)
+        successors = self.successors
+        for index in reversed(self.order):
+            succ_rank = 0.0
+            for succ in successors[index]:
+                if ranks[succ] > succ_rank:
+                    succ_rank = ranks[succ]
+            ranks[index] = costs[index] + succ_rank
+        return ranks
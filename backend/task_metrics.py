@@ -0,0 +1,222 @@
+import math
+
+# 回報的延遲百分位數
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RunningStats:
+    """Welford 線上平均與變異數 (常數記憶體)"""
+
+    __slots__ = ('count', 'mean', 'm2', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        if not self.count:
+            return {'mean': None, 'std': None, 'max': None}
+        return {'mean': round(self.mean, 3), 'std': round(self.std, 3), 'max': round(self.max, 3)}
+
+
+class P2Quantile:
+    """
+    P² 演算法 (Jain & Chlamtac, 1985) 的單一百分位數估計
+    只保存 5 個標記點的高度與位置，每次加入觀測值以拋物線內插調整標記點
+    """
+
+    __slots__ = ('p', 'heights', 'positions', 'desired', 'increments')
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError(f"Invalid quantile: {p}")
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        # 找出觀測值所在的區間，必要時更新極值標記
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+
+        positions = self.positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # 調整中間三個標記點
+        for i in range(1, 4):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        heights = self.heights
+        if not heights:
+            return None
+        if len(heights) < 5:
+            # 樣本不足 5 個時直接以排序後的樣本內插
+            position = self.p * (len(heights) - 1)
+            low = int(position)
+            high = min(low + 1, len(heights) - 1)
+            return heights[low] + (heights[high] - heights[low]) * (position - low)
+        return heights[2]
+
+
+class LatencyStats:
+    """平均、變異數與 QUANTILES 百分位數"""
+
+    __slots__ = ('stats', 'quantiles')
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.quantiles = [P2Quantile(p) for p in QUANTILES]
+
+    def add(self, value):
+        self.stats.add(value)
+        for quantile in self.quantiles:
+            quantile.add(value)
+
+    def to_dict(self):
+        result = self.stats.to_dict()
+        for quantile in self.quantiles:
+            value = quantile.value()
+            result[f"p{round(quantile.p * 100):g}"] = round(value, 3) if value is not None else None
+        return result
+
+
+class TaskGroupMetrics:
+    """一組任務 (同類型、同優先等級或 realtime) 的延遲統計"""
+
+    __slots__ = ('response_time', 'waiting_time', 'tardiness', 'deadline_count', 'deadline_misses', 'cancelled')
+
+    def __init__(self):
+        self.response_time = LatencyStats()  # 完成 - 到達
+        self.waiting_time = LatencyStats()  # 開始執行 - 到達
+        self.tardiness = RunningStats()  # max(0, 完成 - 截止)，只計有截止時間的任務
+        self.deadline_count = 0
+        self.deadline_misses = 0
+        self.cancelled = 0  # 未完成就被取消的任務 (不計入延遲統計)
+
+    def add(self, response_time, waiting_time, tardiness):
+        self.response_time.add(response_time)
+        self.waiting_time.add(waiting_time)
+        if tardiness is not None:
+            self.tardiness.add(tardiness)
+            self.deadline_count += 1
+            if tardiness > 0:
+                self.deadline_misses += 1
+
+    def to_dict(self):
+        return {
+            'count': self.response_time.stats.count,
+            'response_time': self.response_time.to_dict(),
+            'waiting_time': self.waiting_time.to_dict(),
+            'tardiness': self.tardiness.to_dict(),
+            'deadline_misses': self.deadline_misses,
+            'deadline_miss_rate': round(self.deadline_misses / self.deadline_count * 100, 2)
+            if self.deadline_count else None,
+            'cancelled': self.cancelled
+        }
+
+
+class TaskMetrics:
+    """
+    串流的任務延遲統計
+    記錄每個任務的開始與完成時間，依任務類型、優先等級與 realtime 分組累計；
+    只保存執行中任務的開始時間，記憶體與任務總數無關
+    """
+
+    def __init__(self):
+        self.overall = TaskGroupMetrics()
+        self.realtime = TaskGroupMetrics()
+        self.by_task_type = {}
+        self.by_priority_class = {}
+        self.start_times = {}  # 執行中任務的 task_id -> 開始時間
+
+    def record(self, assignments, completed_tasks, current_time):
+        """每個 tick (或事件 tick) 呼叫一次；assignments 為 assign_task 的回傳值"""
+        for assignment in assignments:
+            # 被搶佔後恢復執行的任務保留第一次開始執行的時間
+            self.start_times.setdefault(assignment['task_id'], assignment['start_time'])
+        for task in completed_tasks:
+            self.task_completed(task, current_time)
+
+    def task_completed(self, task, finish_time):
+        start_time = self.start_times.pop(task.task_id, finish_time)
+        response_time = finish_time - task.arrival_time
+        waiting_time = start_time - task.arrival_time
+        tardiness = max(0.0, finish_time - task.deadline) if task.deadline is not None else None
+
+        self.overall.add(response_time, waiting_time, tardiness)
+        if task.realtime:
+            self.realtime.add(response_time, waiting_time, tardiness)
+        self._group(self.by_task_type, task.task_type).add(response_time, waiting_time, tardiness)
+        self._group(self.by_priority_class, task.priority_class).add(response_time, waiting_time, tardiness)
+
+    def task_cancelled(self, task):
+        """任務被取消：丟棄開始時間 (執行中或被搶佔的任務)，只計入各組的取消數"""
+        self.start_times.pop(task.task_id, None)
+        self.overall.cancelled += 1
+        if task.realtime:
+            self.realtime.cancelled += 1
+        self._group(self.by_task_type, task.task_type).cancelled += 1
+        self._group(self.by_priority_class, task.priority_class).cancelled += 1
+
+    @staticmethod
+    def _group(groups, key):
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = TaskGroupMetrics()
+        return group
+
+    def summary(self):
+        return {
+            'overall': self.overall.to_dict(),
+            'realtime': self.realtime.to_dict(),
+            'by_task_type': {key: group.to_dict() for key, group in sorted(self.by_task_type.items())},
+            'by_priority_class': {key: group.to_dict() for key, group in sorted(self.by_priority_class.items())}
+        }
@@ -0,0 +1,203 @@
+import array
+import math
+from collections import namedtuple
+from types import MappingProxyType
+
+try:
+    import numpy as np
+except ImportError:  # numpy 為選用套件，只有 TaskTable.column 需要
+    np = None
+
+# 任務類型的靜態參數；同樣參數的任務共用同一個 (不可變的) profile
+TaskProfile = namedtuple('TaskProfile', [
+    'profile_id', 'task_type', 'deadline_offset', 'priority_class', 'thread_priority',
+    'instruction_mix', 'cpu_burst', 'io_wait', 'realtime', 'affinity_hint', 'execution_time'
+])
+
+DEFAULT_INSTRUCTION_MIX = {"scalar": 0.5, "vector": 0.2, "ai": 0.1, "io": 0.2}
+
+# Task 上以類別屬性提供的 profile 欄位
+PROFILE_FIELDS = TaskProfile._fields[1:]
+
+_profiles = []  # profile_id -> TaskProfile
+_profile_ids = {}  # profile 參數 -> profile_id
+_task_classes = {}  # profile_id -> Task 子類別
+_default_names = {}  # (task_type, 後綴) -> 名稱
+
+# 串流工作負載每個 TaskTable 的列數 (整個區塊的任務都完成後即可回收)
+CHUNK_ROWS = 4096
+
+
+def intern_profile(task_type, priority_class="NORMAL", thread_priority="NORMAL", instruction_mix=None,
+                   cpu_burst=50, io_wait=0.2, realtime=False, affinity_hint=None, deadline_offset=None):
+    """取得 (必要時建立) 相同參數共用的 TaskProfile"""
+    instruction_mix = instruction_mix or DEFAULT_INSTRUCTION_MIX
+    affinity_hint = tuple(affinity_hint or ())
+    key = (task_type, deadline_offset, priority_class, thread_priority, tuple(instruction_mix.items()),
+           cpu_burst, io_wait, realtime, affinity_hint)
+    profile_id = _profile_ids.get(key)
+    if profile_id is None:
+        profile_id = len(_profiles)
+        _profiles.append(TaskProfile(
+            profile_id, task_type, deadline_offset, priority_class, thread_priority,
+            MappingProxyType(dict(instruction_mix)), cpu_burst, io_wait, realtime, affinity_hint,
+            cpu_burst / 10  # 執行時間基於 cpu_burst 的簡化計算
+        ))
+        _profile_ids[key] = profile_id
+    return _profiles[profile_id]
+
+
+def profile_variant(profile, **changes):
+    """覆寫部分參數後的 profile (例如擾動過的 cpu_burst)，同樣參數的變體共用"""
+    fields = profile._replace(**changes)
+    return intern_profile(fields.task_type, fields.priority_class, fields.thread_priority,
+                          dict(fields.instruction_mix), fields.cpu_burst, fields.io_wait, fields.realtime,
+                          fields.affinity_hint, fields.deadline_offset)
+
+
+def profile_by_id(profile_id):
+    return _profiles[profile_id]
+
+
+class TaskTable:
+    """
+    欄位式任務表
+    每個任務只佔各欄位的一格 (array.array，可用 column() 取得 NumPy view)，
+    類型相關的參數以 profile 欄位指向共用的 TaskProfile
+    """
+
+    def __init__(self):
+        self.task_id = array.array('q')
+        self.arrival = array.array('d')
+        self.deadline = array.array('d')  # NaN 表示沒有截止時間
+        self.profile = array.array('I')
+        self.assigned = array.array('B')
+        self.completed = array.array('B')
+        self.assigned_core = array.array('i')
+
+    def __len__(self):
+        return len(self.task_id)
+
+    def append(self, task_id, profile, arrival_time, deadline):
+        row = len(self.task_id)
+        self.task_id.append(task_id)
+        self.arrival.append(arrival_time)
+        self.deadline.append(math.nan if deadline is None else deadline)
+        self.profile.append(profile.profile_id)
+        self.assigned.append(0)
+        self.completed.append(0)
+        self.assigned_core.append(-1)
+        return row
+
+    def column(self, name):
+        """以 NumPy 陣列檢視欄位 (共用記憶體，新增任務後需重新取得)"""
+        if np is None:
+            raise RuntimeError("numpy is required for column views")
+        return np.frombuffer(getattr(self, name), dtype=getattr(self, name).typecode)
+
+
+class TaskTablePool:
+    """串流工作負載用：每 CHUNK_ROWS 個任務換一個新的 TaskTable，舊表在任務都釋放後被回收"""
+
+    def __init__(self, chunk_rows=CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self.current = TaskTable()
+
+    def table(self):
+        if len(self.current) >= self.chunk_rows:
+            self.current = TaskTable()
+        return self.current
+
+
+def task_class(profile):
+    """
+    每個 profile 對應一個 Task 子類別，profile 參數放在類別屬性中：
+    所有同類型任務共用，讀取速度與一般屬性相同
+    """
+    cls = _task_classes.get(profile.profile_id)
+    if cls is None:
+        attributes = {field: getattr(profile, field) for field in PROFILE_FIELDS}
+        cls = type(f"{Task.__name__}[{profile.task_type}#{profile.profile_id}]", (Task,),
+                   {'__slots__': (), 'profile': profile, **attributes})
+        _task_classes[profile.profile_id] = cls
+    return cls
+
+
+def default_name(task_type, suffix):
+    """預設名稱 "{task_type}_{suffix}"；同樣的名稱共用一個字串"""
+    key = (task_type, suffix)
+    name = _default_names.get(key)
+    if name is None:
+        name = _default_names[key] = f"{task_type}_{suffix}"
+    return name
+
+
+class Task:
+    """
+    TaskTable 中一列的檢視
+    建立後不變的 task_id / 到達 / 截止時間同時存在 slot 與表格欄位 (排程熱路徑直接讀 slot)，
+    分配/完成狀態只存在表格中，類型參數是 task_class(profile) 的類別屬性；
+    名稱與相依列表只是指向共用字串/tuple 的參考
+    """
+
+    __slots__ = ('table', 'row', 'task_id', 'name', 'arrival_time', 'deadline', 'dependencies',
+                 'affinity_row')
+
+    def __init__(self, task_id, name, task_type, arrival_time=0, deadline=None,
+                 priority_class="NORMAL", thread_priority="NORMAL",
+                 instruction_mix=None, cpu_burst=50, io_wait=0.2,
+                 realtime=False, affinity_hint=None, dependencies=None, table=None):
+        profile = intern_profile(task_type, priority_class, thread_priority, instruction_mix,
+                                 cpu_burst, io_wait, realtime, affinity_hint)
+        self.__class__ = task_class(profile)
+        self.table = table if table is not None else TaskTable()
+        self.row = self.table.append(task_id, profile, arrival_time, deadline)
+        self.task_id = task_id
+        self.name = name
+        self.dependencies = tuple(dependencies) if dependencies else ()
+        self.arrival_time = arrival_time
+        self.deadline = deadline
+        self.affinity_row = None
+
+    @classmethod
+    def from_profile(cls, table, task_id, profile, arrival_time, deadline, name_suffix=0, name=None,
+                     dependencies=()):
+        """不經過 profile 比對，直接在表格中新增一列 (建立大量任務時使用)"""
+        task = object.__new__(task_class(profile))
+        task.table = table
+        task.row = table.append(task_id, profile, arrival_time, deadline)
+        task.task_id = task_id
+        task.name = default_name(profile.task_type, name_suffix) if name is None else name
+        task.dependencies = tuple(dependencies) if dependencies else ()
+        task.arrival_time = arrival_time
+        task.deadline = deadline
+        task.affinity_row = None
+        return task
+
+    def __repr__(self):
+        return f"Task({self.task_id}, {self.name!r})"
+
+    # 表格欄位
+    @property
+    def assigned(self):
+        return bool(self.table.assigned[self.row])
+
+    @assigned.setter
+    def assigned(self, value):
+        self.table.assigned[self.row] = bool(value)
+
+    @property
+    def completed(self):
+        return bool(self.table.completed[self.row])
+
+    @completed.setter
+    def completed(self, value):
+        self.table.completed[self.row] = bool(value)
+
+    @property
+    def assigned_core(self):
+        return self.table.assigned_core[self.row]
+
+    @assigned_core.setter
+    def assigned_core(self, value):
+        self.table.assigned_core[self.row] = value
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 的模組是平鋪的 (由 backend/ 目錄直接 import)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+import app
+
+TASK_TYPES = list(app.TASK_TYPES)
+
+# 輸出的浮點數四捨五入到 0.01；兩個引擎累加順序不同，只允許最後一位的差異
+FLOAT_TOLERANCE = 0.0101
+
+
+def random_scenario(seed, strategy):
+    rng = random.Random(seed)
+    return {
+        'cores': [{'core_type': rng.choice('PE')} for _ in range(rng.randint(1, 6))],
+        'strategy': strategy,
+        'tasks': [{'task_type': rng.choice(TASK_TYPES), 'arrival_time': rng.randint(0, 80), 'name': f't{i}'}
+                  for i in range(rng.randint(1, 20))]
+    }
+
+
+def layered_dag_scenario(seed, strategy):
+    return {
+        'cores': [{'core_type': 'P'}, {'core_type': 'E'}, {'core_type': 'P'}],
+        'strategy': strategy,
+        'workload': {'seed': seed, 'count': 8, 'arrival': {'rate': 0.5},
+                     'dag': {'shape': 'layered', 'layers': 3, 'width': 3}}
+    }
+
+
+def assert_equivalent(tick, event, path='statistics'):
+    if isinstance(tick, dict):
+        assert tick.keys() == event.keys(), path
+        for key in tick:
+            assert_equivalent(tick[key], event[key], f"{path}.{key}")
+    elif isinstance(tick, list):
+        assert len(tick) == len(event), path
+        for i, (a, b) in enumerate(zip(tick, event)):
+            assert_equivalent(a, b, f"{path}[{i}]")
+    elif isinstance(tick, float) or isinstance(event, float):
+        assert tick == pytest.approx(event, abs=FLOAT_TOLERANCE), path
+    else:
+        # 計數 (限速事件、完成任務數…) 必須完全相同
+        assert tick == event, path
+
+
+def run_both(data, max_time):
+    tick = app.run_headless_simulation(app.build_realtime_scheduler(data), max_time, 'tick')
+    event = app.run_headless_simulation(app.build_realtime_scheduler(data), max_time, 'event')
+    return tick, event
+
+
+STRATEGIES = ['BASIC', 'PREEMPTIVE', 'BALANCED']
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+@pytest.mark.parametrize('seed', range(60))
+def test_event_engine_matches_tick_loop(seed, strategy):
+    tick, event = run_both(random_scenario(seed, strategy), 200)
+    assert tick['timeout'] == event['timeout']
+    assert_equivalent(tick['statistics'], event['statistics'])
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+@pytest.mark.parametrize('seed', range(6))
+def test_event_engine_matches_tick_loop_on_layered_dags(seed, strategy):
+    tick, event = run_both(layered_dag_scenario(seed, strategy), 300)
+    assert_equivalent(tick['statistics'], event['statistics'])
+
+
+def test_throttle_threshold_is_shared():
+    # 溫度剛好落在門檻上 (或只差浮點誤差) 時不限速
+    core = app.Core(0, 'P')
+    assert not app.over_threshold(core.thermal_threshold, core.thermal_threshold)
+    assert not app.over_threshold(core.thermal_threshold + 1e-12, core.thermal_threshold)
+    assert app.over_threshold(core.thermal_threshold + 0.01, core.thermal_threshold)
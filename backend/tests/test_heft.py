@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import app
+
+
+def dag_scenario(seed, task_count=40, core_count=4):
+    rng = random.Random(seed)
+    cores = app.build_cores([{'core_type': rng.choice('PE')} for _ in range(core_count)])
+    configs = []
+    for i in range(task_count):
+        deps = [j for j in range(max(0, i - 6), i) if rng.random() < 0.3]
+        configs.append({'task_type': rng.choice(app.TASK_TYPES), 'arrival_time': rng.randint(0, 20),
+                        'name': f't{i}', 'dependencies': deps})
+    tasks = app.build_tasks(configs)
+    return app.Scheduler(cores, tasks), cores, tasks
+
+
+def naive_earliest_finish(intervals, ready_time, duration):
+    """逐一檢查排序後的空檔與最後一個任務之後 (插入式 EFT 的參考實作)"""
+    start = ready_time
+    for busy_start, busy_end in sorted(intervals):
+        if start + duration <= busy_start + 1e-9:
+            break
+        start = max(start, busy_end)
+    return start + duration
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_heft_schedule_is_valid_and_insertion_optimal(seed):
+    scheduler, cores, tasks = dag_scenario(seed)
+    schedule = scheduler.heft_schedule()
+    assert sorted(step['task_id'] for step in schedule) == [task.task_id for task in tasks]
+
+    core_index = {core.core_id: i for i, core in enumerate(cores)}
+    finish = {}
+    intervals = [[] for _ in cores]
+    # schedule 依 upward rank 的處理順序排列：逐一重播並與參考實作比較完成時間
+    for step in schedule:
+        task = tasks[step['task_id']]
+        ready_time = max([task.arrival_time] + [finish[dep] for dep in task.dependencies])
+        assert step['time'] >= ready_time - 1e-9
+
+        best = min(naive_earliest_finish(intervals[i], ready_time,
+                                         task.execution_time / (core.frequency * scheduler.instruction_speed_factor(core, task)))
+                   for i, core in enumerate(cores))
+        step_finish = step['time'] + step['duration']
+        assert step_finish == pytest.approx(best)
+
+        core_intervals = intervals[core_index[step['core_id']]]
+        assert all(step_finish <= start + 1e-9 or step['time'] >= end - 1e-9 for start, end in core_intervals)
+        core_intervals.append((step['time'], step_finish))
+        finish[task.task_id] = step_finish
+
+
+def test_heft_is_deterministic():
+    first = dag_scenario(3)[0].heft_schedule()
+    second = dag_scenario(3)[0].heft_schedule()
+    assert first == second
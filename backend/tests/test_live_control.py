@@ -0,0 +1,97 @@
+import pytest
+
+import app
+from task_table import TaskTable
+
+
+def validate_task(config):
+    app.build_task(config, 0, TaskTable())
+
+
+def short_scenario():
+    return {'cores': [{'core_type': 'P'}, {'core_type': 'E'}], 'strategy': 'BASIC',
+            'tasks': [{'task_type': 'typing', 'cpu_burst': 20, 'arrival_time': i * 2, 'name': f"t{i}"}
+                      for i in range(6)]}
+
+
+def run_live(scheduler, live, on_event=None):
+    events = []
+
+    def emit(event, data):
+        if event in ('live_update', 'task_assigned', 'task_completed'):
+            events.append((event, data))
+            if on_event:
+                on_event(event, data)
+
+    result = app.run_realtime_loop(scheduler, 300, emit=emit, pace=False, live=live)
+    return result, events
+
+
+def test_inject_cancel_and_reconfigure():
+    scheduler = app.build_realtime_scheduler(short_scenario())
+    live = app.create_live_control(scheduler)
+    assert live.submit_tasks([{'task_type': 'typing', 'cpu_burst': 5}], validate_task) == [6]
+    live.submit_cancel([5, 77])
+    assert live.submit_cores(add=[{'core_type': 'E'}], offline=[0]) == [2]
+
+    result, events = run_live(scheduler, live)
+
+    updates = [data for event, data in events if event == 'live_update']
+    assert updates[1]['cancelled'] == [5] and updates[1]['not_found'] == [77]
+    assigned = [data for event, data in events if event == 'task_assigned']
+    assert {data['core_id'] for data in assigned} == {1, 2}  # 下線的核心 0 不再接受任務
+    assert 5 not in {data['task_id'] for data in assigned}
+    stats = result['statistics']['global']
+    assert (stats['total_tasks'], stats['tasks_completed'], stats['tasks_cancelled']) == (7, 6, 1)
+    assert not result['timeout']
+
+
+def test_core_comes_back_online_mid_run():
+    scheduler = app.build_realtime_scheduler(short_scenario())
+    live = app.create_live_control(scheduler)
+    live.submit_cores(offline=[0])
+
+    def on_event(event, data):
+        if event == 'task_completed' and data['task_id'] == 0:
+            live.submit_cores(online=[0])
+
+    result, events = run_live(scheduler, live, on_event)
+    assigned = [data for event, data in events if event == 'task_assigned']
+    online_at = next(data['time'] for event, data in events if event == 'live_update' and data['online'])
+    assert all(data['core_id'] == 1 for data in assigned if data['start_time'] < online_at)
+    assert any(data['core_id'] == 0 for data in assigned if data['start_time'] >= online_at)
+    assert result['statistics']['global']['tasks_completed'] == 6
+
+
+def test_submit_rejections():
+    scheduler = app.build_realtime_scheduler(short_scenario())
+    live = app.create_live_control(scheduler, recording=True)
+    with pytest.raises(ValueError):
+        live.submit_cores(add=[{'core_type': 'P'}])
+    with pytest.raises(ValueError):
+        live.submit_cores(offline=[0, 1])
+    with pytest.raises(ValueError):
+        live.submit_tasks([{'task_type': 'typing', 'dependencies': [0]}], validate_task)
+    with pytest.raises(ValueError):
+        live.submit_cancel([True])
+    # 未被拒絕的變更仍可套用
+    live.submit_cores(offline=[0])
+    assert live.online == {1}
+
+
+@pytest.mark.parametrize('strategy', ['BASIC', 'PREEMPTIVE'])
+def test_cancelled_running_task_leaves_task_metrics(strategy):
+    scheduler = app.build_realtime_scheduler({**short_scenario(), 'strategy': strategy})
+    live = app.create_live_control(scheduler)
+    stats = app.create_simulation_stats(scheduler)
+    assignments = scheduler.dispatch(0)
+    stats['task_metrics'].record(assignments, [], 0)
+    running = assignments[0]['task_id']
+    assert running in stats['task_metrics'].start_times
+
+    assert live.cancel([running, running], stats) == {'cancelled': [running], 'not_found': [running]}
+    metrics = stats['task_metrics']
+    assert running not in metrics.start_times
+    summary = metrics.summary()
+    assert summary['overall']['cancelled'] == summary['by_task_type']['typing']['cancelled'] == 1
+    assert summary['overall']['count'] == 0
@@ -0,0 +1,50 @@
+import pytest
+
+import app
+from replicas import ReplicaEstimator, t_quantile
+
+# 兩尾 95% / 99% 的 t 臨界值 (查表)
+T_975 = {1: 12.7062, 2: 4.3027, 3: 3.1824, 4: 2.7764, 5: 2.5706, 10: 2.2281, 29: 2.0452, 30: 2.0423, 120: 1.9799}
+T_995 = {1: 63.6567, 2: 9.9248, 5: 4.0321, 30: 2.7500}
+
+
+@pytest.mark.parametrize('df, expected', T_975.items())
+def test_t_quantile_95(df, expected):
+    assert t_quantile(0.975, df) == pytest.approx(expected, abs=1e-4)
+
+
+@pytest.mark.parametrize('df, expected', T_995.items())
+def test_t_quantile_99(df, expected):
+    assert t_quantile(0.995, df) == pytest.approx(expected, abs=1e-4)
+
+
+def test_t_quantile_is_symmetric():
+    assert t_quantile(0.025, 3) == pytest.approx(-t_quantile(0.975, 3))
+    assert t_quantile(0.5, 4) == 0.0
+
+
+def test_two_replicas_use_exact_interval():
+    estimator = ReplicaEstimator(confidence=0.95, relative_tolerance=0.02, min_replicas=2)
+    for value in (100.0, 102.0):
+        estimator.add({'makespan': value, 'energy': value, 'completion_rate': value, 'throttling_events': value})
+    # 半寬 = t(0.975, 1) × s / √2 = 12.706 × √2 / √2
+    assert estimator.summary()['makespan']['half_width'] == pytest.approx(12.7062, abs=1e-3)
+    assert not estimator.settled()
+
+
+def replica_spec(max_workers):
+    return {'seed': 11, 'replicas': 4, 'min_replicas': 4, 'max_simulation_time': 300, 'max_workers': max_workers,
+            'jitter': {'arrival': 1.0, 'burst': 0.2},
+            'scenario': {'cores': [{'core_type': 'P'}, {'core_type': 'E'}], 'strategy': 'BASIC',
+                         'tasks': [{'task_type': 'typing', 'cpu_burst': 20, 'arrival_time': i} for i in range(4)]}}
+
+
+def test_replicas_do_not_depend_on_worker_count():
+    single = app.run_replicas(replica_spec(1))
+    parallel = app.run_replicas(replica_spec(3))
+    # elapsed 為實際耗時，其餘欄位必須完全相同
+    strip = lambda rows: [{key: value for key, value in row.items() if key != 'elapsed'} for row in rows]
+    assert strip(single['results']) == strip(parallel['results'])
+    assert single['metrics'] == parallel['metrics']
+    # 不同 replica 的衍生 seed 不同，擾動後的結果也不同
+    assert len({row['makespan'] for row in single['results']}) > 1
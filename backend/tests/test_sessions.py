@@ -0,0 +1,54 @@
+import threading
+
+from sessions import SimulationSession, SimulationSessionManager
+
+
+class NullSocket:
+    server = None  # 測試中的 session 不發送事件
+
+    def emit(self, *args, **kwargs):
+        pass
+
+
+def test_queued_pause_is_reported_as_paused():
+    session = SimulationSession('realtime')
+    assert session.pause()
+    assert session.to_dict()['state'] == 'paused'
+    assert session.resume()
+    assert session.state == 'queued'
+
+
+def test_run_keeps_paused_state_until_resumed():
+    session = SimulationSession('realtime')
+    session.pause()
+    entered = threading.Event()
+
+    def target(session):
+        entered.set()
+        assert session.checkpoint()
+
+    manager = SimulationSessionManager(NullSocket(), max_workers=1)
+    worker = threading.Thread(target=manager._run, args=(session, target, ()))
+    worker.start()
+    entered.wait(2)
+    status = session.to_dict()
+    assert (status['state'], status['paused']) == ('paused', True)
+    assert status['started_at'] is not None
+
+    session.resume()
+    worker.join(2)
+    manager.executor.shutdown()
+    assert session.state == 'completed'
+
+
+def test_cancel_while_queued_runs_skip_callback():
+    manager = SimulationSessionManager(NullSocket(), max_workers=1)
+    release = threading.Event()
+    running = manager.submit('realtime', lambda session: release.wait(2))
+    skipped = []
+    queued = manager.submit('realtime', lambda session: skipped.append('ran'), on_skip=lambda: skipped.append('skip'))
+    queued.cancel()
+    release.set()
+    manager.executor.shutdown(wait=True)
+    assert skipped == ['skip']
+    assert (running.state, queued.state) == ('completed', 'cancelled')
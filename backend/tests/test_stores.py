@@ -0,0 +1,102 @@
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import app
+import trace_store
+from task_table import Task, TaskTable, TaskTablePool, intern_profile
+from trace_store import TraceReader, TraceRecorder
+
+
+def test_task_table_columns_follow_task_views():
+    table = TaskTable()
+    profile = intern_profile('game', cpu_burst=30)
+    tasks = [Task.from_profile(table, task_id, profile, task_id * 0.5, None if task_id % 2 else task_id + 10.0)
+             for task_id in range(6)]
+    tasks[1].assigned = True
+    tasks[1].assigned_core = 3
+    tasks[4].completed = True
+
+    assert table.column('task_id').tolist() == list(range(6))
+    assert table.column('arrival').tolist() == [task_id * 0.5 for task_id in range(6)]
+    assert table.column('assigned').tolist() == [0, 1, 0, 0, 0, 0]
+    assert table.column('completed').tolist() == [0, 0, 0, 0, 1, 0]
+    assert table.column('assigned_core')[1] == 3 and tasks[1].assigned_core == 3
+    assert math.isnan(table.column('deadline')[1]) and table.column('deadline')[2] == 12.0
+    assert tasks[2].execution_time == 3.0  # profile 欄位由類別屬性提供
+
+
+def test_task_table_pool_rolls_over():
+    pool = TaskTablePool(chunk_rows=3)
+    profile = intern_profile('video')
+    tables = []
+    for task_id in range(7):
+        table = pool.table()
+        Task.from_profile(table, task_id, profile, 0.0, None)
+        tables.append(table)
+    assert [len(table) for table in {id(table): table for table in tables}.values()] == [3, 3, 1]
+
+
+def fake_cores(rng, count):
+    return [SimpleNamespace(core_id=i, core_type='P', temp=rng.uniform(25, 95), dvfs_freq=rng.uniform(1, 4),
+                            power=rng.uniform(1, 20), load=rng.random(), active=rng.random() < 0.5,
+                            thermal_throttling=rng.random() < 0.2,
+                            current_task=SimpleNamespace(task_id=rng.randint(0, 99)) if rng.random() < 0.5 else None)
+            for i in range(count)]
+
+
+def test_trace_round_trip_across_flushes(tmp_path, monkeypatch):
+    # 小的 flush 大小讓取樣橫跨多次寫入
+    monkeypatch.setattr(trace_store, 'FLUSH_ROWS', 7)
+    rng = random.Random(3)
+    recorder = TraceRecorder(str(tmp_path), fake_cores(rng, 3))
+    expected = []
+    for tick in range(25):
+        cores = fake_cores(rng, 3)
+        completed = [SimpleNamespace(task_id=tick, name=f"t{tick % 4}", assigned_core=tick % 3)] if tick % 5 == 0 else []
+        recorder.record(round(tick * 0.1, 9), cores, completed_tasks=completed)
+        expected.append(cores)
+    recorder.close(engine='test')
+
+    reader = TraceReader(recorder.path)
+    assert reader.summary()['samples'] == 25 and reader.meta['complete']
+    assert reader.columns['temp'][:, 1].tolist() == pytest.approx([cores[1].temp for cores in expected], rel=1e-6)
+    assert reader.columns['task'][:, 2].tolist() == \
+        [cores[2].current_task.task_id if cores[2].current_task else -1 for cores in expected]
+    assert reader.columns['flags'][:, 0].tolist() == \
+        [int(cores[0].active) | (2 if cores[0].thermal_throttling else 0) for cores in expected]
+
+    events = reader.event_window()
+    assert [(event['task_id'], event['task_name'], event['type']) for event in events] == \
+        [(tick, f"t{tick % 4}", 'completed') for tick in range(0, 25, 5)]
+
+    # 降採樣：數值欄位取區間平均
+    window = reader.window(max_points=5, fields=['load'])
+    edges = np.unique(np.linspace(0, 25, 6).astype(np.int64))
+    loads = np.asarray(reader.columns['load'], dtype=np.float64)
+    means = [np.round(loads[a:b].mean(axis=0), 2).tolist() for a, b in zip(edges[:-1], edges[1:])]
+    assert window['load'] == means
+
+
+def test_headless_trace_records_every_tick(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'TRACE_DIR', str(tmp_path))
+    data = {'cores': [{'core_type': 'P'}, {'core_type': 'E'}], 'strategy': 'BASIC',
+            'tasks': [{'task_type': 'typing', 'cpu_burst': 5, 'arrival_time': i, 'name': f"t{i}"} for i in range(4)]}
+    result = app.run_headless_simulation(app.build_realtime_scheduler(data), 200, 'tick', record_trace=True)
+
+    assert not result['timeout']
+    reader = TraceReader(str(tmp_path / result['trace_id']))
+    assert len(reader.times) == round(result['total_time'] / 0.1) + 1
+    kinds = [event['type'] for event in reader.event_window()]
+    assert kinds.count('assigned') == kinds.count('completed') == 4
+
+
+def test_discarded_trace_leaves_nothing_behind(tmp_path):
+    recorder = TraceRecorder(str(tmp_path), fake_cores(random.Random(0), 2))
+    recorder.discard()
+    assert all(f.closed for f in recorder.files.values())
+    assert trace_store.list_traces(str(tmp_path)) == [] and not (tmp_path / recorder.trace_id).exists()
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+import app
+from sweep import aggregate_sweep, expand_sweep, make_batches, strategy_family
+
+
+def row(strategy, makespan, energy, workload='w0', core_mix='2P'):
+    return {'strategy': strategy, 'family': strategy_family(strategy), 'core_mix': core_mix,
+            'workload': workload, 'makespan': makespan, 'total_energy': energy, 'deadline_misses': 0}
+
+
+def test_families_are_ranked_separately():
+    # 離線排程的數字較小只是單位不同，不能勝過實時策略
+    rows = [row('BASIC', 40.0, 900.0), row('PREEMPTIVE', 38.0, 950.0), row('BALANCED', 38.0, 920.0),
+            row('EDF', 12.0, 30.0), row('HEFT', 9.0, 35.0), row('EAS', 9.0, 20.0)]
+    result = aggregate_sweep(rows)
+    best = {entry['family']: entry['strategy'] for entry in result['best']}
+    assert best == {'realtime': 'BALANCED', 'offline': 'EAS'}
+    wins = {entry['strategy']: entry['wins'] for entry in result['table']}
+    assert wins['BALANCED'] == wins['EAS'] == 1 and wins['HEFT'] == 0
+    assert [entry['family'] for entry in result['table']] == ['offline'] * 3 + ['realtime'] * 3
+
+
+def test_errors_are_counted_but_not_ranked():
+    rows = [row('BASIC', 40.0, 900.0), {**row('PREEMPTIVE', 0, 0), 'error': 'bad'}]
+    table = {entry['strategy']: entry for entry in aggregate_sweep(rows)['table']}
+    assert table['PREEMPTIVE']['errors'] == 1 and table['PREEMPTIVE']['avg_makespan'] is None
+    assert table['BASIC']['wins'] == 1
+
+
+def test_expand_and_batch_cover_every_case():
+    spec = {'strategies': ['realtime', 'HEFT'], 'core_mixes': [{'P': 1, 'E': 1}, [{'core_type': 'E'}]],
+            'workloads': [[{'task_type': 'typing'}], {'name': 'mixed', 'tasks': [{'task_type': 'music'}]}]}
+    strategies, core_mixes, workloads, cases = expand_sweep(spec)
+    assert strategies == ['BASIC', 'HEFT']
+    assert [label for label, _ in core_mixes] == ['1P+1E', '1E']
+    assert [name for name, _ in workloads] == ['workload-0', 'mixed']
+    batches = make_batches(cases, batch_size=32, max_workers=2)
+    assert [index for batch in batches for index, _ in batch] == list(range(len(cases)))
+
+
+def test_sweep_case_units_follow_family():
+    cores = [{'core_type': 'P'}, {'core_type': 'E'}]
+    tasks = [{'task_type': 'typing', 'cpu_burst': 20, 'name': f"t{i}"} for i in range(4)]
+    realtime = app.run_sweep_case('BASIC', cores, tasks, 300)
+    offline = app.run_sweep_case('HEFT', cores, tasks, 300)
+    assert realtime['tasks_completed'] == offline['tasks_completed'] == 4
+    # 同一工作負載：實時模擬以模擬秒數計，離線排程以 cpu_burst / 10 計，差距超過一個數量級
+    assert offline['makespan'] < 4 * 20 / 10
+    assert realtime['makespan'] > 10 * offline['makespan']
+    assert realtime['total_energy'] > 10 * offline['total_energy']
+
+
+def offline_case(seed):
+    rng = random.Random(seed)
+    cores = app.build_cores([{'core_type': core_type} for core_type in 'PPEE'])
+    configs = [{'task_type': rng.choice(app.TASK_TYPES), 'arrival_time': rng.randint(0, 20), 'name': f"t{i}",
+                'task_id': i, 'dependencies': [rng.randrange(i)] if i and rng.random() < 0.4 else []}
+               for i in range(30)]
+    return cores, configs
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_offline_schedules_share_one_cost_model(seed):
+    cores, configs = offline_case(seed)
+    evaluated = {}
+    for strategy in ('EDF', 'HEFT', 'EAS'):
+        tasks = app.build_tasks(configs)
+        schedule = getattr(app.Scheduler(cores, tasks), f"{strategy.lower()}_schedule")()
+        evaluated[strategy] = (schedule, app.evaluate_schedule(schedule, cores, tasks), tasks)
+
+    # HEFT 與 EAS 已使用同一個執行時間公式；EAS 的能耗就是模型的能耗
+    for strategy in ('HEFT', 'EAS'):
+        schedule, steps, _ = evaluated[strategy]
+        original = {step['task_id']: step for step in schedule}
+        for step in steps:
+            assert step['duration'] == pytest.approx(original[step['task_id']]['duration'])
+            if strategy == 'EAS':
+                assert step['energy'] == pytest.approx(original[step['task_id']]['energy'])
+
+    # 重新計算後仍是合法的排程：不早於到達時間與前置任務，同一核心上不重疊
+    schedule, steps, tasks = evaluated['EDF']
+    tasks_by_id = {task.task_id: task for task in tasks}
+    finish = {step['task_id']: step['time'] + step['duration'] for step in steps}
+    for step in steps:
+        task = tasks_by_id[step['task_id']]
+        assert step['time'] >= task.arrival_time
+        assert all(step['time'] >= finish[dep] - 1e-9 for dep in task.dependencies)
+    for core in cores:
+        on_core = sorted((step['time'], finish[step['task_id']]) for step in steps if step['core_id'] == core.core_id)
+        assert all(end <= start + 1e-9 for (_, end), (start, _) in zip(on_core, on_core[1:]))
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from task_metrics import P2Quantile, LatencyStats
+
+
+def exact_quantile(values, p):
+    ordered = sorted(values)
+    position = p * (len(ordered) - 1)
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+@pytest.mark.parametrize('p', [0.5, 0.9, 0.99])
+@pytest.mark.parametrize('seed', range(3))
+def test_p2_tracks_exact_percentile(seed, p):
+    rng = random.Random(seed)
+    values = [rng.expovariate(0.2) for _ in range(5000)]
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.add(value)
+    assert estimator.value() == pytest.approx(exact_quantile(values, p), rel=0.05)
+
+
+def test_p2_interpolates_small_samples():
+    estimator = P2Quantile(0.5)
+    for value in (4.0, 1.0, 3.0):
+        estimator.add(value)
+    assert estimator.value() == 3.0
+    assert P2Quantile(0.9).value() is None
+
+
+def test_latency_stats_reports_percentiles():
+    values = [float(value) for value in range(1, 10001)]
+    random.Random(0).shuffle(values)
+    stats = LatencyStats()
+    for value in values:
+        stats.add(value)
+    summary = stats.to_dict()
+    assert summary['mean'] == 5000.5
+    assert summary['max'] == 10000.0
+    for key, p in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        assert summary[key] == pytest.approx(exact_quantile(values, p), rel=0.01)
+
+
+def test_invalid_quantile():
+    with pytest.raises(ValueError):
+        P2Quantile(1.0)
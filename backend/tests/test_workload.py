@@ -0,0 +1,29 @@
+import pytest
+
+from workload import generate_workload, validate_workload
+
+
+@pytest.mark.parametrize('spec', [
+    {'arrival': {'rate': '2'}},
+    {'arrival': 'poisson'},
+    {'arrival': {'process': 'bursty', 'mean_gap': [1]}},
+    {'diurnal': {'period': '60'}},
+    {'count': '5'},
+    {'count': 2.5},
+    {'duration': '10'},
+    {'mix': {'game': '1'}},
+    {'mix': ['game']},
+    {'dag': 'fork_join'},
+    {'dag': {'shape': 'chain', 'depth': '3'}},
+    {'dag': {'shape': 'layered', 'edge_probability': 2}},
+])
+def test_wrong_types_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        validate_workload(spec)
+
+
+def test_generation_is_seeded():
+    spec = {'seed': 7, 'count': 20, 'arrival': {'process': 'bursty', 'rate': 2.0},
+            'dag': {'shape': 'layered', 'layers': 2, 'width': 3}}
+    task_types = ['game', 'video']
+    assert list(generate_workload(spec, task_types)) == list(generate_workload(spec, task_types))
@@ -0,0 +1,220 @@
+import math
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # numpy 為選用套件，只有耦合熱模型需要
+    np = None
+
+AMBIENT_TEMP = 25.0
+# cooling_rate 視為核心高於環境溫度這麼多度時的降溫速度 (°C/s)，據此換算對環境的熱導
+COOLING_REFERENCE_DELTA = 12.0
+# 相鄰核心之間的熱導 (W/°C)
+DEFAULT_LATERAL_CONDUCTANCE = 0.05
+# 閒置核心的功耗比例 (與 update_core_thermals 相同)
+IDLE_POWER_FACTOR = 0.3
+# 顯式積分每個子步的最大衰減量，超過時把 time step 切成多個子步以保持穩定
+MAX_STEP_DECAY = 0.5
+
+# 溫度與門檻比較的容忍值：溫度剛好落在門檻上時，
+# 逐 tick 累加與事件引擎封閉式推進的浮點誤差不會讓兩者對是否限速有不同的判斷
+THROTTLE_EPSILON = 1e-9
+
+# 四鄰 (上、下、左、右)
+NEIGHBOR_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def over_threshold(temp, threshold):
+    """是否超過溫度門檻 (所有熱模型與事件引擎的門檻預測共用同一個比較，也可用於陣列)"""
+    return temp > threshold + THROTTLE_EPSILON
+
+
+class Floorplan:
+    """核心在格點上的位置：positions[i] 為第 i 個核心的 (row, col)"""
+
+    def __init__(self, positions):
+        try:
+            positions = tuple((int(row), int(col)) for row, col in positions)
+        except (TypeError, ValueError):
+            raise ValueError("Floorplan positions must be [row, col] pairs") from None
+        if any(row < 0 or col < 0 for row, col in positions):
+            raise ValueError("Floorplan positions must be non-negative")
+        if len(set(positions)) != len(positions):
+            raise ValueError("Floorplan positions must be unique")
+        self.positions = positions
+
+    @classmethod
+    def grid(cls, count, cols=None):
+        """依核心順序逐列排列 (預設接近正方形)"""
+        if cols is None:
+            cols = max(1, math.ceil(math.sqrt(count)))
+        if not isinstance(cols, int) or cols <= 0:
+            raise ValueError(f"Invalid floorplan columns: {cols}")
+        return cls((i // cols, i % cols) for i in range(count))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def neighbors(self):
+        """(n, 4) 的相鄰核心索引，沒有鄰居的方向填 n (指向補零的位置)"""
+        index = {position: i for i, position in enumerate(self.positions)}
+        n = len(self.positions)
+        return [[index.get((row + d_row, col + d_col), n) for d_row, d_col in NEIGHBOR_OFFSETS]
+                for row, col in self.positions]
+
+
+def build_floorplan(count, spec=None):
+    """
+    依請求的 thermal 設定建立 floorplan
+    spec: None / {"cols": 8} / {"positions": [[row, col], ...]}
+    """
+    spec = spec or {}
+    if spec.get('positions') is not None:
+        floorplan = Floorplan(spec['positions'])
+        if len(floorplan) != count:
+            raise ValueError(f"Floorplan has {len(floorplan)} positions for {count} cores")
+        return floorplan
+    return Floorplan.grid(count, spec.get('cols'))
+
+
+@lru_cache(maxsize=32)
+def _stencil(positions, params, lateral_conductance, ambient_temp, time_delta):
+    """
+    預先計算 floorplan 的 RC 網路在固定 time step 下的顯式積分係數 (依 floorplan 與核心參數快取)
+    C dT/dt = P - G_amb (T - T_amb) - G_lat Σ_鄰居 (T - T_j)，其中 1/C = heating_rate_factor
+    每個子步：T' = decay * T + spread * Σ_鄰居 T_j + gain * P + ambient
+    """
+    floorplan = Floorplan(positions)
+    neighbors = np.array(floorplan.neighbors(), dtype=np.intp).reshape(len(positions), len(NEIGHBOR_OFFSETS))
+    degree = np.count_nonzero(neighbors < len(positions), axis=1)
+
+    heating_rate_factor, cooling_rate = (np.array(values, dtype=np.float64) for values in zip(*params))
+    ambient_conductance = cooling_rate / (heating_rate_factor * COOLING_REFERENCE_DELTA)
+
+    rate = heating_rate_factor * (ambient_conductance + degree * lateral_conductance)
+    substeps = max(1, math.ceil(float(rate.max(initial=0.0)) * time_delta / MAX_STEP_DECAY))
+    h = time_delta / substeps
+
+    coefficients = {
+        'neighbors': neighbors,
+        'decay': 1.0 - h * rate,
+        'spread': h * heating_rate_factor * lateral_conductance,
+        'gain': h * heating_rate_factor,
+        'ambient': h * heating_rate_factor * ambient_conductance * ambient_temp,
+        'substeps': substeps
+    }
+    for value in coefficients.values():
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)  # 快取中的陣列由多個模擬共用
+    return coefficients
+
+
+class ThermalNetwork:
+    """
+    耦合的 RC 熱模型
+    核心放在 floorplan 格點上，每個核心是一個熱容 (1/heating_rate_factor)，
+    經由相鄰核心之間的熱導擴散並經由對環境的熱導 (由 cooling_rate 換算) 散熱；
+    執行中與閒置的核心每個 tick 都一起更新，所有運算都是整個陣列的向量運算。
+    限速與 DVFS 調整規則與 update_core_thermals 相同，只是改依耦合後的溫度判斷
+    """
+
+    def __init__(self, cores, floorplan=None, lateral_conductance=DEFAULT_LATERAL_CONDUCTANCE,
+                 ambient_temp=AMBIENT_TEMP):
+        if np is None:
+            raise RuntimeError("numpy is required for the coupled thermal model")
+        if floorplan is None:
+            floorplan = Floorplan.grid(len(cores))
+        if len(floorplan) != len(cores):
+            raise ValueError(f"Floorplan has {len(floorplan)} positions for {len(cores)} cores")
+        if lateral_conductance < 0:
+            raise ValueError(f"Invalid lateral conductance: {lateral_conductance}")
+
+        self.cores = cores
+        self.floorplan = floorplan
+        self.lateral_conductance = lateral_conductance
+        self.ambient_temp = ambient_temp
+        self.params = tuple((core.heating_rate_factor, core.cooling_rate) for core in cores)
+
+        self.base_power = np.array([core.base_power for core in cores], dtype=np.float64)
+        self.max_freq = np.array([core.max_freq for core in cores], dtype=np.float64)
+        self.min_freq = np.array([core.min_freq for core in cores], dtype=np.float64)
+        self.thermal_threshold = np.array([core.thermal_threshold for core in cores], dtype=np.float64)
+        self._padded = np.zeros(len(cores) + 1, dtype=np.float64)  # 最後一格固定為 0 (沒有鄰居)
+        self._coefficients = {}  # time_delta -> 係數
+
+    def coefficients(self, time_delta):
+        coefficients = self._coefficients.get(time_delta)
+        if coefficients is None:
+            coefficients = self._coefficients[time_delta] = _stencil(
+                self.floorplan.positions, self.params, self.lateral_conductance, self.ambient_temp, time_delta)
+        return coefficients
+
+    def step(self, active, task_load, temp, dvfs_freq, throttling, time_delta):
+        """
+        以陣列推進一個 time step (temp、dvfs_freq、throttling 就地更新)
+        回傳 (load, power, 限速狀態改變的核心索引)
+        """
+        coefficients = self.coefficients(time_delta)
+        load = np.where(active, task_load, 0.0)
+        power = np.where(active, self.base_power * (1 + dvfs_freq / self.max_freq * load),
+                         self.base_power * IDLE_POWER_FACTOR)
+
+        neighbors = coefficients['neighbors']
+        padded = self._padded
+        heat = coefficients['gain'] * power + coefficients['ambient']
+        for _ in range(coefficients['substeps']):
+            padded[:-1] = temp
+            temp *= coefficients['decay']
+            temp += coefficients['spread'] * padded[neighbors].sum(axis=1)
+            temp += heat
+
+        over = over_threshold(temp, self.thermal_threshold)
+        changed = np.flatnonzero(over != throttling)
+        throttling[:] = over
+
+        # DVFS 只調整執行中的核心
+        throttle = active & over
+        dvfs_freq[throttle] = np.maximum(self.min_freq, dvfs_freq * 0.9)[throttle]
+        boost = active & ~over & (dvfs_freq < self.max_freq)
+        dvfs_freq[boost] = np.minimum(self.max_freq, dvfs_freq * 1.05)[boost]
+        return load, power, changed
+
+    def step_bank(self, bank, time_delta):
+        """更新 CoreBank 的陣列 (向量化模式)"""
+        load, power, changed = self.step(bank.active, bank.task_load, bank.temp, bank.dvfs_freq,
+                                         bank.thermal_throttling, time_delta)
+        bank.load[:] = load
+        bank.power[:] = power
+        return changed
+
+    def step_cores(self, time_delta):
+        """更新一般 Core 物件：先收集成陣列，計算後寫回"""
+        cores = self.cores
+        active = np.fromiter((core.active for core in cores), dtype=np.bool_, count=len(cores))
+        task_load = np.fromiter((min(1.0, core.current_task.cpu_burst / 100.0) if core.active else 0.0
+                                 for core in cores), dtype=np.float64, count=len(cores))
+        temp = np.fromiter((core.temp for core in cores), dtype=np.float64, count=len(cores))
+        dvfs_freq = np.fromiter((core.dvfs_freq for core in cores), dtype=np.float64, count=len(cores))
+        throttling = np.fromiter((core.thermal_throttling for core in cores), dtype=np.bool_, count=len(cores))
+
+        load, power, changed = self.step(active, task_load, temp, dvfs_freq, throttling, time_delta)
+        for core, core_load, core_power, core_temp, freq, throttled in zip(
+                cores, load.tolist(), power.tolist(), temp.tolist(), dvfs_freq.tolist(), throttling.tolist()):
+            core.load = core_load
+            core.power = core_power
+            core.temp = core_temp
+            core.dvfs_freq = freq
+            core.thermal_throttling = throttled
+        return changed
+
+    def summary(self, count=5):
+        """最高溫與溫度最高的幾個核心 (含 floorplan 位置)"""
+        temp = np.array([core.temp for core in self.cores], dtype=np.float64)
+        order = np.argsort(-temp, kind='stable')[:count]
+        return {
+            'max_temperature': round(float(temp.max(initial=self.ambient_temp)), 1),
+            'temperature_spread': round(float(temp.max() - temp.min()), 1) if len(temp) else 0.0,
+            'hotspots': [{'core_id': self.cores[i].core_id, 'row': self.floorplan.positions[i][0],
+                          'col': self.floorplan.positions[i][1], 'temperature': round(float(temp[i]), 1)}
+                         for i in order]
+        }
@@ -0,0 +1,260 @@
+import json
+import os
+import shutil
+import time
+import uuid
+
+try:
+    import numpy as np
+except ImportError:  # numpy 為選用套件，只有軌跡記錄需要
+    np = None
+
+# 每個取樣點的核心狀態欄位 (shape = (取樣數, 核心數))
+CORE_COLUMNS = {
+    'temp': 'float32',
+    'freq': 'float32',
+    'power': 'float32',
+    'load': 'float32',
+    'task': 'int32',  # 執行中任務的 task_id，閒置為 -1
+    'flags': 'uint8',  # bit 0: active，bit 1: thermal_throttling
+}
+# 可以平均的欄位 (降採樣時取平均，其餘取區間最後一個值)
+NUMERIC_COLUMNS = ('temp', 'freq', 'power', 'load')
+
+EVENT_KINDS = ('assigned', 'completed')
+EVENT_DTYPE = [('time', 'float64'), ('kind', 'uint8'), ('task_id', 'int64'),
+               ('core_id', 'int32'), ('name', 'int32')]
+
+# 記憶體中累積多少筆取樣才寫入檔案
+FLUSH_ROWS = 1024
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for trace recording")
+
+
+class TraceRecorder:
+    """
+    模擬軌跡記錄器
+    每個取樣點的核心狀態以固定寬度的欄位各自寫入一個二進位檔 (append-only)，
+    任務分配/完成事件寫入另一個結構化陣列檔；meta.json 記錄欄位型別與核心資訊，
+    讀取時以 numpy.memmap 直接對應檔案，不需載入整份軌跡
+    """
+
+    def __init__(self, trace_dir, cores, time_step=0.1, info=None):
+        _require_numpy()
+        self.trace_id = uuid.uuid4().hex
+        self.path = os.path.join(trace_dir, self.trace_id)
+        os.makedirs(self.path)
+
+        self.cores = cores
+        self.core_count = len(cores)
+        self.meta = {
+            'trace_id': self.trace_id,
+            'created_at': time.time(),
+            'time_step': time_step,
+            'cores': [{'core_id': core.core_id, 'core_type': core.core_type} for core in cores],
+            'columns': CORE_COLUMNS,
+            'event_dtype': EVENT_DTYPE,
+            'event_kinds': EVENT_KINDS,
+            'names': [],
+            'samples': 0,
+            'events': 0,
+            'complete': False,
+            **(info or {})
+        }
+        self.name_index = {}
+
+        self.times = np.empty(FLUSH_ROWS, dtype='float64')
+        self.columns = {name: np.empty((FLUSH_ROWS, self.core_count), dtype=dtype)
+                        for name, dtype in CORE_COLUMNS.items()}
+        self.rows = 0
+        self.events = []
+
+        self.files = {name: open(os.path.join(self.path, f"{name}.bin"), 'wb')
+                      for name in ('time', *CORE_COLUMNS, 'events')}
+        self.write_meta()
+
+    def write_meta(self):
+        with open(os.path.join(self.path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+
+    def intern_name(self, name):
+        index = self.name_index.get(name)
+        if index is None:
+            index = len(self.meta['names'])
+            self.name_index[name] = index
+            self.meta['names'].append(name)
+        return index
+
+    def record(self, current_time, cores, assignments=(), completed_tasks=()):
+        """記錄一個取樣點的核心狀態與此時發生的任務事件"""
+        for assignment in assignments:
+            self.events.append((current_time, 0, assignment['task_id'], assignment['core_id'],
+                                self.intern_name(assignment['task'])))
+        for task in completed_tasks:
+            self.events.append((current_time, 1, task.task_id, getattr(task, 'assigned_core', -1),
+                                self.intern_name(task.name)))
+
+        row = self.rows
+        self.times[row] = current_time
+        temp = self.columns['temp'][row]
+        freq = self.columns['freq'][row]
+        power = self.columns['power'][row]
+        load = self.columns['load'][row]
+        task = self.columns['task'][row]
+        flags = self.columns['flags'][row]
+        for i, core in enumerate(cores):
+            temp[i] = core.temp
+            freq[i] = core.dvfs_freq
+            power[i] = core.power
+            load[i] = core.load
+            task[i] = core.current_task.task_id if core.current_task is not None else -1
+            flags[i] = (1 if core.active else 0) | (2 if core.thermal_throttling else 0)
+
+        self.rows += 1
+        if self.rows >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        rows = self.rows
+        if rows:
+            self.files['time'].write(self.times[:rows].tobytes())
+            for name, column in self.columns.items():
+                self.files[name].write(column[:rows].tobytes())
+            self.meta['samples'] += rows
+            self.rows = 0
+        if self.events:
+            self.files['events'].write(np.array(self.events, dtype=EVENT_DTYPE).tobytes())
+            self.meta['events'] += len(self.events)
+            self.events = []
+        for f in self.files.values():
+            f.flush()
+
+    def close(self, **info):
+        """寫入剩餘資料並更新 meta.json"""
+        self.flush()
+        for f in self.files.values():
+            f.close()
+        self.meta.update(info)
+        self.meta['complete'] = True
+        self.write_meta()
+
+    def discard(self):
+        """模擬沒有執行 (被拒絕或在佇列中取消) 時關閉檔案並刪除整個軌跡目錄"""
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class TraceReader:
+    """以 numpy.memmap 讀取 TraceRecorder 寫出的軌跡，可取任意時間區間或降採樣"""
+
+    def __init__(self, path):
+        _require_numpy()
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.core_count = len(self.meta['cores'])
+
+        # 以檔案大小計算筆數，記錄中的軌跡也能讀取已寫入的部分
+        self.times = self._map('time', 'float64', ())
+        samples = len(self.times)
+        self.columns = {name: self._map(name, dtype, (self.core_count,))[:samples]
+                        for name, dtype in self.meta['columns'].items()}
+        self.events = self._map('events', [tuple(field) for field in self.meta['event_dtype']], ())
+
+    def _map(self, name, dtype, row_shape):
+        dtype = np.dtype(dtype)
+        path = os.path.join(self.path, f"{name}.bin")
+        row_bytes = dtype.itemsize * (int(np.prod(row_shape)) if row_shape else 1)
+        rows = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if rows == 0:
+            return np.empty((0, *row_shape), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows, *row_shape))
+
+    def summary(self):
+        return {
+            **{key: value for key, value in self.meta.items() if key not in ('names', 'event_dtype')},
+            'samples': len(self.times),
+            'events': len(self.events),
+            'start_time': float(self.times[0]) if len(self.times) else None,
+            'end_time': float(self.times[-1]) if len(self.times) else None
+        }
+
+    def window(self, start=None, end=None, max_points=None, fields=None):
+        """
+        回傳 [start, end] 區間內的核心狀態
+        取樣數超過 max_points 時分成 max_points 個區間：數值欄位取平均，task / flags 取區間最後一個值
+        """
+        fields = fields or list(self.meta['columns'])
+        for field in fields:
+            if field not in self.columns:
+                raise ValueError(f"Unknown trace field: {field}")
+
+        first = 0 if start is None else int(np.searchsorted(self.times, start, side='left'))
+        last = len(self.times) if end is None else int(np.searchsorted(self.times, end, side='right'))
+        count = max(0, last - first)
+
+        if max_points is not None and max_points <= 0:
+            raise ValueError(f"Invalid max_points: {max_points}")
+
+        if max_points is None or count <= max_points:
+            times = np.asarray(self.times[first:last])
+            data = {field: np.asarray(self.columns[field][first:last]) for field in fields}
+        else:
+            # 以 reduceat 一次計算每個區間的總和
+            edges = np.unique(np.linspace(first, last, max_points + 1).astype(np.int64))
+            offsets = edges[:-1] - first
+            sizes = np.diff(edges)
+            times = np.asarray(self.times[edges[:-1]])
+            data = {}
+            for field in fields:
+                column = self.columns[field]
+                if field in NUMERIC_COLUMNS:
+                    sums = np.add.reduceat(np.asarray(column[first:last], dtype=np.float64), offsets, axis=0)
+                    data[field] = sums / sizes[:, None]
+                else:
+                    data[field] = np.asarray(column[edges[1:] - 1])
+
+        result = {'start_index': first, 'samples': count, 'times': np.round(times, 9).tolist()}
+        for field, values in data.items():
+            if field in NUMERIC_COLUMNS:
+                values = np.round(values.astype(np.float64), 2)
+            result[field] = values.tolist()
+        return result
+
+    def event_window(self, start=None, end=None, limit=None):
+        """回傳區間內的任務事件 (依時間排序，最多 limit 筆)"""
+        times = self.events['time'] if len(self.events) else np.empty(0)
+        first = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        last = len(times) if end is None else int(np.searchsorted(times, end, side='right'))
+        if limit is not None:
+            last = min(last, first + limit)
+
+        names = self.meta['names']
+        kinds = self.meta['event_kinds']
+        return [{
+            'time': float(event['time']),
+            'type': kinds[event['kind']],
+            'task_id': int(event['task_id']),
+            'core_id': int(event['core_id']),
+            'task_name': names[event['name']]
+        } for event in self.events[first:last]]
+
+
+def list_traces(trace_dir):
+    """列出目錄中的所有軌跡 (依建立時間排序)"""
+    if not os.path.isdir(trace_dir):
+        return []
+    traces = []
+    for trace_id in os.listdir(trace_dir):
+        meta_path = os.path.join(trace_dir, trace_id, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            traces.append({key: meta.get(key) for key in
+                           ('trace_id', 'created_at', 'samples', 'events', 'complete', 'engine')})
+    traces.sort(key=lambda meta: meta['created_at'])
+    return traces
@@ -0,0 +1,257 @@
+import bisect
+import itertools
+import math
+import random
+
+ARRIVAL_PROCESSES = ('poisson', 'bursty')
+DAG_SHAPES = ('fork_join', 'pipeline', 'layered')
+
+
+def diurnal_factor(t, diurnal):
+    """日夜負載曲線：1 + amplitude × sin(2π (t - phase) / period)，amplitude 介於 0 與 1"""
+    if not diurnal:
+        return 1.0
+    return 1.0 + diurnal['amplitude'] * math.sin(2 * math.pi * (t - diurnal['phase']) / diurnal['period'])
+
+
+def arrival_times(arrival, diurnal, rng):
+    """
+    產生遞增的到達時間
+    poisson：固定速率 rate；bursty：兩狀態 MMPP，平常速率 rate，
+    突發期速率 burst_rate，兩種狀態的持續時間分別以 mean_gap / mean_burst 為平均的指數分布
+    有 diurnal 時以 thinning 方式套用時變速率
+    """
+    peak = 1.0 + diurnal['amplitude'] if diurnal else 1.0
+    bursty = arrival['process'] == 'bursty'
+    in_burst = False
+    state_end = rng.expovariate(1.0 / arrival['mean_gap']) if bursty else math.inf
+
+    t = 0.0
+    while True:
+        rate = arrival['burst_rate'] if in_burst else arrival['rate']
+        candidate = t + rng.expovariate(rate * peak) if rate > 0 else math.inf
+        if candidate >= state_end:
+            # 指數分布無記憶性：直接從狀態切換點重新抽樣
+            t = state_end
+            in_burst = not in_burst
+            state_end = t + rng.expovariate(1.0 / (arrival['mean_burst'] if in_burst else arrival['mean_gap']))
+            continue
+        t = candidate
+        if not diurnal or rng.random() * peak < diurnal_factor(t, diurnal):
+            yield t
+
+
+def job_shape(dag, rng):
+    """回傳一個 job 內各任務的相依 (以 job 內的相對編號表示)"""
+    if not dag:
+        return [[]]
+
+    shape = dag['shape']
+    if shape == 'pipeline':
+        return [[]] + [[i - 1] for i in range(1, dag.get('depth', 4))]
+
+    if shape == 'fork_join':
+        width = dag.get('width', 4)
+        return [[]] + [[0] for _ in range(width)] + [list(range(1, width + 1))]
+
+    # layered：每層 width 個任務，依 edge_probability 相依上一層 (至少一個)
+    layers = dag.get('layers', 3)
+    width = dag.get('width', 4)
+    probability = dag.get('edge_probability', 0.5)
+    dependencies = [[] for _ in range(width)]
+    for layer in range(1, layers):
+        previous = range((layer - 1) * width, layer * width)
+        for _ in range(width):
+            deps = [dep for dep in previous if rng.random() < probability]
+            dependencies.append(deps or [rng.choice(previous)])
+    return dependencies
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _require_numbers(fields, owner, names):
+    """owner 中列出的欄位都必須是數字 (None 表示選用且未設定)"""
+    for name in names:
+        value = fields.get(name)
+        if value is not None and not _is_number(value):
+            raise ValueError(f"{owner} {name} must be a number: {value!r}")
+
+
+def _require_dict(value, name):
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} must be an object: {value!r}")
+    return value
+
+
+def validate_workload(spec):
+    """檢查並補上預設值，回傳正規化後的規格；格式或型別錯誤時丟出 ValueError"""
+    _require_dict(spec, "Workload")
+    arrival = dict(_require_dict(spec.get('arrival') or {'process': 'poisson', 'rate': 1.0}, "Arrival"))
+    arrival.setdefault('process', 'poisson')
+    if arrival['process'] not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Unsupported arrival process: {arrival['process']}")
+    arrival.setdefault('rate', 1.0)
+    _require_numbers(arrival, "Arrival", ('rate', 'burst_rate', 'mean_burst', 'mean_gap'))
+    if arrival['process'] == 'bursty':
+        arrival.setdefault('burst_rate', arrival['rate'] * 10)
+        arrival.setdefault('mean_burst', 1.0)
+        arrival.setdefault('mean_gap', 10.0)
+        if arrival['mean_burst'] <= 0 or arrival['mean_gap'] <= 0 or arrival['burst_rate'] <= 0:
+            raise ValueError("Bursty arrivals need positive burst_rate / mean_burst / mean_gap")
+    if arrival['rate'] < 0 or (arrival['rate'] == 0 and arrival['process'] == 'poisson'):
+        raise ValueError(f"Invalid arrival rate: {arrival['rate']}")
+
+    diurnal = spec.get('diurnal')
+    if diurnal:
+        diurnal = {'period': 86400.0, 'amplitude': 0.5, 'phase': 0.0, **_require_dict(diurnal, "Diurnal")}
+        _require_numbers(diurnal, "Diurnal", ('period', 'amplitude', 'phase'))
+        if diurnal['period'] <= 0 or not 0 <= diurnal['amplitude'] <= 1:
+            raise ValueError("Diurnal curve needs period > 0 and 0 <= amplitude <= 1")
+
+    mix = spec.get('mix')
+    if mix is not None:
+        _require_numbers(_require_dict(mix, "Task mix"), "Task mix", mix)
+        if not mix or any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+            raise ValueError("Task mix needs at least one positive weight")
+
+    dag = spec.get('dag')
+    if dag:
+        if _require_dict(dag, "DAG").get('shape') not in DAG_SHAPES:
+            raise ValueError(f"Unsupported DAG shape: {dag.get('shape')}")
+        for name in ('width', 'depth', 'layers'):
+            value = dag.get(name)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+                raise ValueError(f"DAG {name} must be a positive integer: {value!r}")
+        probability = dag.get('edge_probability')
+        if probability is not None and (not _is_number(probability) or not 0 <= probability <= 1):
+            raise ValueError(f"DAG edge_probability must be between 0 and 1: {probability!r}")
+
+    count = spec.get('count')
+    if count is not None and (not isinstance(count, int) or isinstance(count, bool) or count < 0):
+        raise ValueError(f"Invalid job count: {count!r}")
+    duration = spec.get('duration')
+    if duration is not None and not _is_number(duration):
+        raise ValueError(f"Invalid workload duration: {duration!r}")
+
+    return {
+        'seed': spec.get('seed'),
+        'count': count,
+        'duration': duration,
+        'arrival': arrival,
+        'diurnal': diurnal,
+        'mix': mix,
+        'dag': dag
+    }
+
+
+def generate_workload(spec, task_types):
+    """
+    依規格逐一產生任務設定 (格式同 /api/execute 的 tasks，另含 task_id)，依到達時間排序
+    count: job 數上限；duration: 到達時間上限；兩者皆無時為無限串流
+    每個 job 依 dag 展開成多個同時到達的任務，相依只指向同一 job 中較早的任務
+    """
+    spec = validate_workload(spec)
+    rng = random.Random(spec['seed'])
+
+    mix = spec['mix'] or {task_type: 1 for task_type in task_types}
+    for task_type in mix:
+        if task_type not in task_types:
+            raise ValueError(f"Unsupported task type: {task_type}")
+    mix_types = list(mix)
+    cumulative = list(itertools.accumulate(mix[task_type] for task_type in mix_types))
+    total_weight = cumulative[-1]
+
+    task_id = 0
+    times = arrival_times(spec['arrival'], spec['diurnal'], rng)
+    for job in itertools.count():
+        if spec['count'] is not None and job >= spec['count']:
+            return
+        arrival_time = next(times)
+        if spec['duration'] is not None and arrival_time > spec['duration']:
+            return
+
+        base = task_id
+        for dependencies in job_shape(spec['dag'], rng):
+            yield {
+                'task_id': task_id,
+                'task_type': mix_types[bisect.bisect_right(cumulative, rng.random() * total_weight)],
+                'arrival_time': round(arrival_time, 3),
+                'dependencies': [base + dep for dep in dependencies]
+            }
+            task_id += 1
+
+
+class TaskStream:
+    """
+    延遲產生任務的工作負載串流
+    只有在模擬時間到達 arrival_time 時才建立 Task，已完成的任務不再保留；
+    相依任務在前驅全部完成後才釋放，因此記憶體只與執行中/等待中的任務數有關
+    """
+
+    def __init__(self, configs, build_task):
+        self.configs = iter(configs)
+        self.build_task = build_task  # config -> Task
+        self.generated = 0
+
+        self.lookahead = None  # 下一個尚未到達的任務設定
+        self.unfinished = {}  # 已建立但尚未完成的 task_id -> 等待它的後繼任務
+        self.blocked = {}  # task_id -> (task, 尚未完成的前驅數)
+        self.ready = []  # 前驅剛完成、等待下次 pull 的任務
+        self._advance()
+
+    def _advance(self):
+        self.lookahead = next(self.configs, None)
+
+    @property
+    def exhausted(self):
+        """所有任務都已釋放"""
+        return self.lookahead is None and not self.blocked and not self.ready
+
+    def next_arrival_time(self):
+        """下一個尚未產生的任務到達時間 (沒有則為 None)"""
+        return self.lookahead['arrival_time'] if self.lookahead is not None else None
+
+    def pull(self, current_time):
+        """回傳到 current_time 為止可以釋放的任務"""
+        released = self.ready
+        self.ready = []
+
+        while self.lookahead is not None and self.lookahead['arrival_time'] <= current_time:
+            config = self.lookahead
+            self._advance()
+
+            task = self.build_task(config)
+            self.generated += 1
+            self.unfinished[task.task_id] = []
+
+            waiting = 0
+            for dep in config['dependencies']:
+                successors = self.unfinished.get(dep)
+                if successors is not None:  # 不在 unfinished 表示前驅已完成
+                    successors.append(task.task_id)
+                    waiting += 1
+            if waiting:
+                self.blocked[task.task_id] = (task, waiting)
+            else:
+                released.append(task)
+
+        return released
+
+    def find(self, task_id):
+        """已產生但尚未釋放 (等待前驅或等待下次 pull) 的任務"""
+        entry = self.blocked.get(task_id)
+        if entry is not None:
+            return entry[0]
+        return next((task for task in self.ready if task.task_id == task_id), None)
+
+    def task_completed(self, task):
+        """任務完成時呼叫，釋放前驅已全部完成的後繼任務"""
+        for succ in self.unfinished.pop(task.task_id, ()):
+            blocked_task, waiting = self.blocked[succ]
+            if waiting == 1:
+                del self.blocked[succ]
+                self.ready.append(blocked_task)
+            else:
+                self.blocked[succ] = (blocked_task, waiting - 1)
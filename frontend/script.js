@@ -2,6 +2,20 @@ let cores = [];
 let tasks = [];
 let socket;
 let taskCounter = 1;
+let currentSessionId = null; // 目前執行中的模擬 session
+let coreStateCache = {}; // 差量模式下各核心的最新狀態 (core_id -> state)
+
+// socket 事件只更新資料，DOM 與 canvas 在 requestAnimationFrame 中每個畫格更新一次
+const CARD_VIEW_MAX_CORES = 16; // 核心數超過此值時不建立核心卡片，只用時間軸與熱度圖
+const API_BASE = 'http://localhost:5000';
+let timeline; // TimelineView
+let cardView = true;
+let changedCoreIds = new Set(); // 上次繪製後狀態有變化的核心
+let pendingTaskEvents = []; // 卡片模式下待套用到任務佇列的分配/完成事件
+let pendingTime = null; // 最新的模擬時間 {time, remaining}
+let frameRequested = false;
+let traceView = null; // 回放中的軌跡 {traceId, summary}
+let traceRequest = 0; // 只套用最新一次的軌跡區間請求
 
 // Task type configurations
 const taskTypes = {
@@ -97,30 +111,52 @@ const coreTypes = {
 
 // Initialize the application
 document.addEventListener('DOMContentLoaded', function() {
+    timeline = new TimelineView(new TimelineStore(), {
+        scroll: document.getElementById('timeline-scroll'),
+        spacer: document.getElementById('timeline-spacer'),
+        gantt: document.getElementById('timeline-canvas'),
+        heatmap: document.getElementById('core-heatmap')
+    });
+    timeline.onRangeChange = handleTimelineRange;
     updateCoreConfig();
+    refreshTraceList();
     addTask(); // Add first task by default
     initializeSocket();
 });
 
 function initializeSocket() {
-    socket = io('http://localhost:5000');
+    socket = io(API_BASE);
     
     socket.on('core_update', function(data) {
         updateCoreVisual(data.core_id, data.status, data.task);
     });
       socket.on('core_states_update', function(data) {
-        updateCoreStates(data.cores, data.time);
-        updateSimulationTime(data.time, data.remaining_time);
+        if (data.keyframe !== undefined) {
+            applyCoreStateFrame(data);
+        } else {
+            receiveCoreStates(data.cores, false, data.time);
+        }
+        pendingTime = { time: data.time, remaining: data.remaining_time };
+        requestFrame();
     });
     
     socket.on('task_assigned', function(data) {
-        moveTaskToCore(data.task_id, data.core_id, data.task);
+        receiveAssignment(data, data.start_time);
+        requestFrame();
     });
     
     socket.on('task_completed', function(data) {
-        removeCompletedTask(data.task_id, data.task_name);
+        receiveCompletion(data);
+        requestFrame();
+    });
+    
+    socket.on('task_metrics_update', function(data) {
+        updateLiveTaskMetrics(data);
     });
       socket.on('simulation_complete', function(data) {
+        currentSessionId = null;
+        drawFrame(); // 先畫完尚未繪製的更新
+        refreshTraceList();
         displayEnhancedStatistics(data.statistics, data.timeout);
         document.getElementById('execute-btn').disabled = false;
         document.getElementById('execute-btn').textContent = '執行排程';
@@ -140,6 +176,11 @@ function updateCoreConfig() {
     paramContainer.innerHTML = '';
     visualContainer.innerHTML = '';
     cores = [];
+    coreStateCache = {};
+    cardView = coreCount <= CARD_VIEW_MAX_CORES;
+    if (!cardView) {
+        visualContainer.innerHTML = `<div class="stats-placeholder">${coreCount} 個核心：以下方的熱度圖與時間軸顯示</div>`;
+    }
     
     // Create core parameter inputs
     for (let i = 0; i < coreCount; i++) {
@@ -158,6 +199,13 @@ function updateCoreConfig() {
         `;
         paramContainer.appendChild(paramDiv);
         
+        // Initialize core data
+        cores.push({
+            id: i,
+            core_type: 'P'
+        });
+        if (!cardView) continue;
+        
         // Visual representation
         const coreDiv = document.createElement('div');
         coreDiv.className = 'core-visual idle';
@@ -176,13 +224,10 @@ function updateCoreConfig() {
             </div>
         `;
         visualContainer.appendChild(coreDiv);
-        
-        // Initialize core data
-        cores.push({
-            id: i,
-            core_type: 'P'
-        });
     }
+    
+    timeline.store.reset(coreCount);
+    timeline.followLatest();
 }
 
 function updateCoreType(coreIndex) {
@@ -194,8 +239,10 @@ function updateCoreType(coreIndex) {
     const typeConfig = coreTypes[selectedType];
     
     // Update visual
-    coreVisual.style.backgroundColor = typeConfig.color;
-    coreVisual.querySelector('.core-id').textContent = `${selectedType}-Core ${coreIndex + 1}`;
+    if (coreVisual) {
+        coreVisual.style.backgroundColor = typeConfig.color;
+        coreVisual.querySelector('.core-id').textContent = `${selectedType}-Core ${coreIndex + 1}`;
+    }
     
     // Update details display
     coreDetails.querySelector('.core-spec').textContent = 
@@ -316,14 +363,21 @@ function executeScheduling() {    // Collect core configurations
         queue.innerHTML = '<div class="queue-header">任務佇列:</div>';
     });
     
+    // 清除上一次的時間軸 (回放中的軌跡改回即時模式)
+    traceView = null;
+    coreStateCache = {};
+    timeline.store.reset(cores.length);
+    timeline.followLatest();
+    
     // Disable execute button
     document.getElementById('execute-btn').disabled = true;
     document.getElementById('execute-btn').textContent = '執行中...';
     
     // Choose API endpoint based on strategy
-    const endpoint = strategy === 'BASIC' ? '/api/execute_realtime' : '/api/execute';
+    const realtime = ['BASIC', 'PREEMPTIVE', 'BALANCED'].includes(strategy);
+    const endpoint = realtime ? '/api/execute_realtime' : '/api/execute';
       // Send request to backend
-    fetch(`http://localhost:5000${endpoint}`, {
+    fetch(`${API_BASE}${endpoint}`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
@@ -332,11 +386,19 @@ function executeScheduling() {    // Collect core configurations
             cores: coreConfigs,
             tasks: taskConfigs,
             strategy: strategy,
-            max_simulation_time: maxSimTime
+            max_simulation_time: maxSimTime,
+            protocol: 'delta', // keyframe + 差量畫格
+            frame_rate: 10,
+            record_trace: document.getElementById('record-trace').checked,
+            socket_id: socket.id // 讓後端把此連線加入 session 的 room
         })
     })
     .then(response => response.json())
     .then(data => {
+        if (data.error) {
+            throw new Error(data.error);
+        }
+        currentSessionId = data.session_id;
         console.log('Scheduling started:', data);
     })
     .catch(error => {
@@ -363,6 +425,21 @@ function displayStatistics(statistics) {
 }
 
 function resetSimulation() {
+    // 取消仍在執行的模擬
+    if (currentSessionId) {
+        fetch(`${API_BASE}/api/sessions/${currentSessionId}/cancel`, { method: 'POST' })
+            .catch(error => console.error('Error:', error));
+        currentSessionId = null;
+    }
+    
+    coreStateCache = {};
+    changedCoreIds.clear();
+    pendingTaskEvents = [];
+    pendingTime = null;
+    traceView = null;
+    timeline.store.reset(cores.length);
+    timeline.followLatest();
+    
     // Reset all core visuals to idle state
     const coreElements = document.querySelectorAll('.core-visual');
     coreElements.forEach(element => {
@@ -530,7 +607,156 @@ function updateCoreStates(cores, currentTime) {
     }
 }
 
-function moveTaskToCore(taskId, coreId, taskName) {
+function applyCoreStateFrame(frame) {
+    // 差量畫格：先處理任務分配，再合併核心狀態，最後處理完成的任務
+    frame.assigned.forEach(data => receiveAssignment(data, data.start_time === undefined ? frame.time : data.start_time));
+    receiveCoreStates(frame.keyframe ? frame.cores : frame.deltas, frame.keyframe, frame.time);
+    frame.completed.forEach(receiveCompletion);
+}
+
+function receiveCoreStates(states, keyframe, time) {
+    // 合併到 coreStateCache 並記下有變化的核心 (繪製時只更新這些核心)
+    if (keyframe) {
+        coreStateCache = {};
+    }
+    states.forEach(delta => {
+        const state = Object.assign(coreStateCache[delta.core_id] || {}, delta);
+        coreStateCache[delta.core_id] = state;
+        changedCoreIds.add(delta.core_id);
+        timeline.store.setState(state, time);
+    });
+    timeline.store.advance(time);
+}
+
+function receiveAssignment(data, time) {
+    timeline.store.assign(data.core_id, data.task_id, data.task, time);
+    if (cardView) {
+        pendingTaskEvents.push(['assigned', data]);
+    }
+}
+
+function receiveCompletion(data) {
+    timeline.store.complete(data.task_id, data.completion_time);
+    if (cardView) {
+        pendingTaskEvents.push(['completed', data]);
+    }
+}
+
+function requestFrame() {
+    if (frameRequested) return;
+    frameRequested = true;
+    requestAnimationFrame(drawFrame);
+}
+
+function drawFrame() {
+    // 一個畫格內收到的所有事件一起套用到 DOM，再重畫時間軸與熱度圖
+    frameRequested = false;
+    if (cardView) {
+        pendingTaskEvents.forEach(([kind, data]) => {
+            if (kind === 'assigned') {
+                moveTaskToCore(data.task_id, data.core_id, data.task, data.preempted_task_id);
+            } else {
+                removeCompletedTask(data.task_id, data.task_name);
+            }
+        });
+        if (pendingTime) {
+            updateCoreStates([...changedCoreIds].map(coreId => coreStateCache[coreId]), pendingTime.time);
+        }
+    }
+    pendingTaskEvents = [];
+    changedCoreIds.clear();
+    
+    if (pendingTime) {
+        updateSimulationTime(pendingTime.time, pendingTime.remaining);
+        pendingTime = null;
+    }
+    timeline.draw();
+}
+
+function followTimeline() {
+    timeline.followLatest();
+}
+
+function refreshTraceList() {
+    // 已記錄的軌跡 (需要後端安裝 numpy)
+    fetch(`${API_BASE}/api/traces`)
+        .then(response => response.json())
+        .then(data => {
+            const select = document.getElementById('trace-select');
+            const selected = select.value;
+            select.innerHTML = '<option value="">選擇已記錄的軌跡</option>';
+            data.traces.slice().reverse().forEach(trace => {
+                const option = document.createElement('option');
+                option.value = trace.trace_id;
+                option.textContent = `${new Date(trace.created_at * 1000).toLocaleString()} · ` +
+                    `${trace.engine || ''} · ${trace.samples} 取樣${trace.complete ? '' : ' (記錄中)'}`;
+                select.appendChild(option);
+            });
+            select.value = selected;
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function loadSelectedTrace() {
+    const traceId = document.getElementById('trace-select').value;
+    if (!traceId) return;
+    fetch(`${API_BASE}/api/traces/${traceId}`)
+        .then(response => response.json())
+        .then(summary => {
+            if (summary.error) {
+                throw new Error(summary.error);
+            }
+            if (summary.start_time === null) return;
+            traceView = { traceId, summary };
+            const end = summary.end_time + summary.time_step;
+            timeline.setRange(summary.start_time, end);
+            fetchTraceWindow(summary.start_time, end);
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function handleTimelineRange(start, end) {
+    // 回放軌跡時，平移/縮放後以新的區間重新取得 (後端依 canvas 寬度降採樣)
+    if (traceView) {
+        fetchTraceWindow(Math.max(traceView.summary.start_time, start), end);
+    }
+}
+
+function fetchTraceWindow(start, end) {
+    const { traceId, summary } = traceView;
+    const request = ++traceRequest;
+    const params = new URLSearchParams({
+        start, end,
+        max_points: Math.max(100, Math.round(timeline.plotWidth())),
+        fields: 'task,flags,temp,load',
+        max_events: 5000
+    });
+    fetch(`${API_BASE}/api/traces/${traceId}/window?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            if (request !== traceRequest || !traceView || traceView.traceId !== traceId) return;
+            timeline.store.loadTrace(summary.cores.length, data, Math.min(end, summary.end_time + summary.time_step));
+            timeline.requestDraw();
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function moveTaskToCore(taskId, coreId, taskName, preemptedTaskId) {
+    // 搶佔式排程：被換下的任務改為等待中，恢復執行的任務先移除舊的項目
+    if (preemptedTaskId !== undefined) {
+        const preempted = document.getElementById(`queued-task-${preemptedTaskId}`);
+        if (preempted) {
+            preempted.querySelector('.task-status').textContent = '等待中';
+        }
+    }
+    const previous = document.getElementById(`queued-task-${taskId}`);
+    if (previous) {
+        previous.remove();
+    }
+    
     const taskQueue = document.getElementById(`task-queue-${coreId}`);
     if (taskQueue) {
         const taskElement = document.createElement('div');
@@ -601,6 +827,7 @@ function displayEnhancedStatistics(statistics, timeout) {
     tabsContainer.innerHTML = `
         <button class="tab-button active" onclick="showStatsTab('global')">全域統計</button>
         <button class="tab-button" onclick="showStatsTab('cores')">核心統計</button>
+        ${statistics.tasks ? `<button class="tab-button" onclick="showStatsTab('tasks')">任務延遲</button>` : ''}
     `;
     statsContainer.appendChild(tabsContainer);
     
@@ -676,6 +903,70 @@ function displayEnhancedStatistics(statistics, timeout) {
     coreStatsHTML += '</div>';
     coreStatsDiv.innerHTML = coreStatsHTML;
     statsContainer.appendChild(coreStatsDiv);
+    
+    // 任務延遲統計 (依任務類型與優先等級)
+    if (statistics.tasks) {
+        const taskStatsDiv = document.createElement('div');
+        taskStatsDiv.className = 'stats-content';
+        taskStatsDiv.id = 'tasks-stats';
+        taskStatsDiv.innerHTML = renderTaskMetricsTable('全部 / Realtime', {
+                '全部': statistics.tasks.overall,
+                'Realtime': statistics.tasks.realtime
+            }) +
+            renderTaskMetricsTable('任務類型', statistics.tasks.by_task_type) +
+            renderTaskMetricsTable('優先等級', statistics.tasks.by_priority_class);
+        statsContainer.appendChild(taskStatsDiv);
+    }
+}
+
+function formatSeconds(value) {
+    return value === null || value === undefined ? '-' : `${value}s`;
+}
+
+function renderTaskMetricsTable(title, groups) {
+    let rows = '';
+    Object.entries(groups).forEach(([name, group]) => {
+        if (!group.count) return;
+        rows += `
+            <tr>
+                <td>${name}</td>
+                <td>${group.count}</td>
+                <td>${formatSeconds(group.response_time.mean)}</td>
+                <td>${formatSeconds(group.response_time.p50)}</td>
+                <td>${formatSeconds(group.response_time.p95)}</td>
+                <td>${formatSeconds(group.response_time.p99)}</td>
+                <td>${formatSeconds(group.waiting_time.mean)}</td>
+                <td>${group.deadline_misses}${group.deadline_miss_rate !== null ? ` (${group.deadline_miss_rate}%)` : ''}</td>
+                <td>${formatSeconds(group.tardiness.max)}</td>
+            </tr>
+        `;
+    });
+    if (!rows) return '';
+    return `
+        <h4>${title}</h4>
+        <table class="task-metrics-table">
+            <tr>
+                <th></th><th>任務數</th><th>平均回應</th><th>p50</th><th>p95</th><th>p99</th>
+                <th>平均等待</th><th>錯過截止</th><th>最大延遲</th>
+            </tr>
+            ${rows}
+        </table>
+    `;
+}
+
+function updateLiveTaskMetrics(data) {
+    // 執行中只顯示精簡的即時延遲摘要，完成後由 displayEnhancedStatistics 取代
+    if (!currentSessionId) return;
+    const overall = data.overall;
+    const realtime = data.realtime;
+    document.getElementById('statistics').innerHTML = `
+        <div class="stats-loading">
+            正在執行排程... 已完成 ${overall.count} 個任務 ·
+            回應時間 p95 ${formatSeconds(overall.response_time.p95)} ·
+            Realtime p99 ${formatSeconds(realtime.response_time.p99)} ·
+            錯過截止 ${overall.deadline_misses}
+        </div>
+    `;
 }
 
 function showStatsTab(tabName) {
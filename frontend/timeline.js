@@ -0,0 +1,429 @@
+// 核心時間軸 (Gantt) 與核心熱度圖的 canvas 繪製
+// socket 事件只更新 TimelineStore 的資料，繪製集中在 requestAnimationFrame 中每個畫格一次；
+// 時間軸只繪製捲動範圍內可見的核心列，以及可見時間區間內的區段
+
+const TIMELINE_ROW_HEIGHT = 16;
+const TIMELINE_LABEL_WIDTH = 72;
+const TIMELINE_AXIS_HEIGHT = 18;
+const TIMELINE_DEFAULT_SPAN = 30; // 跟隨模式下顯示最近幾秒
+const TIMELINE_MIN_SPAN = 0.5;
+const TIMELINE_MAX_SEGMENTS = 200000; // 即時模式保留的區段上限，超過時丟棄每列較舊的一半
+const TIMELINE_RANGE_DELAY = 200; // 平移/縮放停止多久後才通知可見區間改變 (ms)
+
+const HEATMAP_MIN_TEMP = 25;
+const HEATMAP_MAX_TEMP = 95;
+const HEATMAP_MIN_CELL = 8;
+const HEATMAP_MAX_CELL = 40;
+const HEATMAP_MAX_HEIGHT = 240;
+
+const SEGMENT_COLORS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1db954',
+                        '#ff6b6b', '#4ecdc4', '#a29bfe', '#6c5ce7', '#fd79a8'];
+
+// 溫度 -> 顏色 (藍到紅) 的查表，避免每格產生新的字串
+const HEAT_COLORS = Array.from({ length: 101 }, (_, i) => `hsl(${Math.round(240 * (1 - i / 100))}, 75%, 50%)`);
+
+function segmentColor(taskId) {
+    return SEGMENT_COLORS[Math.abs(taskId) % SEGMENT_COLORS.length];
+}
+
+function heatColor(temp) {
+    const ratio = (temp - HEATMAP_MIN_TEMP) / (HEATMAP_MAX_TEMP - HEATMAP_MIN_TEMP);
+    return HEAT_COLORS[Math.round(Math.min(1, Math.max(0, ratio)) * 100)];
+}
+
+function niceStep(rough) {
+    // 1、2、5 × 10^n 的刻度間距
+    const magnitude = Math.pow(10, Math.floor(Math.log10(rough)));
+    const normalized = rough / magnitude;
+    return (normalized < 2 ? 1 : normalized < 5 ? 2 : 5) * magnitude;
+}
+
+class TimelineStore {
+    // 每個核心的執行區段 {taskId, name, start, end} (依開始時間排序，end 為 null 表示執行中) 與最新狀態
+
+    constructor() {
+        this.reset(0);
+    }
+
+    reset(coreCount) {
+        this.rows = [];
+        this.open = []; // 每個核心執行中的區段
+        this.states = []; // 每個核心最新的狀態 (熱度圖)
+        this.taskCore = new Map(); // task_id -> 最後分配到的核心
+        this.segmentCount = 0;
+        this.startTime = 0;
+        this.endTime = 0;
+        this.ensureCore(coreCount - 1);
+    }
+
+    get coreCount() {
+        return this.rows.length;
+    }
+
+    ensureCore(coreId) {
+        // 執行中新增的核心
+        while (this.rows.length <= coreId) {
+            this.rows.push([]);
+            this.open.push(null);
+            this.states.push(null);
+        }
+    }
+
+    assign(coreId, taskId, name, time) {
+        this.ensureCore(coreId);
+        this.close(coreId, time);
+        const previous = this.taskCore.get(taskId);
+        if (previous !== undefined && previous !== coreId && this.open[previous] && this.open[previous].taskId === taskId) {
+            this.close(previous, time); // 被搬移到其他核心的任務
+        }
+
+        const segment = { taskId, name, start: time, end: null };
+        this.rows[coreId].push(segment);
+        this.open[coreId] = segment;
+        this.taskCore.set(taskId, coreId);
+        this.advance(time);
+        if (++this.segmentCount > TIMELINE_MAX_SEGMENTS) {
+            this.trim();
+        }
+    }
+
+    complete(taskId, time) {
+        const coreId = this.taskCore.get(taskId);
+        if (coreId === undefined) return;
+        this.taskCore.delete(taskId);
+        if (this.open[coreId] && this.open[coreId].taskId === taskId) {
+            this.close(coreId, time);
+        }
+        this.advance(time);
+    }
+
+    close(coreId, time) {
+        const segment = this.open[coreId];
+        if (segment) {
+            segment.end = time;
+            this.open[coreId] = null;
+        }
+    }
+
+    setState(state, time) {
+        this.ensureCore(state.core_id);
+        this.states[state.core_id] = state;
+        if (!state.active) {
+            this.close(state.core_id, time); // 被取消或中斷的任務沒有完成事件
+        }
+    }
+
+    advance(time) {
+        if (time > this.endTime) {
+            this.endTime = time;
+        }
+    }
+
+    trim() {
+        // 每列丟棄較舊的一半 (執行中的區段一定是該列最後一個，會保留)
+        let count = 0;
+        let startTime = this.endTime;
+        this.rows = this.rows.map(row => {
+            const kept = row.slice(Math.floor(row.length / 2));
+            count += kept.length;
+            if (kept.length) {
+                startTime = Math.min(startTime, kept[0].start);
+            }
+            return kept;
+        });
+        this.segmentCount = count;
+        this.startTime = startTime;
+    }
+
+    loadTrace(coreCount, samples, endTime) {
+        // 由 /api/traces/<id>/window 的 (降採樣) 取樣重建區段：連續取樣中相同的 task_id 合併為一個區段
+        this.reset(coreCount);
+        const names = new Map();
+        samples.events.forEach(event => {
+            if (event.type === 'assigned') {
+                names.set(event.task_id, event.task_name);
+            }
+        });
+
+        const times = samples.times;
+        for (let i = 0; i < times.length; i++) {
+            const sampleEnd = i + 1 < times.length ? times[i + 1] : endTime;
+            const sample = samples.task[i];
+            for (let core = 0; core < sample.length; core++) {
+                const taskId = sample[core];
+                const segment = this.open[core];
+                if (segment && segment.taskId === taskId) {
+                    segment.end = sampleEnd;
+                    continue;
+                }
+                this.open[core] = null;
+                if (taskId < 0) continue;
+                const name = names.has(taskId) ? names.get(taskId) : `#${taskId}`;
+                this.open[core] = { taskId, name, start: times[i], end: sampleEnd };
+                this.rows[core].push(this.open[core]);
+                this.segmentCount++;
+            }
+        }
+        this.open.fill(null); // 軌跡中的區段都有固定的結束時間
+
+        // 熱度圖顯示區間最後一個取樣
+        const last = times.length - 1;
+        if (last >= 0) {
+            for (let core = 0; core < coreCount; core++) {
+                const flags = samples.flags ? samples.flags[last][core] : 0;
+                const taskId = samples.task[last][core];
+                this.states[core] = {
+                    core_id: core,
+                    active: Boolean(flags & 1),
+                    thermal_throttling: Boolean(flags & 2),
+                    temp: samples.temp[last][core],
+                    load: samples.load ? Math.round(samples.load[last][core] * 1000) / 10 : 0,
+                    current_task: taskId >= 0 ? (names.get(taskId) || `#${taskId}`) : null
+                };
+            }
+            this.startTime = times[0];
+        }
+        this.endTime = endTime;
+    }
+}
+
+class TimelineView {
+    // elements: {scroll, spacer, gantt, heatmap}；scroll 內的 spacer 撐出所有核心列的高度，
+    // gantt canvas 以 sticky 固定在可視範圍，只繪製目前捲動到的核心列
+
+    constructor(store, elements) {
+        this.store = store;
+        this.scroll = elements.scroll;
+        this.spacer = elements.spacer;
+        this.gantt = elements.gantt;
+        this.heatmap = elements.heatmap;
+
+        this.span = TIMELINE_DEFAULT_SPAN;
+        this.viewEnd = TIMELINE_DEFAULT_SPAN;
+        this.follow = true; // 跟隨最新的模擬時間
+        this.onRangeChange = null; // (start, end) -> 平移/縮放後的可見區間 (軌跡回放時重新取得資料)
+        this.rangeTimer = null;
+        this.drawRequested = false;
+        this.heatmapLayout = { cell: HEATMAP_MAX_CELL, cols: 1 };
+
+        this.scroll.addEventListener('scroll', () => this.requestDraw());
+        this.gantt.addEventListener('wheel', event => this.handleWheel(event), { passive: false });
+        this.gantt.addEventListener('mousemove', event => this.describeGantt(event));
+        this.heatmap.addEventListener('mousemove', event => this.describeHeatmap(event));
+        window.addEventListener('resize', () => this.requestDraw());
+    }
+
+    requestDraw() {
+        if (this.drawRequested) return;
+        this.drawRequested = true;
+        requestAnimationFrame(() => {
+            this.drawRequested = false;
+            this.draw();
+        });
+    }
+
+    draw() {
+        this.drawGantt();
+        this.drawHeatmap();
+    }
+
+    setRange(start, end) {
+        this.follow = false;
+        this.span = Math.max(TIMELINE_MIN_SPAN, end - start);
+        this.viewEnd = start + this.span;
+        this.requestDraw();
+    }
+
+    followLatest() {
+        this.follow = true;
+        this.span = TIMELINE_DEFAULT_SPAN;
+        this.requestDraw();
+    }
+
+    visibleRange() {
+        const end = this.follow ? Math.max(this.store.endTime, this.span) : this.viewEnd;
+        return [end - this.span, end];
+    }
+
+    plotWidth() {
+        return Math.max(1, this.scroll.clientWidth - TIMELINE_LABEL_WIDTH);
+    }
+
+    prepare(canvas, width, height) {
+        // 依 devicePixelRatio 調整 canvas 解析度，只在尺寸改變時重新配置
+        const ratio = window.devicePixelRatio || 1;
+        if (canvas.width !== Math.round(width * ratio) || canvas.height !== Math.round(height * ratio)) {
+            canvas.width = Math.round(width * ratio);
+            canvas.height = Math.round(height * ratio);
+            canvas.style.width = `${width}px`;
+            canvas.style.height = `${height}px`;
+        }
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.clearRect(0, 0, width, height);
+        return ctx;
+    }
+
+    drawGantt() {
+        const store = this.store;
+        const width = this.scroll.clientWidth;
+        const height = this.scroll.clientHeight;
+        if (!width || !height) return;
+        const ctx = this.prepare(this.gantt, width, height);
+        const rowsHeight = height - TIMELINE_AXIS_HEIGHT;
+        this.spacer.style.height = `${Math.max(0, store.coreCount * TIMELINE_ROW_HEIGHT - rowsHeight)}px`;
+
+        const [start, end] = this.visibleRange();
+        const scale = this.plotWidth() / this.span;
+        const scrollTop = this.scroll.scrollTop;
+        const first = Math.floor(scrollTop / TIMELINE_ROW_HEIGHT);
+        const last = Math.min(store.coreCount, Math.ceil((scrollTop + rowsHeight) / TIMELINE_ROW_HEIGHT));
+
+        ctx.font = '11px Arial';
+        ctx.textBaseline = 'middle';
+        for (let core = first; core < last; core++) {
+            const y = core * TIMELINE_ROW_HEIGHT - scrollTop;
+            if (core % 2) {
+                ctx.fillStyle = '#f7f9fa';
+                ctx.fillRect(0, y, width, TIMELINE_ROW_HEIGHT);
+            }
+            ctx.fillStyle = '#555';
+            ctx.fillText(`Core ${core + 1}`, 4, y + TIMELINE_ROW_HEIGHT / 2, TIMELINE_LABEL_WIDTH - 8);
+            this.drawRow(ctx, store.rows[core], y, start, end, scale);
+        }
+        this.drawAxis(ctx, width, height, start, end, scale);
+    }
+
+    drawRow(ctx, row, y, start, end, scale) {
+        // 二分搜尋第一個結束時間不早於 start 的區段 (同一列的區段不重疊，結束時間遞增)
+        let low = 0;
+        let high = row.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            const segmentEnd = row[mid].end === null ? Infinity : row[mid].end;
+            if (segmentEnd < start) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+
+        let lastX = -Infinity;
+        for (let i = low; i < row.length; i++) {
+            const segment = row[i];
+            if (segment.start > end) break;
+            const x0 = TIMELINE_LABEL_WIDTH + Math.max(0, segment.start - start) * scale;
+            const x1 = TIMELINE_LABEL_WIDTH + ((segment.end === null ? this.store.endTime : segment.end) - start) * scale;
+            if (x1 <= lastX) continue; // 與前一個區段落在同一個像素內
+            const x = Math.max(x0, lastX);
+            const w = Math.max(1, x1 - x);
+            ctx.fillStyle = segmentColor(segment.taskId);
+            ctx.fillRect(x, y + 2, w, TIMELINE_ROW_HEIGHT - 4);
+            if (w > 40) {
+                ctx.fillStyle = '#fff';
+                ctx.fillText(segment.name, x + 3, y + TIMELINE_ROW_HEIGHT / 2, w - 6);
+            }
+            lastX = x + w;
+        }
+    }
+
+    drawAxis(ctx, width, height, start, end, scale) {
+        const axisY = height - TIMELINE_AXIS_HEIGHT;
+        ctx.fillStyle = 'rgba(255, 255, 255, 0.95)';
+        ctx.fillRect(0, axisY, width, TIMELINE_AXIS_HEIGHT);
+        ctx.strokeStyle = 'rgba(0, 0, 0, 0.08)';
+        ctx.fillStyle = '#777';
+        ctx.textBaseline = 'middle';
+
+        const step = niceStep(this.span / 8);
+        ctx.beginPath();
+        for (let t = Math.ceil(start / step) * step; t <= end; t += step) {
+            const x = Math.round(TIMELINE_LABEL_WIDTH + (t - start) * scale) + 0.5;
+            ctx.moveTo(x, 0);
+            ctx.lineTo(x, axisY);
+            ctx.fillText(`${Number(t.toFixed(3))}s`, x + 2, axisY + TIMELINE_AXIS_HEIGHT / 2);
+        }
+        ctx.stroke();
+    }
+
+    drawHeatmap() {
+        const store = this.store;
+        const width = this.heatmap.parentElement.clientWidth;
+        const count = store.coreCount;
+        if (!width) return;
+
+        // 格子大小讓所有核心放進 HEATMAP_MAX_HEIGHT 內
+        const cell = Math.max(HEATMAP_MIN_CELL, Math.min(HEATMAP_MAX_CELL,
+            Math.floor(Math.sqrt(width * HEATMAP_MAX_HEIGHT / Math.max(1, count)))));
+        const cols = Math.max(1, Math.floor(width / cell));
+        const height = Math.ceil(count / cols) * cell;
+        this.heatmapLayout = { cell, cols };
+        const ctx = this.prepare(this.heatmap, width, height);
+
+        for (let core = 0; core < count; core++) {
+            const state = store.states[core];
+            const x = (core % cols) * cell;
+            const y = Math.floor(core / cols) * cell;
+            ctx.fillStyle = state ? heatColor(state.temp) : '#ddd';
+            ctx.fillRect(x + 1, y + 1, cell - 2, cell - 2);
+            if (state && state.active) {
+                // 底部的長條為負載
+                ctx.fillStyle = 'rgba(0, 0, 0, 0.35)';
+                ctx.fillRect(x + 1, y + cell - 4, (cell - 2) * Math.min(1, state.load / 100), 3);
+            }
+            if (state && state.thermal_throttling) {
+                ctx.strokeStyle = '#000';
+                ctx.strokeRect(x + 1.5, y + 1.5, cell - 3, cell - 3);
+            }
+        }
+    }
+
+    handleWheel(event) {
+        // Ctrl + 滾輪縮放 (以游標為中心)，Shift + 滾輪或水平滾動平移；一般滾輪捲動核心列
+        const horizontal = event.shiftKey ? event.deltaY : event.deltaX;
+        if (!event.ctrlKey && !event.metaKey && !horizontal) return;
+        event.preventDefault();
+
+        const [start] = this.visibleRange();
+        const scale = this.plotWidth() / this.span;
+        if (event.ctrlKey || event.metaKey) {
+            const anchor = start + Math.max(0, event.offsetX - TIMELINE_LABEL_WIDTH) / scale;
+            const span = Math.max(TIMELINE_MIN_SPAN, this.span * Math.exp(event.deltaY / 300));
+            this.viewEnd = anchor + (start + this.span - anchor) * span / this.span;
+            this.span = span;
+        } else {
+            this.viewEnd = start + this.span + horizontal / scale;
+        }
+        this.follow = false;
+        this.requestDraw();
+        this.notifyRange();
+    }
+
+    notifyRange() {
+        if (!this.onRangeChange) return;
+        clearTimeout(this.rangeTimer);
+        this.rangeTimer = setTimeout(() => this.onRangeChange(...this.visibleRange()), TIMELINE_RANGE_DELAY);
+    }
+
+    describeGantt(event) {
+        // 以 title 顯示游標所在的區段 (不新增 DOM 節點)
+        const core = Math.floor((event.offsetY + this.scroll.scrollTop) / TIMELINE_ROW_HEIGHT);
+        const row = this.store.rows[core];
+        const [start] = this.visibleRange();
+        const time = start + (event.offsetX - TIMELINE_LABEL_WIDTH) * this.span / this.plotWidth();
+        const segment = row && row.find(segment => segment.start <= time &&
+            (segment.end === null ? this.store.endTime : segment.end) >= time);
+        this.gantt.title = segment ?
+            `Core ${core + 1} · ${segment.name} (#${segment.taskId}) · ${segment.start.toFixed(1)}s - ` +
+            `${segment.end === null ? '執行中' : segment.end.toFixed(1) + 's'}` : '';
+    }
+
+    describeHeatmap(event) {
+        const { cell, cols } = this.heatmapLayout;
+        const core = Math.floor(event.offsetY / cell) * cols + Math.floor(event.offsetX / cell);
+        const state = this.store.states[core];
+        this.heatmap.title = state ?
+            `Core ${core + 1} · ${state.temp}°C · Load ${state.load}%` +
+            `${state.current_task ? ' · ' + state.current_task : ''}${state.thermal_throttling ? ' · 限速中' : ''}` : '';
+    }
+}